@@ -1,11 +1,17 @@
-from fastapi import APIRouter
-
-from app.api.api_v1.endpoints.date_dimension import date_dimension_router
-from app.api.api_v1.endpoints.holiday import holiday_router
-
-api_router = APIRouter()
-
-api_router.include_router(holiday_router, prefix="/holiday", tags=["holiday"])
-api_router.include_router(
-    date_dimension_router, prefix="/date_dimension", tags=["date_dimension"]
-)
+from fastapi import APIRouter
+
+from app.api.api_v1.endpoints.admin import admin_router
+from app.api.api_v1.endpoints.cache import cache_router
+from app.api.api_v1.endpoints.date_dimension import date_dimension_router
+from app.api.api_v1.endpoints.holiday import holiday_router
+from app.api.api_v1.endpoints.workday import workday_router
+
+api_router = APIRouter()
+
+api_router.include_router(holiday_router, prefix="/holiday", tags=["holiday"])
+api_router.include_router(workday_router, prefix="/workday", tags=["workday"])
+api_router.include_router(
+    date_dimension_router, prefix="/date_dimension", tags=["date_dimension"]
+)
+api_router.include_router(cache_router, prefix="/cache", tags=["cache"])
+api_router.include_router(admin_router, prefix="/admin", tags=["admin"])
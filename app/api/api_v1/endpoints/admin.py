@@ -0,0 +1,36 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.core.config import settings
+from app.core.reloader import HolidayDataReloader, holiday_data_reloader
+
+admin_router = APIRouter()
+
+
+def check_admin_token(x_admin_token: str | None = Header(default=None)):
+    """
+    管理接口需要在X-Admin-Token请求头中提供ADMIN_TOKEN，未配置时不可用
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="admin api disabled")
+    if x_admin_token is None or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+
+@admin_router.post("/reload", dependencies=[Depends(check_admin_token)])
+async def reload(
+    reloader: HolidayDataReloader = Depends(holiday_data_reloader),
+) -> dict:
+    """
+    重新加载holiday-cn目录下的节假日数据，不需要重启进程
+    """
+    reloaded = await reloader.reload()
+    holiday_service = reloader.state.holiday_service
+    return {
+        "reloaded": reloaded,
+        "version": holiday_service.version,
+        "years": sorted(holiday_service.years),
+    }
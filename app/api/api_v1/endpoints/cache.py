@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+
+from app.core.response_cache import ResponseCache, response_cache
+
+cache_router = APIRouter()
+
+
+@cache_router.get("/stats")
+async def get_stats(
+    cache: ResponseCache = Depends(response_cache),
+) -> dict[str, int]:
+    """
+    服务端响应缓存的命中、未命中与淘汰次数，以及当前占用的字节数
+    """
+    return cache.stats()
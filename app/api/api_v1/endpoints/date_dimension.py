@@ -1,59 +1,416 @@
 from datetime import datetime, date
 import io
-from typing import Generator
+from typing import Annotated, Generator
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from csv import writer
 
+from app.core.config import settings
+from app.core.compression import accepts_gzip, gzip_stream
+from app.core.metrics import timed
+from app.core.response_cache import ResponseCache, response_cache
+from app.core.responses import ORJSONResponse, dumps
 from app.controllers.date_dimension_controller import (
     DateDimensionController,
     date_dimension_controller,
 )
-from app.schemas.date_dimension import DateDimension
+from app.schemas.date_dimension import (
+    DateDimension,
+    DateDimensionEngine,
+    DateDimensionStream,
+    Fields,
+    parse_fields,
+)
+from app.services.granularity import (
+    GRANULARITY_DESCRIPTION,
+    GRANULARITY_PATTERN,
+)
+from app.services.holiday_diff_service import ChangeFormat
+from app.services.pagination import Page, plan_page
 
 date_dimension_router = APIRouter()
 
+# 行已由引擎按DateDimension的字段生成，直接用orjson编码，不再逐行校验
+encode_json = timed("encode.json")(dumps)
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+CHANGE_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+GranularityQuery = Annotated[
+    str,
+    Query(pattern=GRANULARITY_PATTERN, description=GRANULARITY_DESCRIPTION),
+]
+
+ParallelQuery = Annotated[
+    bool | None,
+    Query(
+        description="是否按年/月切块在进程池中并行生成，并行时忽略engine。"
+        "未指定时，未指定engine且行数达到服务端阈值则自动并行；"
+        "服务端未启用进程池时指定true返回422"
+    ),
+]
+
+FieldsQuery = Annotated[
+    str | None,
+    Query(
+        description="逗号分隔的字段名，只计算并返回这些字段，按给出的顺序输出；"
+        "CSV的表头随之缩减。未指定时返回DateDimension的全部字段",
+        examples=["date_id,hour,date_type"],
+    ),
+]
+
+
+def _fields(fields: str | None) -> Fields:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _next_page_headers(request: Request, page: Page | None) -> dict | None:
+    """
+    下一页的游标放在响应头中，响应体仍为DateDimension列表
+    """
+    if page is None or page.next_cursor is None:
+        return None
+    url = request.url.include_query_params(cursor=page.next_cursor)
+    return {
+        "X-Next-Cursor": page.next_cursor,
+        "Link": f'<{url}>; rel="next"',
+    }
+
 
 @date_dimension_router.get("/date")
 async def get_for_date(
     date: date,
+    granularity: GranularityQuery = "hour",
+    fields: FieldsQuery = None,
     controller: DateDimensionController = Depends(date_dimension_controller),
+    cache: ResponseCache = Depends(response_cache),
 ) -> list[DateDimension]:
+    projection = _fields(fields)
+    version = controller.holiday_service.version
+    key = ("get_for_date", date, granularity, projection)
+    content = cache.get(key, version)
+    if content is not None:
+        return ORJSONResponse(content)
+
     try:
-        return await controller.get_for_date(date)
+        content = encode_json(
+            await controller.get_for_date_rows(date, granularity, projection)
+        )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    cache.put(key, version, content)
+    return ORJSONResponse(content)
 
 
 @date_dimension_router.get("/")
 async def get_ste_day(
+    request: Request,
     start_date: date,
     end_date: date,
+    engine: DateDimensionEngine | None = None,
+    stream: DateDimensionStream | None = None,
+    granularity: GranularityQuery = "hour",
+    parallel: ParallelQuery = None,
+    fields: FieldsQuery = None,
+    limit: Annotated[
+        int | None,
+        Query(
+            ge=1,
+            description="每页最多返回的行数，超过服务端上限时按上限返回。"
+            "有下一页时响应头X-Next-Cursor为下一页的游标",
+        ),
+    ] = None,
+    cursor: Annotated[
+        str | None,
+        Query(description="上一页响应头X-Next-Cursor的值，从该位置继续"),
+    ] = None,
     controller: DateDimensionController = Depends(date_dimension_controller),
+    cache: ResponseCache = Depends(response_cache),
 ) -> list[DateDimension] | None:
-    try:
-        return await controller.get_ste_day(
-            datetime.combine(start_date, datetime.min.time()),
-            datetime.combine(end_date, datetime.min.time()),
+    projection = _fields(fields)
+    # 流式输出不占用整个响应的内存，不分页
+    if stream is not None and (limit is not None or cursor is not None):
+        raise HTTPException(
+            status_code=422, detail="limit and cursor do not apply to stream"
         )
+
+    page = None
+    max_rows = settings.DATE_DIMENSION_MAX_ROWS
+    if stream is None and (
+        limit is not None or cursor is not None or max_rows
+    ):
+        if max_rows:
+            limit = min(limit or max_rows, max_rows)
+        try:
+            page = plan_page(start_date, end_date, granularity, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    headers = _next_page_headers(request, page)
+
+    # 各引擎输出相同，缓存键不包含engine
+    version = controller.holiday_service.version
+    key = (
+        "get_ste_day",
+        start_date,
+        end_date,
+        granularity,
+        stream,
+        projection,
+        limit,
+        cursor,
+    )
+    media_type = STREAM_MEDIA_TYPES.get(stream, "application/json")
+    content = cache.get(key, version)
+    if content is not None:
+        return Response(
+            content=content, media_type=media_type, headers=headers
+        )
+
+    time_start = datetime.combine(start_date, datetime.min.time())
+    time_end = datetime.combine(end_date, datetime.min.time())
+    try:
+        if stream == "ndjson":
+            controller.check_range(
+                time_start, time_end, engine, granularity, parallel
+            )
+            return StreamingResponse(
+                content=cache.capture(
+                    key,
+                    version,
+                    controller.stream_ndjson(
+                        time_start,
+                        time_end,
+                        engine,
+                        granularity,
+                        parallel,
+                        projection,
+                    ),
+                ),
+                media_type=media_type,
+            )
+        if stream == "json":
+            controller.check_range(
+                time_start, time_end, engine, granularity, parallel
+            )
+            return StreamingResponse(
+                content=cache.capture(
+                    key,
+                    version,
+                    controller.stream_json(
+                        time_start,
+                        time_end,
+                        engine,
+                        granularity,
+                        parallel,
+                        projection,
+                    ),
+                ),
+                media_type=media_type,
+            )
+
+        if page is not None:
+            # 分页时只生成当前页，不并行
+            controller.check_range(time_start, time_end, engine, granularity)
+            content = encode_json(
+                await controller.get_ste_day_page(
+                    page, engine, granularity, projection
+                )
+            )
+        elif controller.is_parallel(
+            parallel, engine, time_start, time_end, granularity
+        ):
+            content = b"".join(
+                [
+                    chunk
+                    async for chunk in controller.stream_json(
+                        time_start,
+                        time_end,
+                        engine,
+                        granularity,
+                        parallel,
+                        projection,
+                    )
+                ]
+            )
+        else:
+            content = encode_json(
+                await controller.get_ste_day_rows(
+                    time_start, time_end, engine, granularity, projection
+                )
+            )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    cache.put(key, version, content)
+    return Response(content=content, media_type=media_type, headers=headers)
 
 
 @date_dimension_router.get("/csv", response_class=StreamingResponse)
 async def export_to_csv(
     start_date: date,
     end_date: date,
+    engine: DateDimensionEngine | None = None,
+    granularity: GranularityQuery = "hour",
+    parallel: ParallelQuery = None,
+    fields: FieldsQuery = None,
+    accept_encoding: str | None = Header(default=None),
     controller: DateDimensionController = Depends(date_dimension_controller),
+    cache: ResponseCache = Depends(response_cache),
 ) -> StreamingResponse:
+    projection = _fields(fields)
+    gzip = accepts_gzip(accept_encoding)
+    headers = {
+        "Content-Disposition": "attachment; filename=date-dimension.csv",
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    version = controller.holiday_service.version
+    key = (
+        "export_to_csv",
+        start_date,
+        end_date,
+        granularity,
+        projection,
+        gzip,
+    )
+    content = cache.get(key, version)
+    if content is not None:
+        return Response(
+            content=content, media_type="text/csv", headers=headers
+        )
+
+    time_start = datetime.combine(start_date, datetime.min.time())
+    time_end = datetime.combine(end_date, datetime.min.time())
     try:
+        controller.check_range(
+            time_start, time_end, engine, granularity, parallel
+        )
+        chunks = controller.generate_csv(
+            time_start, time_end, engine, granularity, parallel, projection
+        )
+        if gzip:
+            chunks = gzip_stream(chunks)
+
         return StreamingResponse(
-            content=controller.generate_csv(start_date, end_date),
+            content=cache.capture(key, version, chunks),
             media_type="text/csv",
+            headers=headers,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@date_dimension_router.get("/changes", response_class=StreamingResponse)
+async def export_changes(
+    format: ChangeFormat = "ndjson",
+    granularity: GranularityQuery = "hour",
+    fields: FieldsQuery = None,
+    controller: DateDimensionController = Depends(date_dimension_controller),
+) -> StreamingResponse:
+    """
+    增量导出：比较当前加载的节假日数据与磁盘上的json文件，
+    只输出新增年份与holiday_name/date_type变化的日期的行，第一个字段change为
+    insert或update。删除的年份没有行，在响应头X-Deleted-Years中列出。
+    变化的日期可能很多，响应头中只给出数量，具体日期即各update行的日期
+    """
+    projection = _fields(fields)
+    try:
+        holiday_service, diff = await controller.diff_holidays(
+            settings.HOLIDAY_DATA_DIR
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    headers = {
+        # 内容随磁盘上的json文件变化，不缓存
+        "Cache-Control": "no-store",
+        "X-Holiday-Version": holiday_service.version,
+        "X-Inserted-Years": ",".join(map(str, diff.inserted_years)),
+        "X-Deleted-Years": ",".join(map(str, diff.deleted_years)),
+        "X-Updated-Date-Count": str(len(diff.updated_dates)),
+    }
+    if format == "csv":
+        headers["Content-Disposition"] = (
+            "attachment; filename=date-dimension-changes.csv"
+        )
+    return StreamingResponse(
+        content=controller.generate_changes(
+            holiday_service, diff, format, granularity, projection
+        ),
+        media_type=CHANGE_MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+@date_dimension_router.get("/arrow", response_class=StreamingResponse)
+async def export_to_arrow(
+    start_date: date,
+    end_date: date,
+    granularity: GranularityQuery = "hour",
+    parallel: ParallelQuery = None,
+    controller: DateDimensionController = Depends(date_dimension_controller),
+) -> StreamingResponse:
+    time_start = datetime.combine(start_date, datetime.min.time())
+    time_end = datetime.combine(end_date, datetime.min.time())
+    try:
+        controller.check_range(
+            time_start, time_end, "columnar", granularity, parallel
+        )
+        return StreamingResponse(
+            content=controller.generate_arrow(
+                time_start, time_end, granularity, parallel
+            ),
+            media_type="application/vnd.apache.arrow.stream",
+            headers={
+                "Content-Disposition": "attachment; filename=date-dimension.arrows"
+            },
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@date_dimension_router.get("/parquet", response_class=StreamingResponse)
+async def export_to_parquet(
+    start_date: date,
+    end_date: date,
+    granularity: GranularityQuery = "hour",
+    parallel: ParallelQuery = None,
+    controller: DateDimensionController = Depends(date_dimension_controller),
+) -> StreamingResponse:
+    time_start = datetime.combine(start_date, datetime.min.time())
+    time_end = datetime.combine(end_date, datetime.min.time())
+    try:
+        controller.check_range(
+            time_start, time_end, "columnar", granularity, parallel
+        )
+        return StreamingResponse(
+            content=controller.generate_parquet(
+                time_start, time_end, granularity, parallel
+            ),
+            media_type="application/vnd.apache.parquet",
             headers={
-                "Content-Disposition": "attachment; filename=date-dimension.csv"
+                "Content-Disposition": "attachment; filename=date-dimension.parquet"
             },
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
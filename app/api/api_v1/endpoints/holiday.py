@@ -1,7 +1,9 @@
 from datetime import datetime, date
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 
+from app.core.config import settings
 from app.schemas.holiday import Holiday
 from app.controllers.holiday_controller import (
     HolidayController,
@@ -24,3 +26,40 @@ async def get_for_date(
         raise HTTPException(status_code=404, detail="Holiday not found")
 
     return holiday
+
+
+@holiday_router.post("/batch")
+async def get_for_dates(
+    dates: Annotated[
+        list[date],
+        Body(
+            max_length=settings.HOLIDAY_BATCH_MAX_DATES,
+            description="要查询的日期列表",
+        ),
+    ],
+    controller: HolidayController = Depends(holiday_controller),
+) -> list[Holiday | None]:
+    """
+    批量查询节假日，按请求顺序返回，没有节假日的日期为null
+    """
+    try:
+        return await controller.get_for_dates(dates)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@holiday_router.get("/range")
+async def get_range(
+    start_date: date,
+    end_date: date,
+    controller: HolidayController = Depends(holiday_controller),
+) -> list[Holiday]:
+    """
+    查询日期范围内(含首尾)的所有节假日与调休工作日
+    """
+    try:
+        return await controller.get_range(start_date, end_date)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -0,0 +1,82 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.schemas.workday import Workday, WorkdayCount
+from app.controllers.workday_controller import (
+    WorkdayController,
+    workday_controller,
+)
+
+workday_router = APIRouter()
+
+
+@workday_router.get("/")
+async def is_workday(
+    date: date,
+    controller: WorkdayController = Depends(workday_controller),
+) -> Workday:
+    try:
+        return await controller.is_workday(date)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@workday_router.get("/count")
+async def count_workdays(
+    start_date: date,
+    end_date: date,
+    controller: WorkdayController = Depends(workday_controller),
+) -> WorkdayCount:
+    """
+    日期范围内(含首尾)的工作日数
+    """
+    try:
+        return await controller.count_workdays(start_date, end_date)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@workday_router.get("/add")
+async def add_workdays(
+    date: date,
+    days: int,
+    controller: WorkdayController = Depends(workday_controller),
+) -> Workday:
+    """
+    date之后第days个工作日，days为负数时为之前第-days个工作日
+    """
+    try:
+        return await controller.add_workdays(date, days)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@workday_router.get("/next")
+async def next_workday(
+    date: date,
+    controller: WorkdayController = Depends(workday_controller),
+) -> Workday:
+    """
+    date之后的第一个工作日(不含date)
+    """
+    try:
+        return await controller.next_workday(date)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@workday_router.get("/previous")
+async def previous_workday(
+    date: date,
+    controller: WorkdayController = Depends(workday_controller),
+) -> Workday:
+    """
+    date之前的最后一个工作日(不含date)
+    """
+    try:
+        return await controller.previous_workday(date)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
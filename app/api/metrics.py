@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import CONTENT_TYPE, metrics, render_response_cache
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False
+)
+async def get_metrics(request: Request) -> PlainTextResponse:
+    """
+    Prometheus文本格式的指标，仅在METRICS_ENABLED开启时注册
+    """
+    return PlainTextResponse(
+        metrics.render(
+            render_response_cache(request.app.state.response_cache.stats())
+        ),
+        media_type=CONTENT_TYPE,
+    )
@@ -1,52 +1,494 @@
+import asyncio
 from datetime import datetime
-from typing import AsyncGenerator, Generator
+from itertools import islice
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    AsyncGenerator,
+    Callable,
+    Generator,
+    Iterator,
+)
 
-from app.schemas.date_dimension import DateDimension
+from fastapi import Request
+
+from app.core.metrics import timed_stream
+from app.core.responses import (
+    CSV_CHUNK_ROWS,
+    STREAM_CHUNK_ROWS,
+    dumps_csv,
+)
+from app.schemas.date_dimension import (
+    CSV_FIELDS,
+    DateDimension,
+    DateDimensionEngine,
+    DateDimensionRow,
+    Fields,
+)
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+)
 from app.services.date_dimension_service import DateDimensionService
+from app.services.date_dimension_store import DateDimensionStore
+from app.services.granularity import get_slots
+from app.services.holiday_diff_service import (
+    ChangeFormat,
+    HolidayDiff,
+    change_row_type,
+    changes_encoder,
+    diff_holidays,
+    iter_changes,
+    load_holidays,
+    version_of,
+)
 from app.services.holiday_service import HolidayService
+from app.services.pagination import Page
+from app.services.parallel_date_dimension_service import (
+    ChunkFormat,
+    GenerationPool,
+    ParallelDateDimensionService,
+    rows_encoder,
+)
+
+if TYPE_CHECKING:
+    from app.services.date_dimension_arrow_service import (
+        DateDimensionArrowService,
+    )
 
 
 class DateDimensionController(object):
-    def __init__(self):
-        self.holiday_service = HolidayService()
+    def __init__(
+        self,
+        holiday_service: HolidayService,
+        date_dimension_store: DateDimensionStore | None = None,
+        generation_pool: GenerationPool | None = None,
+    ):
+        self.holiday_service = holiday_service
+        self.date_dimension_store = date_dimension_store
+        self.generation_pool = generation_pool
         self.date_dimension_service = DateDimensionService(
             self.holiday_service
         )
+        self.columnar_date_dimension_service = ColumnarDateDimensionService(
+            self.holiday_service
+        )
 
-    async def get_for_date(self, date: datetime) -> list[DateDimension] | None:
-        return [
-            d async for d in self.date_dimension_service.get_for_date(date)
-        ]
+    def __range_service(
+        self,
+        engine: DateDimensionEngine | None,
+        time_start: datetime,
+        time_end: datetime,
+    ) -> (
+        DateDimensionService
+        | ColumnarDateDimensionService
+        | DateDimensionStore
+    ):
+        """
+        选择生成日期维度的引擎。未指定时，预计算的表覆盖该日期范围则直接切片，
+        否则逐行生成
+        """
+        if engine is None:
+            store = self.date_dimension_store
+            if store is not None and store.covers(time_start, time_end):
+                return store
+            return self.date_dimension_service
+
+        if engine == "store":
+            if self.date_dimension_store is None:
+                raise FileNotFoundError("date dimension store not available")
+            return self.date_dimension_store
+        if engine == "columnar":
+            return self.columnar_date_dimension_service
+        return self.date_dimension_service
+
+    def __parallel_service(
+        self,
+        parallel: bool | None,
+        engine: DateDimensionEngine | None,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str,
+    ) -> ParallelDateDimensionService | None:
+        """
+        是否在进程池中并行生成。未指定时，未指定引擎且行数达到
+        GenerationPool.min_rows则并行；指定parallel时忽略engine
+
+        Raises:
+            ValueError: 指定并行但未启用进程池
+        """
+        pool = self.generation_pool
+        if parallel is None:
+            if pool is None or pool.min_rows <= 0 or engine is not None:
+                return None
+            days = (time_end - time_start).days + 1
+            if days * len(get_slots(granularity)) < pool.min_rows:
+                return None
+        elif not parallel:
+            return None
+        elif pool is None:
+            raise ValueError("parallel generation is not enabled")
+
+        return ParallelDateDimensionService(pool, self.holiday_service)
+
+    def is_parallel(
+        self,
+        parallel: bool | None,
+        engine: DateDimensionEngine | None,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+    ) -> bool:
+        """
+        是否在进程池中并行生成
+
+        Raises:
+            ValueError: 指定并行但未启用进程池
+        """
+        return (
+            self.__parallel_service(
+                parallel, engine, time_start, time_end, granularity
+            )
+            is not None
+        )
+
+    def check_range(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        engine: DateDimensionEngine | None = None,
+        granularity: str = "hour",
+        parallel: bool | None = None,
+    ) -> None:
+        """
+        在开始流式输出前检查数据是否覆盖日期范围，响应一旦开始就无法再返回404
+
+        Raises:
+            FileNotFoundError: 缺少节假日数据或超出预计算表的范围
+            ValueError: 不支持的粒度，或指定并行但未启用进程池
+        """
+        get_slots(granularity)
+        self.holiday_service.check_range(time_start, time_end)
+        if self.is_parallel(
+            parallel, engine, time_start, time_end, granularity
+        ):
+            return
+        service = self.__range_service(engine, time_start, time_end)
+        if isinstance(service, DateDimensionStore):
+            service.check_range(time_start, time_end)
+
+    async def get_for_date(
+        self, date: datetime, granularity: str = "hour"
+    ) -> list[DateDimension] | None:
+        service = self.__range_service(None, date, date)
+        return [d async for d in service.get_for_date(date, granularity)]
 
     async def get_ste_day(
-        self, time_start: datetime, time_end: datetime
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        engine: DateDimensionEngine | None = None,
+        granularity: str = "hour",
     ) -> list[DateDimension] | None:
+        service = self.__range_service(engine, time_start, time_end)
         return [
             d
-            async for d in self.date_dimension_service.get_ste_day(
-                time_start, time_end
+            async for d in service.get_ste_day(
+                time_start, time_end, granularity
             )
         ]
 
+    async def get_for_date_rows(
+        self, date: datetime, granularity: str = "hour", fields: Fields = None
+    ) -> list[DateDimensionRow]:
+        """
+        与get_for_date相同，但返回未经pydantic校验的行，用于直接编码为JSON。
+        指定fields时只计算并返回这些字段
+        """
+        service = self.__range_service(None, date, date)
+        return await asyncio.to_thread(
+            list, service.iter_for_date(date, granularity, fields)
+        )
+
+    async def get_ste_day_rows(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        engine: DateDimensionEngine | None = None,
+        granularity: str = "hour",
+        fields: Fields = None,
+    ) -> list[DateDimensionRow]:
+        """
+        与get_ste_day相同，但返回未经pydantic校验的行，用于直接编码为JSON。
+        指定fields时只计算并返回这些字段
+        """
+        service = self.__range_service(engine, time_start, time_end)
+        # 同步迭代器在线程中取完，生成期间不阻塞事件循环
+        return await asyncio.to_thread(
+            list,
+            service.iter_range(
+                time_start, time_end, granularity, fields=fields
+            ),
+        )
+
+    async def get_ste_day_page(
+        self,
+        page: Page,
+        engine: DateDimensionEngine | None = None,
+        granularity: str = "hour",
+        fields: Fields = None,
+    ) -> list[DateDimensionRow]:
+        """
+        返回一页的行，从page.first_day的第page.first_slot个时间段开始，
+        最多page.limit行。分页总是在当前进程中生成
+        """
+        time_start = datetime.combine(page.first_day, datetime.min.time())
+        time_end = datetime.combine(page.last_day, datetime.min.time())
+        service = self.__range_service(engine, time_start, time_end)
+        rows = service.iter_range(
+            time_start, time_end, granularity, page.first_slot, fields
+        )
+        return await asyncio.to_thread(list, islice(rows, page.limit))
+
+    @timed_stream("encode.ndjson", unit="bytes")
+    async def stream_ndjson(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        engine: DateDimensionEngine | None = None,
+        granularity: str = "hour",
+        parallel: bool | None = None,
+        fields: Fields = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        以NDJSON格式流式输出，每行一个DateDimension，指定fields时只包含这些字段
+        """
+        async for chunk in self.__encode_chunks(
+            time_start,
+            time_end,
+            engine,
+            granularity,
+            parallel,
+            "ndjson",
+            fields,
+        ):
+            yield chunk
+
+    @timed_stream("encode.json_stream", unit="bytes")
+    async def stream_json(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        engine: DateDimensionEngine | None = None,
+        granularity: str = "hour",
+        parallel: bool | None = None,
+        fields: Fields = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        以JSON数组格式分块流式输出，与一次性返回的列表内容一致
+        """
+        separator = b"["
+        async for chunk in self.__encode_chunks(
+            time_start,
+            time_end,
+            engine,
+            granularity,
+            parallel,
+            "json",
+            fields,
+        ):
+            yield separator + chunk
+            separator = b","
+
+        yield b"[]" if separator == b"[" else b"]"
+
+    async def __encode_chunks(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        engine: DateDimensionEngine | None,
+        granularity: str,
+        parallel: bool | None,
+        chunk_format: ChunkFormat,
+        fields: Fields,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        按块生成并编码。并行时每块为一年或一个月，在进程池中生成与编码；
+        否则在当前进程中每STREAM_CHUNK_ROWS(CSV为CSV_CHUNK_ROWS)行编码一次
+        """
+        parallel_service = self.__parallel_service(
+            parallel, engine, time_start, time_end, granularity
+        )
+        if parallel_service is not None:
+            async for chunk in parallel_service.stream(
+                time_start, time_end, granularity, chunk_format, fields
+            ):
+                yield chunk
+            return
+
+        chunk_rows = (
+            CSV_CHUNK_ROWS if chunk_format == "csv" else STREAM_CHUNK_ROWS
+        )
+        service = self.__range_service(engine, time_start, time_end)
+        # 直接从同步迭代器取行，每块在线程中生成与编码，不阻塞事件循环
+        rows = service.iter_range(
+            time_start, time_end, granularity, fields=fields
+        )
+        encode = rows_encoder(chunk_format, fields)
+        while (
+            chunk := await asyncio.to_thread(
+                _encode_next, rows, chunk_rows, encode
+            )
+        ) is not None:
+            yield chunk
+
+    @timed_stream("encode.csv", unit="bytes")
     async def generate_csv(
-        self, time_start: datetime, time_end: datetime
-    ) -> AsyncGenerator[DateDimension, None]:
-        # 动态获取属性名作为表头
-
-        yield ",".join(
-            field_name for field_name in DateDimension.model_fields.keys()
-        ).encode("utf-8")
-
-        yield "\n"
-        # 写入数据
-        async for d in self.date_dimension_service.get_ste_day(
-            time_start, time_end
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        engine: DateDimensionEngine | None = None,
+        granularity: str = "hour",
+        parallel: bool | None = None,
+        fields: Fields = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        以CSV格式流式输出，第一个chunk为表头，指定fields时只包含这些列
+        """
+        # DateDimensionRow(或投影后的行)的字段顺序即为表头顺序
+        yield dumps_csv([fields or CSV_FIELDS])
+        async for chunk in self.__encode_chunks(
+            time_start,
+            time_end,
+            engine,
+            granularity,
+            parallel,
+            "csv",
+            fields,
         ):
-            yield ",".join(str(v) for v in d.model_dump().values()).encode(
-                "utf-8"
+            yield chunk
+
+    async def diff_holidays(
+        self, data_dir: Path
+    ) -> tuple[HolidayService, HolidayDiff]:
+        """
+        比较当前加载的节假日数据与data_dir下的json文件，
+        返回按data_dir新加载的节假日数据(不使用快照)与差异
+
+        Raises:
+            FileNotFoundError: data_dir不存在或没有节假日json文件
+        """
+        holiday_service = await asyncio.to_thread(load_holidays, data_dir)
+        return holiday_service, diff_holidays(
+            version_of(self.holiday_service), version_of(holiday_service)
+        )
+
+    @timed_stream("encode.changes", unit="bytes")
+    async def generate_changes(
+        self,
+        holiday_service: HolidayService,
+        diff: HolidayDiff,
+        chunk_format: ChangeFormat = "ndjson",
+        granularity: str = "hour",
+        fields: Fields = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        增量导出：只输出diff中新增年份与变化日期的行，第一个字段为change。
+        CSV的第一个chunk为表头
+        """
+        if chunk_format == "csv":
+            yield dumps_csv([change_row_type(fields)._fields])
+        chunk_rows = (
+            CSV_CHUNK_ROWS if chunk_format == "csv" else STREAM_CHUNK_ROWS
+        )
+        rows = iter_changes(holiday_service, diff, granularity, fields)
+        encode = changes_encoder(chunk_format, fields)
+        while (
+            chunk := await asyncio.to_thread(
+                _encode_next, rows, chunk_rows, encode
+            )
+        ) is not None:
+            yield chunk
+
+    def __arrow_service(self) -> "DateDimensionArrowService":
+        # pyarrow导入较慢，只在第一次导出Arrow/Parquet时导入
+        from app.services.date_dimension_arrow_service import (
+            DateDimensionArrowService,
+        )
+
+        return DateDimensionArrowService(
+            self.holiday_service, self.date_dimension_store
+        )
+
+    @timed_stream("encode.arrow", unit="bytes")
+    async def generate_arrow(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+        parallel: bool | None = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        以Arrow IPC流格式输出
+        """
+        from app.services.date_dimension_arrow_service import write_ipc
+
+        parallel_service = self.__parallel_service(
+            parallel, None, time_start, time_end, granularity
+        )
+        if parallel_service is None:
+            chunks = self.__arrow_service().stream_ipc(
+                time_start, time_end, granularity
+            )
+        else:
+            chunks = write_ipc(
+                parallel_service.stream(
+                    time_start, time_end, granularity, "columns"
+                )
             )
-            yield "\n"
+        async for chunk in chunks:
+            yield chunk
+
+    @timed_stream("encode.parquet", unit="bytes")
+    async def generate_parquet(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+        parallel: bool | None = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        以Parquet格式输出
+        """
+        from app.services.date_dimension_arrow_service import write_parquet
+
+        parallel_service = self.__parallel_service(
+            parallel, None, time_start, time_end, granularity
+        )
+        if parallel_service is None:
+            chunks = self.__arrow_service().stream_parquet(
+                time_start, time_end, granularity
+            )
+        else:
+            chunks = write_parquet(
+                parallel_service.stream(
+                    time_start, time_end, granularity, "columns"
+                )
+            )
+        async for chunk in chunks:
+            yield chunk
+
+
+def _encode_next(
+    rows: Iterator[tuple], chunk_rows: int, encode: Callable[[list], bytes]
+) -> bytes | None:
+    """取下一块行并编码，没有剩余的行时为None"""
+    chunk = list(islice(rows, chunk_rows))
+    return encode(chunk) if chunk else None
 
 
-def date_dimension_controller():
-    return DateDimensionController()
+def date_dimension_controller(request: Request) -> DateDimensionController:
+    return DateDimensionController(
+        request.app.state.holiday_service,
+        request.app.state.date_dimension_store,
+        request.app.state.generation_pool,
+    )
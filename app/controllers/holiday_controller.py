@@ -1,17 +1,29 @@
-from datetime import datetime
-from pathlib import Path
+from datetime import date, datetime
+
+from fastapi import Request
 
 from app.services.holiday_service import HolidayService
 from app.schemas.holiday import Holiday
 
 
 class HolidayController(object):
-    def __init__(self):
-        self.holiday_service = HolidayService()
+    def __init__(self, holiday_service: HolidayService):
+        self.holiday_service = holiday_service
 
     async def get_for_date(self, date: datetime) -> Holiday | None:
-        return await self.holiday_service.get_for_date(date)
+        return self.holiday_service.get_for_date(date)
+
+    async def get_for_dates(self, dates: list[date]) -> list[Holiday | None]:
+        return self.holiday_service.get_for_dates(dates)
+
+    async def get_range(
+        self, time_start: date, time_end: date
+    ) -> list[Holiday]:
+        if time_start > time_end:
+            raise ValueError("start_date must not be after end_date")
+
+        return self.holiday_service.get_range(time_start, time_end)
 
 
-def holiday_controller() -> Holiday | None:
-    return HolidayController()
+def holiday_controller(request: Request) -> HolidayController:
+    return HolidayController(request.app.state.holiday_service)
@@ -0,0 +1,45 @@
+from datetime import date
+
+from fastapi import Request
+
+from app.schemas.workday import Workday, WorkdayCount
+from app.services.workday_service import WorkdayService
+
+
+class WorkdayController(object):
+    def __init__(self, workday_service: WorkdayService):
+        self.workday_service = workday_service
+
+    async def is_workday(self, date: date) -> Workday:
+        return Workday(
+            date=date, is_workday=self.workday_service.is_workday(date)
+        )
+
+    async def count_workdays(
+        self, time_start: date, time_end: date
+    ) -> WorkdayCount:
+        return WorkdayCount(
+            start_date=time_start,
+            end_date=time_end,
+            workdays=self.workday_service.count_workdays(time_start, time_end),
+        )
+
+    async def add_workdays(self, date: date, days: int) -> Workday:
+        result = self.workday_service.add_workdays(date, days)
+        return Workday(
+            date=result, is_workday=self.workday_service.is_workday(result)
+        )
+
+    async def next_workday(self, date: date) -> Workday:
+        return Workday(
+            date=self.workday_service.next_workday(date), is_workday=True
+        )
+
+    async def previous_workday(self, date: date) -> Workday:
+        return Workday(
+            date=self.workday_service.previous_workday(date), is_workday=True
+        )
+
+
+def workday_controller(request: Request) -> WorkdayController:
+    return WorkdayController(request.app.state.workday_service)
@@ -0,0 +1,38 @@
+import zlib
+from typing import AsyncGenerator, AsyncIterable
+
+# gzip压缩级别，流式输出时兼顾速度与压缩率
+GZIP_LEVEL = 6
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """
+    解析Accept-Encoding请求头，判断客户端是否接受gzip
+    """
+    if not accept_encoding:
+        return False
+
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        q = params.strip().removeprefix("q=").strip()
+        try:
+            return not q or float(q) > 0
+        except ValueError:
+            return False
+    return False
+
+
+async def gzip_stream(
+    chunks: AsyncIterable[bytes], level: int = GZIP_LEVEL
+) -> AsyncGenerator[bytes, None]:
+    """
+    对异步生成的字节流逐块进行gzip压缩
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
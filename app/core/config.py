@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class Settings(BaseModel):
+    """
+    应用配置，可通过同名环境变量覆盖
+    """
+
+    # holiday-cn节假日数据目录
+    HOLIDAY_DATA_DIR: Path = Path.cwd() / "holiday-cn"
+    # holiday-cn编译后的二进制快照，与json文件版本不一致时回退为解析json
+    HOLIDAY_SNAPSHOT: Path = Path.cwd() / "data" / "holiday-cn.snapshot"
+    # 预计算的日期维度表文件，启动时若不存在或已过期则重新生成
+    DATE_DIMENSION_STORE: Path = Path.cwd() / "data" / "date-dimension.store"
+    # load_sqlite.py默认写入的SQLite数据库文件
+    DATE_DIMENSION_SQLITE: Path = Path.cwd() / "data" / "date-dimension.sqlite"
+    # 节假日与日期维度接口的HTTP缓存时间(秒)
+    HTTP_CACHE_MAX_AGE: int = 3600
+    # 服务端响应缓存的总字节预算，以及单个响应的上限
+    RESPONSE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 32 * 1024 * 1024
+    # 批量查询节假日接口单次请求的最大日期数
+    HOLIDAY_BATCH_MAX_DATES: int = 100_000
+    # 日期维度接口非流式响应单页最多返回的行数，超过时分页，0为不限制
+    DATE_DIMENSION_MAX_ROWS: int = 50_000
+    # 每隔多少秒检查一次holiday-cn目录，有变化时热加载，0为不检查。
+    # production模式下总是检查，为0时使用PRODUCTION_RELOAD_INTERVAL
+    HOLIDAY_RELOAD_INTERVAL: float = 0
+    PRODUCTION_RELOAD_INTERVAL: float = 5
+    # 管理接口(如/api/v1/admin/reload)的访问令牌，为空时管理接口不可用
+    ADMIN_TOKEN: str = ""
+    # 是否记录各阶段耗时等指标并提供/metrics接口，关闭时没有额外开销
+    METRICS_ENABLED: bool = False
+    # 并行生成日期维度的进程数，每个worker进程一个进程池，0为不启用
+    GENERATION_WORKERS: int = 0
+    # 并行生成时按自然年或自然月切分日期范围
+    GENERATION_CHUNK: Literal["year", "month"] = "month"
+    # 未指定parallel时，行数达到该值则自动并行生成，0为只在请求指定时并行
+    GENERATION_PARALLEL_MIN_ROWS: int = 100_000
+
+    # 运行模式：development为单进程自动重载，
+    # production为多worker、预加载数据后fork、不自动重载
+    SERVER_PROFILE: Literal["development", "production"] = "development"
+    HOST: str = "0.0.0.0"
+    PORT: int = 8088
+    # production模式的worker数，0为CPU核数
+    WORKERS: int = 0
+    # 日志级别，为空时development为DEBUG、production为INFO
+    LOG_LEVEL: str = ""
+    # 逐行生成等热点路径上的debug日志，默认关闭；开启后每N次输出一次
+    HOT_PATH_LOG: bool = False
+    HOT_PATH_LOG_SAMPLE: int = 1
+
+    @property
+    def log_level(self) -> str:
+        if self.LOG_LEVEL:
+            return self.LOG_LEVEL.upper()
+        return "DEBUG" if self.SERVER_PROFILE == "development" else "INFO"
+
+    @property
+    def reload_interval(self) -> float:
+        """
+        production模式有多个worker，管理接口只会重新加载收到请求的那一个，
+        其余worker靠定期检查目录跟上，因此不能关闭
+        """
+        if self.SERVER_PROFILE == "production":
+            return (
+                self.HOLIDAY_RELOAD_INTERVAL or self.PRODUCTION_RELOAD_INTERVAL
+            )
+        return self.HOLIDAY_RELOAD_INTERVAL
+
+    @property
+    def workers(self) -> int:
+        return self.WORKERS or os.cpu_count() or 1
+
+
+settings = Settings(
+    **{k: v for k, v in os.environ.items() if k in Settings.model_fields}
+)
@@ -0,0 +1,134 @@
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.compression import accepts_gzip
+
+
+class HttpCacheMiddleware(object):
+    """
+    为GET接口添加强ETag与Cache-Control/Last-Modified响应头。
+    ETag由请求路径、查询参数与已加载节假日数据的版本计算，
+    If-None-Match命中时在进入路由之前直接返回304，不做任何生成工作；
+    If-Modified-Since只在路由返回200之后判断。
+    exclude中的路径(如内容取决于磁盘上的文件而不是已加载数据的接口)不做处理。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        prefixes: tuple[str, ...],
+        max_age: int,
+        exclude: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.prefixes = prefixes
+        self.max_age = max_age
+        self.exclude = exclude
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not scope["path"].startswith(self.prefixes)
+            or scope["path"].startswith(self.exclude)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        holiday_service = scope["app"].state.holiday_service
+        request_headers = Headers(scope=scope)
+        etag = _etag(scope, request_headers, holiday_service.version)
+        cache_headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", f"public, max-age={self.max_age}".encode()),
+        ]
+        last_modified = holiday_service.last_modified
+        if last_modified is not None:
+            cache_headers.append(
+                (
+                    b"last-modified",
+                    format_datetime(last_modified, usegmt=True).encode(),
+                )
+            )
+
+        # 只有ETag完全一致时才在进入路由之前返回304：
+        # 客户端只会从之前的200响应中得到ETag，数据版本不变时路由的结果也不变
+        if _etag_matches(request_headers, etag):
+            await _send_not_modified(send, cache_headers)
+            return
+
+        # If-Modified-Since在路由生成响应之后判断，404、422等错误不会变为304
+        modified_since = _if_modified_since(request_headers)
+        not_modified = False
+
+        async def send_with_cache_headers(message: Message):
+            nonlocal not_modified
+            if message["type"] == "http.response.start" and (
+                message["status"] == 200
+            ):
+                if (
+                    modified_since is not None
+                    and last_modified is not None
+                    and last_modified <= modified_since
+                ):
+                    not_modified = True
+                    await _send_not_modified(send, cache_headers)
+                    return
+                message["headers"] = [
+                    *message.get("headers", []),
+                    *cache_headers,
+                ]
+            elif not_modified:
+                # 已经返回304，丢弃路由输出的响应体
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_headers)
+
+
+def _etag(scope: Scope, headers: Headers, version: str) -> str:
+    """
+    强ETag：参数顺序无关；gzip压缩后的内容不同，单独区分
+    """
+    query = sorted(parse_qsl(scope["query_string"].decode("latin-1")))
+    gzip = accepts_gzip(headers.get("accept-encoding"))
+    digest = hashlib.sha256(
+        f"{version}\n{scope['path']}\n{query}\n{gzip}".encode()
+    )
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+async def _send_not_modified(send: Send, cache_headers: list) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 304,
+            "headers": cache_headers,
+        }
+    )
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _etag_matches(headers: Headers, etag: str) -> bool:
+    # "*"不作为命中处理：进入路由之前无法判断资源是否存在(可能是404)
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag in tags
+
+
+def _if_modified_since(headers: Headers) -> datetime | None:
+    # 有If-None-Match时忽略If-Modified-Since
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or "if-none-match" in headers:
+        return None
+    try:
+        return parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,46 @@
+import sys
+from itertools import count
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+def configure_logging() -> None:
+    """
+    按配置设置loguru的输出：控制台与按大小滚动的日志文件，级别为LOG_LEVEL
+    """
+    logger.remove()
+    logger.add(sys.stderr, level=settings.log_level)
+    logger.add(
+        "./logs/api_debug.log",
+        rotation="500MB",
+        encoding="utf-8",
+        enqueue=True,
+        retention="7 days",
+        level=settings.log_level,
+    )
+
+
+class SampledLogger(object):
+    """
+    热点路径上的debug日志，每sample次调用只输出一次。
+    消息使用loguru的"{}"占位符，未输出时不做字符串格式化
+    """
+
+    def __init__(self, sample: int):
+        self.sample = max(sample, 1)
+        self.__calls = count()
+
+    def debug(self, message: str, *args) -> None:
+        if next(self.__calls) % self.sample == 0:
+            logger.opt(depth=1).debug(message, *args)
+
+
+# 未开启HOT_PATH_LOG时为None，调用处以`if hot_path_log is not None`跳过，
+# 不调用任何函数也不格式化消息
+hot_path_log: SampledLogger | None = (
+    SampledLogger(settings.HOT_PATH_LOG_SAMPLE)
+    if settings.HOT_PATH_LOG
+    else None
+)
@@ -0,0 +1,254 @@
+import threading
+from functools import wraps
+from time import perf_counter
+from typing import AsyncGenerator, Callable, Iterator
+
+from app.core.config import settings
+
+# 阶段耗时直方图的桶(秒)，覆盖单次查询的微秒级到整段导出的数十秒
+STAGE_BUCKETS = (
+    0.00001,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    30.0,
+)
+
+PREFIX = "holiday_api"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram(object):
+    """按stage标签分组的直方图"""
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # stage -> (各桶计数(不累加), 总和, 次数)
+        self.__samples: dict[str, list] = {}
+        self.__lock = threading.Lock()
+
+    def observe(self, stage: str, value: float) -> None:
+        with self.__lock:
+            sample = self.__samples.get(stage)
+            if sample is None:
+                sample = [[0] * len(self.buckets), 0.0, 0]
+                self.__samples[stage] = sample
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample[0][i] += 1
+                    break
+            sample[1] += value
+            sample[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.__lock:
+            samples = {
+                stage: (list(counts), total, count)
+                for stage, (counts, total, count) in self.__samples.items()
+            }
+        for stage, (counts, total, count) in sorted(samples.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(
+                    f'{self.name}_bucket{{stage="{stage}",le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(
+                f'{self.name}_bucket{{stage="{stage}",le="+Inf"}} {count}'
+            )
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {count}')
+        return lines
+
+
+class Counter(object):
+    """按stage标签分组的计数器"""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.__values: dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def inc(self, stage: str, amount: int = 1) -> None:
+        with self.__lock:
+            self.__values[stage] = self.__values.get(stage, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self.__lock:
+            values = dict(self.__values)
+        for stage, value in sorted(values.items()):
+            lines.append(f'{self.name}{{stage="{stage}"}} {value}')
+        return lines
+
+
+class MetricsRegistry(object):
+    """
+    各阶段的耗时、生成的行数与流式输出的字节数
+    """
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            f"{PREFIX}_stage_seconds",
+            "Latency of each instrumented stage in seconds.",
+            STAGE_BUCKETS,
+        )
+        self.rows = Counter(
+            f"{PREFIX}_rows_total", "Date dimension rows generated."
+        )
+        self.bytes = Counter(
+            f"{PREFIX}_bytes_streamed_total", "Response bytes streamed."
+        )
+
+    def render(self, extra: list[str] | None = None) -> str:
+        lines = [
+            *self.stage_seconds.render(),
+            *self.rows.render(),
+            *self.bytes.render(),
+            *(extra or []),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+# METRICS_ENABLED关闭时为None，下面的装饰器直接返回原函数，没有任何开销
+metrics: MetricsRegistry | None = (
+    MetricsRegistry() if settings.METRICS_ENABLED else None
+)
+
+
+def timed(
+    stage: str, registry: MetricsRegistry | None = None
+) -> Callable[[Callable], Callable]:
+    """
+    记录函数每次调用的耗时
+    """
+    registry = metrics if registry is None else registry
+
+    def decorator(func: Callable) -> Callable:
+        if registry is None:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.stage_seconds.observe(stage, perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_stream(
+    stage: str,
+    unit: str | None = None,
+    registry: MetricsRegistry | None = None,
+) -> Callable[[Callable], Callable]:
+    """
+    记录异步生成器从开始到结束的耗时(包括等待下游读取的时间)，
+    unit为rows时累计输出的行数，为bytes时累计输出的字节数
+    """
+    registry = metrics if registry is None else registry
+
+    def decorator(func: Callable) -> Callable:
+        if registry is None:
+            return func
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> AsyncGenerator:
+            start = perf_counter()
+            n = 0
+            try:
+                async for item in func(*args, **kwargs):
+                    n += len(item) if unit == "bytes" else 1
+                    yield item
+            finally:
+                registry.stage_seconds.observe(stage, perf_counter() - start)
+                if unit == "rows":
+                    registry.rows.inc(stage, n)
+                elif unit == "bytes":
+                    registry.bytes.inc(stage, n)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(
+    stage: str,
+    unit: str | None = None,
+    registry: MetricsRegistry | None = None,
+) -> Callable[[Callable], Callable]:
+    """
+    与timed_stream相同，用于同步的生成器
+    """
+    registry = metrics if registry is None else registry
+
+    def decorator(func: Callable) -> Callable:
+        if registry is None:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> Iterator:
+            start = perf_counter()
+            n = 0
+            try:
+                for item in func(*args, **kwargs):
+                    n += len(item) if unit == "bytes" else 1
+                    yield item
+            finally:
+                registry.stage_seconds.observe(stage, perf_counter() - start)
+                if unit == "rows":
+                    registry.rows.inc(stage, n)
+                elif unit == "bytes":
+                    registry.bytes.inc(stage, n)
+
+        return wrapper
+
+    return decorator
+
+
+def render_response_cache(stats: dict[str, int]) -> list[str]:
+    """
+    响应缓存的命中、未命中与淘汰次数，抓取时直接读取，不在请求路径上计数
+    """
+    lines = []
+    for key, metric_type in (
+        ("hits", "counter"),
+        ("misses", "counter"),
+        ("evictions", "counter"),
+        ("entries", "gauge"),
+        ("size", "gauge"),
+    ):
+        name = f"{PREFIX}_response_cache_{key}"
+        if metric_type == "counter":
+            name += "_total"
+        elif key == "size":
+            name += "_bytes"
+        lines += [
+            f"# TYPE {name} {metric_type}",
+            f"{name} {stats[key]}",
+        ]
+    return lines
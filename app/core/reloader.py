@@ -0,0 +1,153 @@
+import asyncio
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from fastapi import Request
+from loguru import logger
+from starlette.datastructures import State
+
+from app.services.date_dimension_store import DateDimensionStore
+from app.services.holiday_service import HolidayService
+from app.services.workday_service import WorkdayService
+
+try:
+    import fcntl
+except ImportError:  # Windows上没有fcntl，只能单进程运行
+    fcntl = None
+
+
+class HolidayDataReloader(object):
+    """
+    节假日数据热加载。新的节假日索引、工作日表与日期维度表在线程中完整构建，
+    构建完成后在事件循环中一次性替换app.state上的引用，再清空响应缓存。
+    替换前进入的请求继续使用旧的对象，不会看到只加载了一半的数据，
+    请求处理也不会因为加载而阻塞。
+    多个worker进程之间用文件锁互斥地加载：第一个发现数据变化的worker
+    生成日期维度表与快照，其余worker随后直接打开已生成的文件。
+    """
+
+    def __init__(
+        self,
+        state: State,
+        data_dir: Path,
+        store_path: Path,
+        snapshot_path: Path | None = None,
+    ):
+        self.state = state
+        self.data_dir = data_dir
+        self.store_path = store_path
+        self.snapshot_path = snapshot_path
+        self.lock_path = store_path.with_name(f"{store_path.name}.lock")
+        self.__lock = asyncio.Lock()
+
+    def load(self) -> None:
+        """
+        启动时同步加载全部数据
+        """
+        with _file_lock(self.lock_path):
+            self.__swap(
+                *self.__build(
+                    HolidayService(self.data_dir, self.snapshot_path)
+                )
+            )
+
+    async def reload(self) -> bool:
+        """
+        重新加载节假日数据，数据版本没有变化时不做替换
+
+        Returns:
+            bool: 是否替换了数据
+        """
+        async with self.__lock:
+            data = await asyncio.to_thread(self.__load_if_changed)
+            if data is None:
+                return False
+
+            self.__swap(*data)
+            self.state.response_cache.clear()
+            return True
+
+    def __load_if_changed(
+        self,
+    ) -> (
+        tuple[HolidayService, WorkdayService, DateDimensionStore | None] | None
+    ):
+        # 在文件锁内加载：其他worker已生成新版本的快照与日期维度表时直接打开
+        with _file_lock(self.lock_path):
+            holiday_service = HolidayService(self.data_dir, self.snapshot_path)
+            if holiday_service.version == self.state.holiday_service.version:
+                return None
+            return self.__build(holiday_service)
+
+    async def watch(self, interval: float) -> None:
+        """
+        每隔interval秒检查holiday-cn目录，文件有变化时重新加载
+        """
+        fingerprint = self.state.holiday_service.fingerprint()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                current = await asyncio.to_thread(
+                    self.state.holiday_service.fingerprint
+                )
+                if current != fingerprint:
+                    await self.reload()
+                    fingerprint = current
+            except Exception as e:
+                # 文件正在写入等情况下加载失败，保留旧数据，下次再试
+                logger.exception(f"holiday-cn reload failed: {e}")
+
+    def __build(
+        self,
+        holiday_service: HolidayService,
+    ) -> tuple[HolidayService, WorkdayService, DateDimensionStore | None]:
+        # 快照过期(或json文件签名变化)时更新快照，下次启动只读取快照
+        if (
+            self.snapshot_path is not None
+            and holiday_service.snapshot_stale
+            and holiday_service.years
+        ):
+            holiday_service.write_snapshot(self.snapshot_path)
+
+        return (
+            holiday_service,
+            WorkdayService(holiday_service),
+            DateDimensionStore.open_or_build(holiday_service, self.store_path),
+        )
+
+    def __swap(
+        self,
+        holiday_service: HolidayService,
+        workday_service: WorkdayService,
+        date_dimension_store: DateDimensionStore | None,
+    ) -> None:
+        # 中间没有await，其他请求只会看到替换前或替换后的全部对象
+        self.state.holiday_service = holiday_service
+        self.state.workday_service = workday_service
+        self.state.date_dimension_store = date_dimension_store
+        logger.info(
+            f"holiday-cn loaded: {sorted(holiday_service.years)} "
+            f"(version {holiday_service.version[:12]}, "
+            f"from {holiday_service.loaded_from})"
+        )
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """多个进程之间的互斥锁，进程退出时自动释放"""
+    if fcntl is None:
+        yield
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def holiday_data_reloader(request: Request) -> HolidayDataReloader:
+    return request.app.state.holiday_data_reloader
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from typing import AsyncGenerator, AsyncIterable, Hashable
+
+from fastapi import Request
+
+
+class ResponseCache(object):
+    """
+    按字节预算做LRU淘汰的响应缓存，保存已编码好的响应体。
+    节假日数据版本变化时整体失效。
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.__entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self.__version: str | None = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: str) -> bytes | None:
+        """
+        查询缓存，命中时将该项移到最近使用的位置
+
+        Args:
+            key (Hashable): (接口, 日期范围, 格式, 选项)
+            version (str): 当前节假日数据版本
+        """
+        self.__check_version(version)
+        content = self.__entries.get(key)
+        if content is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__entries.move_to_end(key)
+        return content
+
+    def put(self, key: Hashable, version: str, content: bytes) -> None:
+        """
+        写入缓存，超过单项上限的不缓存，超出总预算时淘汰最久未使用的项
+        """
+        self.__check_version(version)
+        if len(content) > self.max_entry_bytes:
+            return
+
+        old = self.__entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+
+        self.__entries[key] = content
+        self.size += len(content)
+        while self.size > self.max_bytes:
+            _, evicted = self.__entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    async def capture(
+        self, key: Hashable, version: str, chunks: AsyncIterable[bytes]
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        原样转发流式响应，同时收集内容，完整输出后写入缓存。
+        超过单项上限时停止收集
+        """
+        captured: list[bytes] | None = []
+        size = 0
+        async for chunk in chunks:
+            if captured is not None:
+                size += len(chunk)
+                if size > self.max_entry_bytes:
+                    captured = None
+                else:
+                    captured.append(chunk)
+            yield chunk
+
+        if captured is not None:
+            self.put(key, version, b"".join(captured))
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.__entries),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __check_version(self, version: str) -> None:
+        if version != self.__version:
+            self.clear()
+            self.__version = version
+
+
+def response_cache(request: Request) -> ResponseCache:
+    return request.app.state.response_cache
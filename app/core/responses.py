@@ -0,0 +1,82 @@
+import io
+from csv import writer
+from datetime import datetime
+from functools import partial
+from typing import Any, Iterable, Sequence
+
+import orjson
+from starlette.responses import JSONResponse
+
+# UTC时间输出为"Z"，与pydantic的序列化结果一致
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+# 流式输出时每个chunk包含的行数
+STREAM_CHUNK_ROWS = 500
+CSV_CHUNK_ROWS = 2000
+
+
+def _default(obj: Any) -> Any:
+    # NamedTuple(如DateDimensionRow)编码为对象，orjson默认不支持tuple的子类
+    if isinstance(obj, tuple) and hasattr(obj, "_asdict"):
+        return obj._asdict()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def dumps_lines(rows: list[Any]) -> bytes:
+    """NDJSON：每行一个对象"""
+    return b"".join(
+        orjson.dumps(
+            row,
+            default=_default,
+            option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE,
+        )
+        for row in rows
+    )
+
+
+# 直接调用datetime.isoformat，格式与str()相同，但不经过子类(如pendulum)的重载
+format_datetime = partial(datetime.isoformat, sep=" ")
+
+
+class CsvEncoder(object):
+    """
+    CSV：每个元素一行，datetime_indexes位置的日期时间格式与str()相同。
+    一个流使用一个实例，各块共用同一个缓冲区与csv writer，编码前清空
+    """
+
+    def __init__(self, datetime_indexes: Sequence[int] = ()):
+        self.datetime_indexes = datetime_indexes
+        self.__buffer = io.StringIO()
+        self.__writer = writer(self.__buffer, lineterminator="\n")
+
+    def encode(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        self.__buffer.seek(0)
+        self.__buffer.truncate()
+        for row in rows:
+            values = list(row)
+            for i in self.datetime_indexes:
+                values[i] = format_datetime(values[i])
+            self.__writer.writerow(values)
+        return self.__buffer.getvalue().encode("utf-8")
+
+
+def dumps_csv(
+    rows: Iterable[Sequence[Any]], datetime_indexes: Sequence[int] = ()
+) -> bytes:
+    """只编码一次的CSV(如表头)"""
+    return CsvEncoder(datetime_indexes).encode(rows)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    用orjson编码的JSON响应。content为bytes时视为已编码好的内容(如缓存)直接输出
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,59 @@
+import gc
+from typing import Callable
+
+import uvicorn
+from fastapi import FastAPI
+from loguru import logger
+
+from app.core.config import settings
+
+
+def run_production(app: FastAPI, preload: Callable[[FastAPI], None]) -> None:
+    """
+    以production模式运行：多个worker，uvloop/httptools(已安装时)，不自动重载。
+    在master进程中预加载节假日数据与日期维度表后再fork，
+    各worker以copy-on-write方式共享，不再各自加载
+    """
+    preload(app)
+    # 预加载的对象不再参与gc扫描，避免gc修改引用计数所在的内存页导致复制
+    gc.freeze()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logger.warning(
+            "gunicorn not installed, each uvicorn worker loads its own data"
+        )
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            workers=settings.workers,
+            loop="auto",
+            http="auto",
+            log_level=settings.log_level.lower(),
+            access_log=False,
+        )
+        return
+
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            for key, value in {
+                "bind": f"{settings.HOST}:{settings.PORT}",
+                "workers": settings.workers,
+                # UvicornWorker默认使用uvloop与httptools(已安装时)
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": True,
+                "loglevel": settings.log_level.lower(),
+                "accesslog": None,
+            }.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    logger.info(
+        f"production server: {settings.workers} workers "
+        f"on {settings.HOST}:{settings.PORT}"
+    )
+    ProductionServer().run()
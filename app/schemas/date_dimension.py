@@ -1,7 +1,15 @@
 from datetime import datetime
+from functools import lru_cache
+from typing import Literal, NamedTuple
 
 from pydantic import BaseModel, Field
 
+# 日期范围生成引擎：row逐行生成，columnar按列批量计算，store从预计算的表中切片
+DateDimensionEngine = Literal["row", "columnar", "store"]
+
+# 流式输出格式：ndjson每行一个对象，json为分块输出的JSON数组
+DateDimensionStream = Literal["ndjson", "json"]
+
 
 class DateDimension(BaseModel):
     """
@@ -13,7 +21,9 @@ class DateDimension(BaseModel):
         description="日期ID，格式通常为YYYYMMDD，其中HH表示小时"
     )
     date_hour_id: str = Field(
-        description="日期ID，格式通常为YYYYMMDDHH，其中HH表示小时"
+        description="日期时间段ID，格式随粒度变化：day为YYYYMMDD，"
+        "hour为YYYYMMDDHH，shift为YYYYMMDDHH(HH为班次开始的小时00/08/17)，"
+        "Nmin为YYYYMMDDHHmm"
     )
     date: datetime = Field(description="日期，精确到日期的datetime对象")
     date_time: datetime = Field(description="包含时分秒的日期时间")
@@ -44,9 +54,12 @@ class DateDimension(BaseModel):
     day_of_month: int = Field(description="当前日期在当月的第几天")
     day_of_week: int = Field(description="当前日期在当周的第几天，星期一为1")
 
-    hour: str = Field(description="当前日期的小时，范围为00-23")
+    hour: str = Field(
+        description="当前日期的小时，范围为00-23，粒度为day时为空"
+    )
     shift: str = Field(
-        description="班次标识，0-7表示夜班，8-16表示早班，17-23表示中班"
+        description="班次标识，0-7表示夜班，8-16表示早班，17-23表示中班，"
+        "粒度为day时为空"
     )
 
     weekday: str = Field(description="星期几，1表示星期一，7表示星期日")
@@ -86,3 +99,78 @@ class DateDimension(BaseModel):
     prev_month_end_date: datetime = Field(
         description="去年同月的最后一天日期，格式YYYYMMDD"
     )
+
+
+# 各引擎内部生成的一行：按DateDimension字段顺序排列的元组，不经pydantic校验，
+# 日期时间均为标准datetime。取值重复的字段(年/月边界、低基数的字符串等)
+# 在行之间共用同一个对象，只在API边界需要时才转换为DateDimension
+DateDimensionRow = NamedTuple(
+    "DateDimensionRow",
+    [
+        (name, field.annotation)
+        for name, field in DateDimension.model_fields.items()
+    ],
+)
+
+# DateDimensionRow中日期时间字段的位置
+DATETIME_FIELD_INDEXES = tuple(
+    i
+    for i, field in enumerate(DateDimension.model_fields.values())
+    if field.annotation is datetime
+)
+
+# CSV导出的表头，与DateDimensionRow的字段顺序相同
+CSV_FIELDS = list(DateDimension.model_fields.keys())
+
+
+# 字段投影：只计算和输出请求的字段，None为全部字段
+Fields = tuple[str, ...] | None
+
+
+def parse_fields(fields: str | None) -> Fields:
+    """
+    解析逗号分隔的字段名，按请求的顺序输出，重复的字段只保留一个
+
+    Raises:
+        ValueError: 没有字段或字段名不存在
+    """
+    if fields is None:
+        return None
+
+    names = tuple(
+        dict.fromkeys(f.strip() for f in fields.split(",") if f.strip())
+    )
+    if not names:
+        raise ValueError("no fields")
+    unknown = [
+        name for name in names if name not in DateDimension.model_fields
+    ]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    return names
+
+
+@lru_cache(maxsize=256)
+def row_type(fields: Fields = None) -> type[tuple]:
+    """
+    投影后的行类型：只包含fields的NamedTuple，编码时即为缩减后的对象，
+    全部字段时为DateDimensionRow
+    """
+    if fields is None or fields == DateDimensionRow._fields:
+        return DateDimensionRow
+    return NamedTuple(
+        "DateDimensionRow",
+        [(name, DateDimensionRow.__annotations__[name]) for name in fields],
+    )
+
+
+@lru_cache(maxsize=256)
+def datetime_field_indexes(fields: Fields = None) -> tuple[int, ...]:
+    """投影后的行中日期时间字段的位置"""
+    if fields is None:
+        return DATETIME_FIELD_INDEXES
+    return tuple(
+        i
+        for i, name in enumerate(fields)
+        if DateDimension.model_fields[name].annotation is datetime
+    )
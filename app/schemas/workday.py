@@ -0,0 +1,14 @@
+import datetime
+
+from pydantic import BaseModel, Field
+
+
+class Workday(BaseModel):
+    date: datetime.date = Field(..., description="日期")
+    is_workday: bool = Field(..., description="是否为工作日")
+
+
+class WorkdayCount(BaseModel):
+    start_date: datetime.date = Field(..., description="开始日期")
+    end_date: datetime.date = Field(..., description="结束日期")
+    workdays: int = Field(..., description="日期范围内(含首尾)的工作日数")
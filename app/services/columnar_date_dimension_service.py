@@ -0,0 +1,531 @@
+from datetime import datetime, date, timedelta, timezone
+from functools import cached_property
+from typing import AsyncGenerator, Iterator
+
+import numpy as np
+
+from app.core.metrics import timed, timed_iter
+from app.schemas.date_dimension import (
+    DateDimension,
+    DateDimensionRow,
+    Fields,
+    row_type,
+)
+from app.services.date_dimension_service import SHANGHAI
+from app.services.granularity import get_slots
+from app.services.holiday_service import HolidayService
+
+ROW_FIELDS = DateDimensionRow._fields
+
+WEEK_IDENTIFIERS = np.array(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"])
+
+# 随时间段变化的列，其余列同一天内相同
+SLOT_COLUMNS = frozenset(
+    {
+        "date_hour_id",
+        "date_time",
+        "hour",
+        "shift",
+        "prev_year_date",
+        "prev_year_date_time",
+    }
+)
+
+# 随时间段变化的列由每天一行的哪一列计算
+SLOT_COLUMN_SOURCES = {
+    "date_hour_id": "date_id",
+    "date_time": "date",
+    "prev_year_date": "prev_year_date",
+    "prev_year_date_time": "prev_year_date",
+}
+
+# 每行取值都不同的字符串列，不做去重
+ROW_UNIQUE_COLUMNS = frozenset({"date_hour_id"})
+
+# 长日期范围按块计算，内存占用与范围大小无关
+BLOCK_DAYS = 31
+
+# 与DateDimensionService保持一致：date/date_time/prev_year_date_time为UTC，
+# 其余日期时间字段为Asia/Shanghai
+UTC_COLUMNS = frozenset({"date", "date_time", "prev_year_date_time"})
+
+
+class ColumnarDateDimensionService(object):
+    """
+    按列计算日期维度的引擎。整个日期范围用numpy datetime64与整数运算一次性算出，
+    输出与DateDimensionService逐行生成的DateDimension完全一致。
+    """
+
+    def __init__(self, holiday_service: HolidayService):
+        self.holiday_service = holiday_service
+
+    @timed("columnar.build_columns")
+    def build_columns(
+        self,
+        time_start: date,
+        time_end: date,
+        granularity: str = "hour",
+        fields: Fields = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        计算日期范围内每个时间段一行的全部列
+
+        参数:
+        time_start: datetime.date - 日期范围的开始时间。
+        time_end: datetime.date - 日期范围的结束时间。
+        granularity: str - 粒度，day/hour/shift/Nmin。
+        fields: Fields - 只计算这些列，None为全部列。
+
+        返回值:
+        dict[str, np.ndarray] - 按DateDimension字段顺序(或fields的顺序)排列的列。
+        日期时间列为不带时区的datetime64[us]，时区见UTC_COLUMNS。
+        """
+        return expand_slots(
+            self.build_day_columns(time_start, time_end, day_fields(fields)),
+            granularity,
+            fields,
+        )
+
+    def build_day_columns(
+        self, time_start: date, time_end: date, fields: Fields = None
+    ) -> dict[str, np.ndarray]:
+        """
+        计算日期范围内每天一行、与时间段无关的列，
+        date与prev_year_date为当天0点
+
+        参数:
+        fields: Fields - 只计算这些列，None为全部列。
+        """
+        # 未请求节假日相关的列时不会查询节假日，预先检查数据是否覆盖
+        self.holiday_service.check_range(time_start, time_end)
+        day_columns = _DayColumns(self.holiday_service, time_start, time_end)
+        return {
+            name: getattr(day_columns, name)
+            for name in (DAY_COLUMNS if fields is None else fields)
+        }
+
+    @timed_iter("columnar.get_ste_day", unit="rows")
+    def iter_range(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+        first_slot: int = 0,
+        fields: Fields = None,
+    ) -> Iterator[DateDimensionRow]:
+        """
+        根据给定的日期范围，按列计算后逐个返回DateDimensionRow，不做pydantic校验。
+        同步的迭代器，批处理中直接使用，不需要事件循环
+
+        参数:
+        time_start: datetime.date - 日期范围的开始时间。
+        time_end: datetime.date - 日期范围的结束时间。
+        granularity: str - 粒度，day/hour/shift/Nmin。
+        first_slot: int - 第一天从第几个时间段开始，用于分页时从游标处直接开始。
+        fields: Fields - 只计算并返回这些字段，None为全部字段。
+
+        返回值:
+        Iterator[DateDimensionRow] - 日期范围内每个时间段一行。
+        """
+        get_slots(granularity)
+        skip = first_slot
+        for block_start, block_end in iter_blocks(time_start, time_end):
+            columns = self.build_columns(
+                block_start, block_end, granularity, fields
+            )
+            yield from iter_rows(skip_rows(columns, skip))
+            skip = 0
+
+    def iter_for_date(
+        self, date: datetime, granularity: str = "hour", fields: Fields = None
+    ) -> Iterator[DateDimensionRow]:
+        """
+        逐个返回给定日期各时间段的DateDimensionRow，默认为0~23小时
+        """
+        return self.iter_range(date, date, granularity, fields=fields)
+
+    async def get_ste_day_rows(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+        first_slot: int = 0,
+        fields: Fields = None,
+    ) -> AsyncGenerator[DateDimensionRow, None]:
+        """
+        iter_range的异步适配，供异步调用方使用
+        """
+        for row in self.iter_range(
+            time_start, time_end, granularity, first_slot, fields
+        ):
+            yield row
+
+    async def get_ste_day(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+    ) -> AsyncGenerator[DateDimension, None]:
+        """
+        与get_ste_day_rows相同，但逐个返回DateDimension对象。
+        """
+        for row in self.iter_range(time_start, time_end, granularity):
+            yield DateDimension(**row._asdict())
+
+
+class _DayColumns(object):
+    """
+    日期范围内每天一行的列。每一列及其依赖的中间结果都只在第一次访问时计算，
+    没有请求的列不计算
+    """
+
+    def __init__(
+        self, holiday_service: HolidayService, time_start: date, time_end: date
+    ):
+        self.holiday_service = holiday_service
+        self.date = np.arange(
+            np.datetime64(_as_date(time_start), "D"),
+            np.datetime64(_as_date(time_end), "D") + 1,
+        )
+
+    # 中间结果
+    @cached_property
+    def year_number(self) -> np.ndarray:
+        return self.year_start_date.astype(np.int64) + 1970
+
+    @cached_property
+    def month_number(self) -> np.ndarray:
+        return self.month_start_date.astype(np.int64) % 12 + 1
+
+    @cached_property
+    def quarter_number(self) -> np.ndarray:
+        return (self.month_number - 1) // 3 + 1
+
+    @cached_property
+    def prev_year_month_start(self) -> np.ndarray:
+        return self.month_start_date - np.timedelta64(12, "M")
+
+    @cached_property
+    def prev_year_day_number(self) -> np.ndarray:
+        # 去年同一天，2月29日对应去年2月28日
+        prev_year_month_start = self.prev_year_month_start
+        prev_year_month_days = (
+            (prev_year_month_start + 1).astype("datetime64[D]")
+            - prev_year_month_start.astype("datetime64[D]")
+        ).astype(np.int64)
+        return np.minimum(self.day_of_month, prev_year_month_days)
+
+    @cached_property
+    def prev_month_start(self) -> np.ndarray:
+        # 上个月，1月对应当年12月
+        return np.where(
+            self.month_number == 1,
+            (self.year_start_date + 1).astype("datetime64[M]") - 1,
+            self.month_start_date - 1,
+        )
+
+    @cached_property
+    def holidays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        按天查询节假日，返回节假日名称与是否放假两列
+        """
+        holidays = [
+            self.holiday_service.get_for_date(d) for d in self.date.tolist()
+        ]
+        holiday_name = np.array(
+            [h.name if h else "" for h in holidays], dtype=str
+        )
+        is_offday = np.array(
+            [bool(h and h.is_offday) for h in holidays], dtype=bool
+        )
+        return holiday_name, is_offday
+
+    # 日期
+    @cached_property
+    def date_id(self) -> np.ndarray:
+        return np.char.replace(np.datetime_as_string(self.date), "-", "")
+
+    # 年
+    @cached_property
+    def year(self) -> np.ndarray:
+        return self.year_number.astype(str)
+
+    @cached_property
+    def year_start_date(self) -> np.ndarray:
+        return self.date.astype("datetime64[Y]")
+
+    @cached_property
+    def year_end_date(self) -> np.ndarray:
+        return _period_end(self.year_start_date + 1)
+
+    # 季度
+    @cached_property
+    def quarter(self) -> np.ndarray:
+        return np.char.add("Q", self.quarter_number.astype(str))
+
+    @cached_property
+    def year_quarter(self) -> np.ndarray:
+        return np.char.add(self.year, self.quarter)
+
+    # 月
+    @cached_property
+    def month(self) -> np.ndarray:
+        return self.month_number.astype(str)
+
+    @cached_property
+    def month_start_date(self) -> np.ndarray:
+        return self.date.astype("datetime64[M]")
+
+    @cached_property
+    def month_end_date(self) -> np.ndarray:
+        return _period_end(self.month_start_date + 1)
+
+    # 第几天
+    @cached_property
+    def day(self) -> np.ndarray:
+        return self.day_of_month.astype(str)
+
+    @cached_property
+    def day_of_year(self) -> np.ndarray:
+        return (self.date - self.year_start_date).astype(np.int64) + 1
+
+    @cached_property
+    def day_of_month(self) -> np.ndarray:
+        return (self.date - self.month_start_date).astype(np.int64) + 1
+
+    @cached_property
+    def day_of_week(self) -> np.ndarray:
+        return (self.date.astype(np.int64) + 3) % 7 + 1  # 星期一为1
+
+    # 周
+    @cached_property
+    def weekday(self) -> np.ndarray:
+        return self.day_of_week.astype(str)
+
+    @cached_property
+    def week_identifier(self) -> np.ndarray:
+        return WEEK_IDENTIFIERS[self.day_of_week - 1]
+
+    @cached_property
+    def week_of_month(self) -> np.ndarray:
+        first_of_month_dow = (
+            self.month_start_date.astype("datetime64[D]").astype(np.int64) + 3
+        ) % 7 + 1
+        return (self.day_of_month + first_of_month_dow - 2) // 7 + 1
+
+    @cached_property
+    def week_of_year(self) -> np.ndarray:
+        # ISO周数：当周星期四所在年份的第几周
+        thursday = self.date + (4 - self.day_of_week)
+        return (thursday - thursday.astype("datetime64[Y]")).astype(
+            np.int64
+        ) // 7 + 1
+
+    # 日类型
+    @cached_property
+    def is_weekend(self) -> np.ndarray:
+        return np.where(self.day_of_week >= 6, "Yes", "No")
+
+    @cached_property
+    def date_type(self) -> np.ndarray:
+        return np.where(self.holidays[1], "节假日", "工作日")
+
+    @cached_property
+    def holiday_name(self) -> np.ndarray:
+        return self.holidays[0]
+
+    # 去年日期
+    @cached_property
+    def prev_year_date(self) -> np.ndarray:
+        return self.prev_year_month_start.astype("datetime64[D]") + (
+            self.prev_year_day_number - 1
+        )
+
+    @cached_property
+    def prev_year_date_id(self) -> np.ndarray:
+        return np.char.replace(
+            np.datetime_as_string(self.prev_year_date), "-", ""
+        )
+
+    @cached_property
+    def prev_year(self) -> np.ndarray:
+        return (self.year_number - 1).astype(str)
+
+    @cached_property
+    def prev_year_month(self) -> np.ndarray:
+        month = self.month_number
+        return np.where(month == 1, 12, month - 1).astype(str)
+
+    @cached_property
+    def prev_year_day(self) -> np.ndarray:
+        return self.prev_year_day_number.astype(str)
+
+    @cached_property
+    def prev_year_start_date(self) -> np.ndarray:
+        return self.year_start_date - 1
+
+    @cached_property
+    def prev_year_end_date(self) -> np.ndarray:
+        return self.year_start_date - 1
+
+    @cached_property
+    def prev_month_start_date(self) -> np.ndarray:
+        return self.prev_month_start
+
+    @cached_property
+    def prev_month_end_date(self) -> np.ndarray:
+        return _period_end(self.prev_month_start + 1)
+
+
+# 每天一行的全部列，即DateDimension中与时间段无关的字段，以及date与prev_year_date
+DAY_COLUMNS = tuple(
+    name
+    for name in ROW_FIELDS
+    if name not in SLOT_COLUMNS or name == "prev_year_date"
+)
+
+
+def expand_slots(
+    day_columns: dict[str, np.ndarray],
+    granularity: str,
+    fields: Fields = None,
+) -> dict[str, np.ndarray]:
+    """
+    将每天一行的列按粒度展开为每个时间段一行，并计算与时间段相关的列
+
+    参数:
+    day_columns: dict[str, np.ndarray] - 每天一行的列，date与prev_year_date为当天0点，
+        至少包含day_fields(fields)。
+    granularity: str - 粒度，day/hour/shift/Nmin。
+    fields: Fields - 只展开这些列，None为全部列。
+
+    返回值:
+    dict[str, np.ndarray] - 按DateDimension字段顺序(或fields的顺序)排列的列。
+    """
+    slots = get_slots(granularity)
+    names = fields or ROW_FIELDS
+    n_slots, n_days = len(slots), len(day_columns["date"])
+
+    def repeat(name: str) -> np.ndarray:
+        return np.repeat(day_columns[name], n_slots)
+
+    def tile(values: list) -> np.ndarray:
+        return np.tile(np.array(values), n_days)
+
+    columns = {
+        name: repeat(name) for name in names if name not in SLOT_COLUMNS
+    }
+
+    if SLOT_COLUMNS.intersection(names) - {"hour", "shift"}:
+        offset = tile([slot.minute for slot in slots]).astype("timedelta64[m]")
+    if "date_hour_id" in names:
+        columns["date_hour_id"] = np.char.add(
+            repeat("date_id"), tile([slot.id_suffix for slot in slots])
+        )
+    if "date_time" in names:
+        columns["date_time"] = repeat("date") + offset
+    if "hour" in names:
+        columns["hour"] = tile([slot.hour for slot in slots])
+    if "shift" in names:
+        columns["shift"] = tile([slot.shift for slot in slots])
+    if "prev_year_date" in names or "prev_year_date_time" in names:
+        prev_year_date_time = repeat("prev_year_date") + offset
+        columns["prev_year_date"] = prev_year_date_time
+        columns["prev_year_date_time"] = prev_year_date_time
+
+    return {
+        name: (
+            columns[name].astype("datetime64[us]")
+            if np.issubdtype(columns[name].dtype, np.datetime64)
+            else columns[name]
+        )
+        for name in names
+    }
+
+
+def day_fields(fields: Fields) -> Fields:
+    """
+    计算fields需要的每天一行的列：与时间段无关的列，以及时间段列依赖的列
+    """
+    if fields is None:
+        return None
+    names = [name for name in fields if name not in SLOT_COLUMNS]
+    # date决定展开的天数，总是需要
+    for source in ["date"] + [
+        SLOT_COLUMN_SOURCES.get(name) for name in fields
+    ]:
+        if source is not None and source not in names:
+            names.append(source)
+    return tuple(names)
+
+
+def iter_blocks(
+    time_start: date, time_end: date, block_days: int = BLOCK_DAYS
+) -> Iterator[tuple[date, date]]:
+    """
+    将日期范围按block_days天切分为连续的若干块
+    """
+    start, end = _as_date(time_start), _as_date(time_end)
+    while start <= end:
+        block_end = min(start + timedelta(days=block_days - 1), end)
+        yield start, block_end
+        start = block_end + timedelta(days=1)
+
+
+def to_pylists(columns: dict[str, np.ndarray]) -> dict[str, list]:
+    """
+    将列转换为python对象列表，日期时间列附加对应的时区。
+    日期时间列与字符串列(ROW_UNIQUE_COLUMNS除外)中相同的值只转换一次，
+    各行共用同一个对象；小整数本身就是共用的
+    """
+    pylists = {}
+    for name, values in columns.items():
+        if np.issubdtype(values.dtype, np.datetime64):
+            tz = timezone.utc if name in UTC_COLUMNS else SHANGHAI
+            pylists[name] = _shared(values, lambda d: d.replace(tzinfo=tz))
+        elif values.dtype.kind == "U" and name not in ROW_UNIQUE_COLUMNS:
+            pylists[name] = _shared(values)
+        else:
+            pylists[name] = values.tolist()
+    return pylists
+
+
+def skip_rows(
+    columns: dict[str, np.ndarray], count: int
+) -> dict[str, np.ndarray]:
+    """
+    去掉每列的前count行，切片不复制数据
+    """
+    if count == 0:
+        return columns
+    return {name: values[count:] for name, values in columns.items()}
+
+
+def iter_rows(columns: dict[str, np.ndarray]) -> Iterator[DateDimensionRow]:
+    """
+    将按DateDimension字段顺序排列的列逐行转换为DateDimensionRow，
+    只有部分列时转换为对应投影的行
+    """
+    fields = tuple(columns)
+    return map(
+        row_type(None if fields == ROW_FIELDS else fields)._make,
+        zip(*to_pylists(columns).values()),
+    )
+
+
+def _as_date(value: date) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _period_end(next_start: np.ndarray) -> np.ndarray:
+    # 月末/年末为下个周期开始前1微秒
+    return next_start.astype("datetime64[us]") - np.timedelta64(1, "us")
+
+
+def _shared(values: np.ndarray, convert=None) -> list:
+    # 相同的值只转换一次，月/年边界等列大量重复
+    uniques, inverse = np.unique(values, return_inverse=True)
+    converted = uniques.tolist()
+    if convert is not None:
+        converted = [convert(v) for v in converted]
+    return [converted[i] for i in inverse.tolist()]
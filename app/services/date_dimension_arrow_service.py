@@ -0,0 +1,233 @@
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterable, Iterable, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.schemas.date_dimension import DateDimension
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+    UTC_COLUMNS,
+    iter_blocks,
+)
+from app.services.date_dimension_store import DateDimensionStore
+from app.services.holiday_service import HolidayService
+
+# 每个record batch(parquet中为一个row group)包含的天数
+ARROW_BLOCK_DAYS = 366
+
+# 取值较少的字符串列使用字典编码
+DICTIONARY_FIELDS = frozenset(
+    {
+        "quarter",
+        "weekday",
+        "week_identifier",
+        "shift",
+        "is_weekend",
+        "date_type",
+        "holiday_name",
+    }
+)
+
+
+def _arrow_type(name: str, annotation: type) -> pa.DataType:
+    if annotation is datetime:
+        tz = "UTC" if name in UTC_COLUMNS else "Asia/Shanghai"
+        return pa.timestamp("us", tz=tz)
+    if annotation is int:
+        return pa.int32()
+    if name in DICTIONARY_FIELDS:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+ARROW_SCHEMA = pa.schema(
+    [
+        pa.field(
+            name,
+            _arrow_type(name, field.annotation),
+            nullable=False,
+            metadata={"description": field.description},
+        )
+        for name, field in DateDimension.model_fields.items()
+    ]
+)
+
+
+class DateDimensionArrowService(object):
+    """
+    以Arrow IPC流或Parquet格式导出日期维度，类型由DateDimension的字段决定。
+    按ARROW_BLOCK_DAYS天生成一个record batch，边生成边输出，不会整体物化。
+    """
+
+    def __init__(
+        self,
+        holiday_service: HolidayService,
+        date_dimension_store: DateDimensionStore | None = None,
+    ):
+        self.columnar_date_dimension_service = ColumnarDateDimensionService(
+            holiday_service
+        )
+        self.date_dimension_store = date_dimension_store
+
+    def iter_record_batches(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        按块返回日期范围内的record batch
+        """
+        return map(
+            to_record_batch,
+            self.iter_columns(time_start, time_end, granularity),
+        )
+
+    def iter_columns(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+    ) -> Iterator[dict[str, np.ndarray]]:
+        """
+        按ARROW_BLOCK_DAYS天一块返回build_columns格式的列
+        """
+        for block_start, block_end in iter_blocks(
+            time_start, time_end, ARROW_BLOCK_DAYS
+        ):
+            store = self.date_dimension_store
+            if store is not None and store.covers(block_start, block_end):
+                columns = store.get_columns(
+                    block_start, block_end, granularity
+                )
+            else:
+                columns = self.columnar_date_dimension_service.build_columns(
+                    block_start, block_end, granularity
+                )
+
+            yield columns
+
+    async def stream_ipc(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        以Arrow IPC流格式输出
+        """
+        async for chunk in write_ipc(
+            _async_iter(self.iter_columns(time_start, time_end, granularity))
+        ):
+            yield chunk
+
+    async def stream_parquet(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        以Parquet格式输出，每个record batch为一个row group
+        """
+        async for chunk in write_parquet(
+            _async_iter(self.iter_columns(time_start, time_end, granularity))
+        ):
+            yield chunk
+
+
+def to_record_batch(columns: dict[str, np.ndarray]) -> pa.RecordBatch:
+    """
+    将build_columns格式的列转换为record batch
+    """
+    return pa.record_batch(
+        [_to_arrow(columns[field.name], field.type) for field in ARROW_SCHEMA],
+        schema=ARROW_SCHEMA,
+    )
+
+
+async def write_ipc(
+    blocks: AsyncIterable[dict[str, np.ndarray]],
+) -> AsyncGenerator[bytes, None]:
+    """
+    将按块生成的列依次写为Arrow IPC流，每块一个record batch，写入后即输出
+    """
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, ARROW_SCHEMA) as ipc_writer:
+        async for columns in blocks:
+            ipc_writer.write_batch(to_record_batch(columns))
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def write_parquet(
+    blocks: AsyncIterable[dict[str, np.ndarray]],
+) -> AsyncGenerator[bytes, None]:
+    """
+    将按块生成的列依次写为Parquet，每块一个row group
+    """
+    sink = _ChunkSink()
+    with pq.ParquetWriter(
+        sink, ARROW_SCHEMA, use_dictionary=sorted(DICTIONARY_FIELDS)
+    ) as parquet_writer:
+        async for columns in blocks:
+            parquet_writer.write_batch(to_record_batch(columns))
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def _async_iter(iterable: Iterable) -> AsyncGenerator:
+    for item in iterable:
+        yield item
+
+
+def _to_arrow(values: np.ndarray, arrow_type: pa.DataType) -> pa.Array:
+    if pa.types.is_timestamp(arrow_type):
+        # 列中为不带时区的本地时间
+        naive = pa.array(values, type=pa.timestamp("us"))
+        if arrow_type.tz == "UTC":
+            return naive.cast(arrow_type)
+        return pc.assume_timezone(naive, arrow_type.tz)
+    if pa.types.is_dictionary(arrow_type):
+        return pa.array(values, type=pa.string()).dictionary_encode()
+    return pa.array(values, type=arrow_type)
+
+
+class _ChunkSink(object):
+    """
+    供Arrow/Parquet writer写入的只追加文件对象，写入的内容可分块取出
+    """
+
+    def __init__(self):
+        self.__chunks: list[bytes] = []
+        self.__position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.__chunks.append(data)
+        self.__position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.__position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b"".join(self.__chunks)
+        self.__chunks.clear()
+        return data
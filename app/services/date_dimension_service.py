@@ -1,134 +1,326 @@
-from typing import Iterator, Optional, AsyncGenerator, Generator
-from datetime import datetime, timedelta, time
-import pendulum
-from loguru import logger
+from functools import cached_property, lru_cache
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    AsyncGenerator,
+    Generator,
+)
+from datetime import datetime, timedelta, UTC
+from zoneinfo import ZoneInfo
 
-from app.schemas.date_dimension import DateDimension
+from app.core.log import hot_path_log
+from app.core.metrics import timed_iter
+from app.schemas.date_dimension import (
+    DateDimension,
+    DateDimensionRow,
+    Fields,
+    row_type,
+)
 from app.schemas.holiday import Holiday
+from app.services.granularity import Slot, get_slots
 from app.services.holiday_service import HolidayService
 
+SHANGHAI = ZoneInfo("Asia/Shanghai")
 
-class DateDimensionService(object):
-    def __init__(self, holiday_service: HolidayService):
+ROW_FIELDS = DateDimensionRow._fields
+
+# 同一天内相同、且在不同日期之间大量重复的字段，各行共用同一个对象
+SHARED_FIELDS = frozenset(
+    {
+        "year",
+        "year_start_date",
+        "year_end_date",
+        "quarter",
+        "year_quarter",
+        "month",
+        "month_start_date",
+        "month_end_date",
+        "weekday",
+        "week_identifier",
+        "day",
+        "is_weekend",
+        "date_type",
+        "holiday_name",
+        "prev_year_start_date",
+        "prev_year_end_date",
+        "prev_year",
+        "prev_year_month",
+        "prev_month_start_date",
+        "prev_month_end_date",
+        "prev_year_day",
+    }
+)
+
+
+def get_date_type(date: datetime.date, holiday: Optional[Holiday]) -> str:
+    """
+    根据给定的日期和假期信息，判断日期的类型（工作日、休息日、节假日）。
+
+    参数:
+    date: datetime.date - 需要判断类型的日期。
+    holiday: Optional[Holiday] - 假期信息对象，可选。
+
+    返回值:
+    str - 日期的类型，可能的取值为 "工作日"、"休息日"、"节假日"。
+    """
+    # 判断是否为工作日
+    is_workday = date.weekday() < 5
+    # 判断是否为节假日
+    is_off_day = holiday and holiday.is_offday if holiday else False
+
+    # 默认情况下，将日期类型设为"工作日"
+    date_type = "工作日"
+    # 如果不是工作日，则将日期类型设为"休息日"
+    if not is_workday:
+        date_type = "休息日"
+
+    # 如果是节假日，则将日期类型设为"节假日"，否则保持为"工作日"
+    if is_off_day:
+        date_type = "节假日"
+    else:
+        date_type = "工作日"
+
+    return date_type
+
+
+class _Day(object):
+    """
+    一天中与时间段无关的中间结果，只在某个字段用到时才计算
+    """
+
+    def __init__(self, holiday_service: HolidayService, date: datetime):
         self.holiday_service = holiday_service
+        self.year, self.month, self.day = date.year, date.month, date.day
 
-    async def __get_for_date_hour(
-        self, date: datetime
-    ) -> DateDimension | None:
-        """
-        根据给定的完整日期时间返回一个DateDimension对象
-        :param date: 完整的日期时间，datetime对象
-        :return: DateDimension对象
-        """
-        logger.debug(f"get_for_date_hour: {date}")
-
-        pendulum_date = pendulum.datetime(
-            date.year,
-            date.month,
-            date.day,
-            date.hour,
-            date.minute,
-            date.second,
-            tz="Asia/Shanghai",
+    @cached_property
+    def pendulum_date(self):
+        # pendulum只有逐行生成时用到，延迟到第一次使用时导入
+        import pendulum
+
+        return pendulum.datetime(
+            self.year, self.month, self.day, tz="Asia/Shanghai"
         )
 
-        prev_year = pendulum_date.subtract(years=1)
-        prev_month = (
+    @cached_property
+    def prev_year(self):
+        return self.pendulum_date.subtract(years=1)
+
+    @cached_property
+    def prev_month(self):
+        pendulum_date = self.pendulum_date
+        return (
             (pendulum_date.subtract(months=1))
             if pendulum_date.month != 1
             else pendulum_date.end_of("year")
         )
 
-        hour = pendulum_date.hour
-
-        # 计算班次
-        shift = "夜" if hour < 8 else "早" if hour < 17 else "中"
-
-        # 计算假日
-        holiday = await self.holiday_service.get_for_date(pendulum_date)
-
-        return DateDimension(
-            # 日期
-            date_id=pendulum_date.format("YYYYMMDD"),
-            date_hour_id=pendulum_date.format("YYYYMMDDHH"),
-            date=pendulum.parse(pendulum_date.to_date_string()),
-            date_time=pendulum.parse(pendulum_date.to_datetime_string()),
-            # 年
-            year=str(pendulum_date.year),
-            year_start_date=pendulum_date.start_of("year"),
-            year_end_date=pendulum_date.end_of("year"),
-            # /季度
-            quarter=f"Q{pendulum_date.quarter}",
-            year_quarter=f"{pendulum_date.year}Q{pendulum_date.quarter}",
-            # /月
-            month=str(pendulum_date.month),
-            month_start_date=pendulum_date.start_of("month"),
-            month_end_date=pendulum_date.end_of("month"),
-            # 周
-            weekday=pendulum_date.format("E"),
-            week_identifier=pendulum_date.format("ddd"),
-            # 第几天
-            day=str(pendulum_date.day),
-            day_of_year=pendulum_date.day_of_year,
-            day_of_month=pendulum_date.day,
-            day_of_week=pendulum_date.day_of_week + 1,  # 星期一为1
-            # 第几周
-            week_of_month=pendulum_date.week_of_month,
-            week_of_year=pendulum_date.week_of_year,  # 当年周数，星期一为第一周
-            # 日类型
-            is_weekend="Yes" if pendulum_date.day_of_week >= 5 else "No",
-            date_type=self.__get_date_type(pendulum_date, holiday),
-            holiday_name=holiday.name if holiday else "",
-            # 小时/班次
-            hour=str(hour),
-            shift=shift,
-            # 去年日期
-            prev_year_date=prev_year,
-            prev_year_date_id=prev_year.format("YYYYMMDD"),
-            prev_year_date_time=pendulum.parse(prev_year.to_datetime_string()),
-            prev_year_start_date=prev_year.start_of("year"),
-            prev_year_end_date=prev_year.start_of("year"),
-            prev_year=str(prev_year.year),
-            prev_year_month=str(prev_month.month),
-            prev_month_start_date=prev_month.start_of("month"),
-            prev_month_end_date=prev_month.end_of("month"),
-            prev_year_day=str(prev_year.day),
+    @cached_property
+    def holiday(self) -> Holiday | None:
+        return self.holiday_service.get_for_date(self.pendulum_date)
+
+    @cached_property
+    def date_id(self) -> str:
+        return self.pendulum_date.format("YYYYMMDD")
+
+    @cached_property
+    def date(self) -> datetime:
+        return datetime(self.year, self.month, self.day, tzinfo=UTC)
+
+    @cached_property
+    def prev_year_date(self) -> datetime:
+        prev_year = self.prev_year
+        return datetime(
+            prev_year.year, prev_year.month, prev_year.day, tzinfo=SHANGHAI
         )
 
-    def __get_date_type(
-        self, date: datetime.date, holiday: Optional[Holiday]
-    ) -> str:
-        """
-        根据给定的日期和假期信息，判断日期的类型（工作日、休息日、节假日）。
 
-        参数:
-        date: datetime.date - 需要判断类型的日期。
-        holiday: Optional[Holiday] - 假期信息对象，可选。
+# 与时间段无关的字段，由当天的中间结果计算
+DAY_FIELDS: dict[str, Callable[[_Day], Any]] = {
+    # 日期
+    "date_id": lambda d: d.date_id,
+    "date": lambda d: d.date,
+    # 年
+    "year": lambda d: str(d.pendulum_date.year),
+    "year_start_date": lambda d: _plain(d.pendulum_date.start_of("year")),
+    "year_end_date": lambda d: _plain(d.pendulum_date.end_of("year")),
+    # /季度
+    "quarter": lambda d: f"Q{d.pendulum_date.quarter}",
+    "year_quarter": lambda d: (
+        f"{d.pendulum_date.year}Q{d.pendulum_date.quarter}"
+    ),
+    # /月
+    "month": lambda d: str(d.pendulum_date.month),
+    "month_start_date": lambda d: _plain(d.pendulum_date.start_of("month")),
+    "month_end_date": lambda d: _plain(d.pendulum_date.end_of("month")),
+    # 周
+    "weekday": lambda d: d.pendulum_date.format("E"),
+    "week_identifier": lambda d: d.pendulum_date.format("ddd"),
+    # 第几天
+    "day": lambda d: str(d.pendulum_date.day),
+    "day_of_year": lambda d: d.pendulum_date.day_of_year,
+    "day_of_month": lambda d: d.pendulum_date.day,
+    "day_of_week": lambda d: d.pendulum_date.day_of_week + 1,  # 星期一为1
+    # 第几周
+    "week_of_month": lambda d: d.pendulum_date.week_of_month,
+    # 当年周数，星期一为第一周
+    "week_of_year": lambda d: d.pendulum_date.week_of_year,
+    # 日类型
+    "is_weekend": lambda d: (
+        "Yes" if d.pendulum_date.day_of_week >= 5 else "No"
+    ),
+    "date_type": lambda d: get_date_type(d.pendulum_date, d.holiday),
+    "holiday_name": lambda d: d.holiday.name if d.holiday else "",
+    # 去年日期
+    "prev_year_date_id": lambda d: d.prev_year.format("YYYYMMDD"),
+    "prev_year_start_date": lambda d: _plain(d.prev_year.start_of("year")),
+    "prev_year_end_date": lambda d: _plain(d.prev_year.start_of("year")),
+    "prev_year": lambda d: str(d.prev_year.year),
+    "prev_year_month": lambda d: str(d.prev_month.month),
+    "prev_month_start_date": lambda d: _plain(d.prev_month.start_of("month")),
+    "prev_month_end_date": lambda d: _plain(d.prev_month.end_of("month")),
+    "prev_year_day": lambda d: str(d.prev_year.day),
+}
 
-        返回值:
-        str - 日期的类型，可能的取值为 "工作日"、"休息日"、"节假日"。
+# 随时间段变化的字段，由当天的中间结果、时间段及其距0点的偏移计算
+SLOT_FIELDS: dict[str, Callable[[_Day, Slot, timedelta], Any]] = {
+    "date_hour_id": lambda d, slot, offset: d.date_id + slot.id_suffix,
+    "date_time": lambda d, slot, offset: d.date + offset,
+    # 小时/班次
+    "hour": lambda d, slot, offset: slot.hour,
+    "shift": lambda d, slot, offset: slot.shift,
+    "prev_year_date": lambda d, slot, offset: d.prev_year_date + offset,
+    "prev_year_date_time": lambda d, slot, offset: (
+        (d.prev_year_date + offset).replace(tzinfo=UTC)
+    ),
+}
+
+
+class _Projection(NamedTuple):
+    """按投影生成一行所需的字段计算方式"""
+
+    row_type: type[tuple]
+    # 每个字段的名称与当天的计算方式，随时间段变化的字段为None
+    day_fields: tuple[tuple[str, Callable | None], ...]
+    # 随时间段变化的字段在行中的位置与计算方式
+    slot_fields: tuple[tuple[int, Callable], ...]
+
+
+@lru_cache(maxsize=256)
+def _projection(fields: Fields) -> _Projection:
+    names = fields or ROW_FIELDS
+    return _Projection(
+        row_type(fields),
+        tuple((name, DAY_FIELDS.get(name)) for name in names),
+        tuple(
+            (i, SLOT_FIELDS[name])
+            for i, name in enumerate(names)
+            if name in SLOT_FIELDS
+        ),
+    )
+
+
+class DateDimensionService(object):
+    def __init__(self, holiday_service: HolidayService):
+        self.holiday_service = holiday_service
+        # SHARED_FIELDS的取值，相等的值只保留一个对象
+        self.__shared: dict = {}
+
+    def __get_day_template(
+        self, date: datetime, projection: _Projection
+    ) -> tuple[_Day, list]:
         """
-        # 判断是否为工作日
-        is_workday = date.weekday() < 5
-        # 判断是否为节假日
-        is_off_day = holiday and holiday.is_offday if holiday else False
+        计算给定日期中与时间段无关、且在投影内的字段，同一天的各时间段共用
+        :param date: 日期，datetime对象
+        :param projection: 要生成的字段
+        :return: 当天的中间结果，以及按投影排列的字段值，随时间段变化的字段为None
+        """
+        if hot_path_log is not None:
+            hot_path_log.debug("get_day_template: {}", date)
 
-        # 默认情况下，将日期类型设为"工作日"
-        date_type = "工作日"
-        # 如果不是工作日，则将日期类型设为"休息日"
-        if not is_workday:
-            date_type = "休息日"
+        day = _Day(self.holiday_service, date)
+        shared = self.__shared
+        template = []
+        for name, compute in projection.day_fields:
+            if compute is None:
+                template.append(None)
+                continue
+            value = compute(day)
+            if name in SHARED_FIELDS:
+                value = shared.setdefault(value, value)
+            template.append(value)
+        return day, template
 
-        # 如果是节假日，则将日期类型设为"节假日"，否则保持为"工作日"
-        if is_off_day:
-            date_type = "节假日"
-        else:
-            date_type = "工作日"
+    def __stamp_slot(
+        self, day: _Day, template: list, slot: Slot, projection: _Projection
+    ) -> tuple:
+        """
+        在当天模板上填入时间段相关的字段
+        :param day: 当天的中间结果
+        :param template: __get_day_template返回的字段值
+        :param slot: 一天中的时间段，由粒度决定
+        :param projection: 要生成的字段
+        :return: 未经校验的一行
+        """
+        offset = timedelta(minutes=slot.minute)
+        row = template.copy()
+        for index, compute in projection.slot_fields:
+            row[index] = compute(day, slot, offset)
+        return projection.row_type._make(row)
 
-        return date_type
+    @timed_iter("row.get_ste_day", unit="rows")
+    def iter_range(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+        first_slot: int = 0,
+        fields: Fields = None,
+    ) -> Iterator[DateDimensionRow]:
+        """
+        逐个生成日期范围内(含首尾)每个时间段的DateDimensionRow，不经pydantic校验。
+        同步的迭代器，批处理中直接使用，不需要事件循环
+        :param time_start: 日期范围的开始时间
+        :param time_end: 日期范围的结束时间
+        :param granularity: 粒度，day/hour/shift/Nmin
+        :param first_slot: 第一天从第几个时间段开始，用于分页时从游标处直接开始
+        :param fields: 只计算并返回这些字段，None为全部字段
+        """
+        slots = get_slots(granularity)
+        # 未请求节假日相关字段时不会查询节假日，预先检查数据是否覆盖
+        self.holiday_service.check_range(time_start, time_end)
+        projection = _projection(fields)
+        day_slots = slots[first_slot:]
+        for date in self.__iter_days(time_start, time_end):
+            day, template = self.__get_day_template(date, projection)
+            for slot in day_slots:
+                yield self.__stamp_slot(day, template, slot, projection)
+            day_slots = slots
+
+    @timed_iter("row.get_for_date", unit="rows")
+    def iter_for_date(
+        self, date: datetime, granularity: str = "hour", fields: Fields = None
+    ) -> Iterator[DateDimensionRow]:
+        """
+        逐个生成给定日期各时间段的DateDimensionRow，默认为0~23小时
+        :param date: 完整的日期时间，datetime对象
+        :param granularity: 粒度，day/hour/shift/Nmin
+        :param fields: 只计算并返回这些字段，None为全部字段
+        """
+        slots = get_slots(granularity)
+        self.holiday_service.check_range(date, date)
+        projection = _projection(fields)
+        day, template = self.__get_day_template(date, projection)
+        for slot in slots:
+            yield self.__stamp_slot(day, template, slot, projection)
 
     async def get_ste_day(
-        self, time_start: datetime, time_end: datetime
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
     ) -> AsyncGenerator[DateDimension, None]:
         """
         根据给定的日期范围，计算并返回每个日期对应的DateDimension对象列表。
@@ -136,28 +328,68 @@ class DateDimensionService(object):
         参数:
         time_start: datetime.date - 日期范围的开始时间。
         time_end: datetime.date - 日期范围的结束时间。
+        granularity: str - 粒度，day/hour/shift/Nmin。
 
         返回值:
         List[DateDimension] - 日期范围内每个日期对应的DateDimension对象列表。
         """
-        for date in self.__iter_days(time_start, time_end):
-            async for d in self.get_for_date(date):
-                yield d
+        for row in self.iter_range(time_start, time_end, granularity):
+            yield DateDimension(**row._asdict())
+
+    async def get_ste_day_rows(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+        first_slot: int = 0,
+        fields: Fields = None,
+    ) -> AsyncGenerator[DateDimensionRow, None]:
+        """
+        iter_range的异步适配，供异步调用方使用
+        """
+        for row in self.iter_range(
+            time_start, time_end, granularity, first_slot, fields
+        ):
+            yield row
 
     async def get_for_date(
-        self, date: datetime
+        self, date: datetime, granularity: str = "hour"
     ) -> AsyncGenerator[DateDimension, None]:
         """
-        根据给定的完整日期时间返回0~23小时的DateDimension对象列表
+        根据给定的完整日期时间返回当天各时间段的DateDimension对象列表，
+        默认为0~23小时
         :param date: 完整的日期时间，datetime对象
+        :param granularity: 粒度，day/hour/shift/Nmin
         :return: DateDimension列表
         """
-        for hour in range(24):
-            date_hour = datetime.combine(date, time(hour))
-            yield await self.__get_for_date_hour(date_hour)
+        for row in self.iter_for_date(date, granularity):
+            yield DateDimension(**row._asdict())
+
+    async def get_for_date_rows(
+        self, date: datetime, granularity: str = "hour", fields: Fields = None
+    ) -> AsyncGenerator[DateDimensionRow, None]:
+        """
+        iter_for_date的异步适配，供异步调用方使用
+        """
+        for row in self.iter_for_date(date, granularity, fields):
+            yield row
 
     def __iter_days(
         self, start_date: datetime.date, end_date: datetime.date
     ) -> Iterator[datetime.date]:
         for n in range((end_date - start_date).days + 1):
             yield start_date + timedelta(days=n)
+
+
+def _plain(value: datetime) -> datetime:
+    # pendulum的DateTime转为标准datetime，orjson不编码datetime的子类
+    return datetime(
+        value.year,
+        value.month,
+        value.day,
+        value.hour,
+        value.minute,
+        value.second,
+        value.microsecond,
+        tzinfo=SHANGHAI,
+    )
@@ -0,0 +1,235 @@
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from loguru import logger
+
+from app.core.responses import format_datetime
+from app.schemas.date_dimension import (
+    DATETIME_FIELD_INDEXES,
+    DateDimension,
+    DateDimensionRow,
+)
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+    iter_blocks,
+    iter_rows,
+)
+from app.services.granularity import get_slots
+from app.services.holiday_service import HolidayService
+
+TABLE = "date_dimension"
+# 每个年份已载入的节假日版本
+YEARS_TABLE = "date_dimension_years"
+# 载入时的粒度与表结构，变化时整表重建
+META_TABLE = "date_dimension_meta"
+
+# 每次executemany插入的行数，内存占用与年份的行数无关
+BATCH_ROWS = 10_000
+
+COLUMNS = list(DateDimension.model_fields.keys())
+
+# 日期时间保存为与CSV导出相同的文本，如"2024-05-01 00:00:00+00:00"
+SQL_TYPES = {str: "TEXT", int: "INTEGER", datetime: "TEXT"}
+
+SCHEMA = ", ".join(
+    f"{name} {SQL_TYPES[field.annotation]} NOT NULL"
+    for name, field in DateDimension.model_fields.items()
+)
+
+INSERT = (
+    f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(COLUMNS))})"
+)
+
+
+class SqliteLoadResult(NamedTuple):
+    """一次载入的结果"""
+
+    # 重新写入的年份
+    loaded: list[int]
+    # 节假日版本未变、跳过的年份
+    skipped: list[int]
+    # 已没有节假日数据、删除的年份
+    removed: list[int]
+    # 写入的行数
+    rows: int
+
+
+class DateDimensionSqliteLoader(object):
+    """
+    在进程内生成日期维度并批量写入SQLite数据库，不经过HTTP。
+    按年份记录节假日版本，再次载入时只重写版本变化的年份；
+    粒度或表结构变化时整表重建
+    """
+
+    def __init__(
+        self,
+        holiday_service: HolidayService,
+        path: Path,
+        granularity: str = "hour",
+        batch_rows: int = BATCH_ROWS,
+    ):
+        get_slots(granularity)
+        self.holiday_service = holiday_service
+        self.path = path
+        self.granularity = granularity
+        self.batch_rows = batch_rows
+        self.columnar_date_dimension_service = ColumnarDateDimensionService(
+            holiday_service
+        )
+
+    def load(self, full: bool = False) -> SqliteLoadResult:
+        """
+        载入节假日数据覆盖的全部年份，每个年份在一个事务中删除旧行并写入新行
+
+        Args:
+            full (bool): 忽略已记录的版本，整表重建
+
+        Raises:
+            FileNotFoundError: 没有任何年份的节假日json文件
+        """
+        versions = self.holiday_service.year_versions()
+        if not versions:
+            raise FileNotFoundError(
+                f"no holiday json in {self.holiday_service.data_dir}"
+            )
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            if full or not self.__schema_matches(connection):
+                self.__create_tables(connection)
+
+            loaded_versions = dict(
+                connection.execute(f"SELECT year, version FROM {YEARS_TABLE}")
+            )
+            loaded, skipped, rows = [], [], 0
+            for year, version in versions.items():
+                if loaded_versions.get(year) == version:
+                    skipped.append(year)
+                    continue
+                rows += self.__load_year(connection, year, version)
+                loaded.append(year)
+
+            removed = sorted(set(loaded_versions) - set(versions))
+            for year in removed:
+                with _transaction(connection):
+                    self.__delete_year(connection, year)
+                    connection.execute(
+                        f"DELETE FROM {YEARS_TABLE} WHERE year = ?", (year,)
+                    )
+
+            # 首次载入时在写入全部行之后再建索引，比逐行维护索引快
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {TABLE}_date_id "
+                f"ON {TABLE} (date_id)"
+            )
+            connection.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {TABLE}_date_hour_id "
+                f"ON {TABLE} (date_hour_id)"
+            )
+        finally:
+            connection.close()
+
+        logger.info(
+            f"date dimension loaded into {self.path}: "
+            f"{len(loaded)} years rewritten ({rows} rows), "
+            f"{len(skipped)} unchanged, {len(removed)} removed"
+        )
+        return SqliteLoadResult(loaded, skipped, removed, rows)
+
+    def __meta(self) -> dict[str, str]:
+        return {"granularity": self.granularity, "columns": ",".join(COLUMNS)}
+
+    def __schema_matches(self, connection: sqlite3.Connection) -> bool:
+        try:
+            meta = dict(
+                connection.execute(f"SELECT key, value FROM {META_TABLE}")
+            )
+        except sqlite3.OperationalError:
+            return False
+        return meta == self.__meta()
+
+    def __create_tables(self, connection: sqlite3.Connection) -> None:
+        with _transaction(connection):
+            for table in (TABLE, YEARS_TABLE, META_TABLE):
+                connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.execute(f"CREATE TABLE {TABLE} ({SCHEMA})")
+            connection.execute(
+                f"CREATE TABLE {YEARS_TABLE} ("
+                "year INTEGER PRIMARY KEY, version TEXT NOT NULL, "
+                "rows INTEGER NOT NULL, loaded_at TEXT NOT NULL)"
+            )
+            connection.execute(
+                f"CREATE TABLE {META_TABLE} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            connection.executemany(
+                f"INSERT INTO {META_TABLE} VALUES (?, ?)",
+                self.__meta().items(),
+            )
+
+    def __delete_year(self, connection: sqlite3.Connection, year: int) -> None:
+        # 按date_id范围删除，走date_id索引
+        connection.execute(
+            f"DELETE FROM {TABLE} WHERE date_id BETWEEN ? AND ?",
+            (f"{year:04d}0101", f"{year:04d}1231"),
+        )
+
+    def __load_year(
+        self, connection: sqlite3.Connection, year: int, version: str
+    ) -> int:
+        """在一个事务中重写一个年份，中途失败时该年份保持原样"""
+        rows = 0
+        with _transaction(connection):
+            self.__delete_year(connection, year)
+            for batch in self.__iter_batches(year):
+                # 同一条语句只编译一次，批量绑定参数
+                connection.executemany(INSERT, batch)
+                rows += len(batch)
+            connection.execute(
+                f"INSERT OR REPLACE INTO {YEARS_TABLE} VALUES (?, ?, ?, ?)",
+                (year, version, rows, datetime.now().isoformat()),
+            )
+        logger.debug(f"date dimension {year}: {rows} rows")
+        return rows
+
+    def __iter_batches(self, year: int) -> Iterator[list[list]]:
+        batch = []
+        for block_start, block_end in iter_blocks(
+            date(year, 1, 1), date(year, 12, 31)
+        ):
+            columns = self.columnar_date_dimension_service.build_columns(
+                block_start, block_end, self.granularity
+            )
+            for row in iter_rows(columns):
+                batch.append(_to_sql(row))
+                if len(batch) >= self.batch_rows:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+
+def _to_sql(row: DateDimensionRow) -> list:
+    values = list(row)
+    for i in DATETIME_FIELD_INDEXES:
+        values[i] = format_datetime(values[i])
+    return values
+
+
+@contextmanager
+def _transaction(connection: sqlite3.Connection) -> Iterator[None]:
+    # 连接为autocommit模式，显式BEGIN/COMMIT，异常时ROLLBACK
+    connection.execute("BEGIN")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
@@ -0,0 +1,391 @@
+import os
+import json
+import struct
+from datetime import datetime, date
+from pathlib import Path
+from typing import AsyncGenerator, Iterator
+
+import numpy as np
+from loguru import logger
+
+from app.core.metrics import timed, timed_iter
+from app.schemas.date_dimension import (
+    DateDimension,
+    DateDimensionRow,
+    Fields,
+)
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+    day_fields,
+    expand_slots,
+    iter_blocks,
+    iter_rows,
+    skip_rows,
+)
+from app.services.holiday_service import HolidayService
+
+HOURS_PER_DAY = 24
+
+# 整数列的存储类型，取值范围都在int16内
+INT_DTYPE = np.int16
+
+# 文件格式：MAGIC、头部长度(u32)、头部json(版本、日期范围、记录类型、行数)、
+# 从RECORDS_ALIGN字节对齐处开始的定长记录。版本与记录在同一个文件中，整体原子替换。
+# 每段连续的年份(runs)的记录依次排列
+MAGIC = b"HCNDIM02"
+HEADER_LENGTH = struct.Struct("<I")
+RECORDS_ALIGN = 64
+
+
+class DateDimensionStore(object):
+    """
+    预计算的日期维度表。每小时一行，与节假日数据版本一起保存在一个文件中，
+    holiday-cn中的年份有间断时，每段连续的年份各占一段记录。
+    通过mmap打开，多个worker进程经由page cache共享同一份数据。
+    查询时按日期计算偏移量直接切片，不再逐行生成。
+    """
+
+    def __init__(self, path: Path):
+        """
+        Raises:
+            ValueError: 文件格式不符(如旧版本的文件)
+        """
+        with open(path, "rb") as f:
+            prefix = f.read(len(MAGIC) + HEADER_LENGTH.size)
+            if len(prefix) < HEADER_LENGTH.size + len(MAGIC) or (
+                not prefix.startswith(MAGIC)
+            ):
+                raise ValueError(f"{path} is not a date dimension store")
+            (header_length,) = HEADER_LENGTH.unpack_from(prefix, len(MAGIC))
+            header = json.loads(f.read(header_length))
+        self.path: Path = path
+        self.version: str = header["version"]
+        # 每段连续年份的(第一天, 最后一天, 第一行的序号)
+        self.runs: list[tuple[date, date, int]] = []
+        row = 0
+        for first_date, last_date in header["runs"]:
+            first_date = date.fromisoformat(first_date)
+            last_date = date.fromisoformat(last_date)
+            self.runs.append((first_date, last_date, row))
+            row += (
+                last_date.toordinal() - first_date.toordinal() + 1
+            ) * HOURS_PER_DAY
+        # 打开后文件被替换也不影响已映射的内容，版本与记录总是一致的
+        self.__records: np.ndarray = np.memmap(
+            path,
+            dtype=np.lib.format.descr_to_dtype(
+                [tuple(field) for field in header["descr"]]
+            ),
+            mode="r",
+            offset=_records_offset(header_length),
+            shape=(header["rows"],),
+        )
+
+    @classmethod
+    def build(
+        cls, holiday_service: HolidayService, path: Path
+    ) -> "DateDimensionStore":
+        """
+        生成节假日数据覆盖的所有年份的日期维度表并写入文件
+
+        Args:
+            holiday_service (HolidayService): 节假日
+            path (Path): 文件路径
+
+        Raises:
+            FileNotFoundError: 没有任何年份的节假日json文件
+
+        Returns:
+            DateDimensionStore: 打开的日期维度表
+        """
+        runs = [
+            (date(first_year, 1, 1), date(last_year, 12, 31))
+            for first_year, last_year in _contiguous_years(
+                holiday_service.years
+            )
+        ]
+        service = ColumnarDateDimensionService(holiday_service)
+        run_columns = [
+            service.build_columns(first_date, last_date)
+            for first_date, last_date in runs
+        ]
+        # 按列拼接，各段字符串列的宽度可能不同
+        encoded = {
+            name: _encode(np.concatenate([c[name] for c in run_columns]))
+            for name in run_columns[0]
+        }
+        records = np.empty(
+            len(encoded["date_id"]),
+            dtype=[(name, values.dtype) for name, values in encoded.items()],
+        )
+        for name, values in encoded.items():
+            records[name] = values
+
+        header = {
+            "version": holiday_service.version,
+            "runs": [
+                [first_date.isoformat(), last_date.isoformat()]
+                for first_date, last_date in runs
+            ],
+            "descr": np.lib.format.dtype_to_descr(records.dtype),
+            "rows": len(records),
+        }
+        encoded_header = json.dumps(header).encode("utf-8")
+        padding = (
+            _records_offset(len(encoded_header))
+            - len(MAGIC)
+            - HEADER_LENGTH.size
+            - len(encoded_header)
+        )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(HEADER_LENGTH.pack(len(encoded_header)))
+            f.write(encoded_header + b"\0" * padding)
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+
+        logger.info(
+            f"date dimension store built: {path} "
+            f"({', '.join(f'{first} ~ {last}' for first, last in runs)}, "
+            f"{len(records)} rows)"
+        )
+        return cls(path)
+
+    @classmethod
+    def open_or_build(
+        cls, holiday_service: HolidayService, path: Path
+    ) -> "DateDimensionStore | None":
+        """
+        打开日期维度表，文件不存在或与当前节假日数据版本不一致时重新生成
+
+        Returns:
+            DateDimensionStore | None: 没有任何节假日数据时为None
+        """
+        if not holiday_service.years:
+            return None
+
+        if path.exists():
+            try:
+                store = cls(path)
+            except ValueError:
+                # 旧格式的文件，重新生成
+                store = None
+            if store is not None and store.version == holiday_service.version:
+                return store
+
+        return cls.build(holiday_service, path)
+
+    @property
+    def first_date(self) -> date:
+        return self.runs[0][0]
+
+    @property
+    def last_date(self) -> date:
+        return self.runs[-1][1]
+
+    def covers(self, time_start: date, time_end: date) -> bool:
+        """日期范围是否全部在表内(同一段连续的年份中)"""
+        return self.__find_run(time_start, time_end) is not None
+
+    def __find_run(
+        self, time_start: date, time_end: date
+    ) -> tuple[date, date, int] | None:
+        for run in self.runs:
+            first_date, last_date, _ = run
+            if (
+                first_date.toordinal()
+                <= time_start.toordinal()
+                <= time_end.toordinal()
+                <= last_date.toordinal()
+            ):
+                return run
+        return None
+
+    def check_range(self, time_start: date, time_end: date) -> None:
+        """
+        Raises:
+            FileNotFoundError: 日期范围超出表的范围
+        """
+        if not self.covers(time_start, time_end):
+            raise FileNotFoundError(
+                f"{time_start:%Y-%m-%d} ~ {time_end:%Y-%m-%d} "
+                "not in date dimension store"
+            )
+
+    @timed("store.get_columns")
+    def get_columns(
+        self,
+        time_start: date,
+        time_end: date,
+        granularity: str = "hour",
+        fields: Fields = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        按日期范围切片，返回与ColumnarDateDimensionService.build_columns
+        相同格式的列。表内按小时保存，其他粒度取每天0点的行按粒度展开。
+        指定fields时只解码这些列
+
+        Raises:
+            FileNotFoundError: 日期范围超出表的范围
+        """
+        self.check_range(time_start, time_end)
+
+        first_date, _, first_row = self.__find_run(time_start, time_end)
+        first = first_date.toordinal()
+        start = first_row + (time_start.toordinal() - first) * HOURS_PER_DAY
+        stop = first_row + (time_end.toordinal() - first + 1) * HOURS_PER_DAY
+        if granularity == "hour":
+            records = self.__records[start:stop]
+            return {
+                name: _decode(records[name])
+                for name in (fields or records.dtype.names)
+            }
+
+        records = self.__records[start:stop:HOURS_PER_DAY]
+        return expand_slots(
+            {
+                name: _decode(records[name])
+                for name in (day_fields(fields) or records.dtype.names)
+            },
+            granularity,
+            fields,
+        )
+
+    @timed_iter("store.get_ste_day", unit="rows")
+    def iter_range(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+        first_slot: int = 0,
+        fields: Fields = None,
+    ) -> Iterator[DateDimensionRow]:
+        """
+        根据给定的日期范围，从表中切片并逐个返回DateDimensionRow，不做pydantic校验。
+        同步的迭代器，批处理中直接使用，不需要事件循环
+
+        参数:
+        time_start: datetime.date - 日期范围的开始时间。
+        time_end: datetime.date - 日期范围的结束时间。
+        granularity: str - 粒度，day/hour/shift/Nmin。
+        first_slot: int - 第一天从第几个时间段开始，用于分页时从游标处直接开始。
+        fields: Fields - 只返回这些字段，None为全部字段。
+
+        返回值:
+        Iterator[DateDimensionRow] - 日期范围内每个时间段一行。
+        """
+        self.check_range(time_start, time_end)
+        skip = first_slot
+        for block_start, block_end in iter_blocks(time_start, time_end):
+            columns = self.get_columns(
+                block_start, block_end, granularity, fields
+            )
+            yield from iter_rows(skip_rows(columns, skip))
+            skip = 0
+
+    def iter_for_date(
+        self, date: datetime, granularity: str = "hour", fields: Fields = None
+    ) -> Iterator[DateDimensionRow]:
+        """
+        返回给定日期各时间段的行，默认为0~23小时
+        """
+        return self.iter_range(date, date, granularity, fields=fields)
+
+    async def get_ste_day_rows(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+        first_slot: int = 0,
+        fields: Fields = None,
+    ) -> AsyncGenerator[DateDimensionRow, None]:
+        """
+        iter_range的异步适配，供异步调用方使用
+        """
+        for row in self.iter_range(
+            time_start, time_end, granularity, first_slot, fields
+        ):
+            yield row
+
+    async def get_ste_day(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str = "hour",
+    ) -> AsyncGenerator[DateDimension, None]:
+        """
+        与get_ste_day_rows相同，但逐个返回DateDimension对象。
+        """
+        for row in self.iter_range(time_start, time_end, granularity):
+            yield DateDimension(**row._asdict())
+
+    async def get_for_date_rows(
+        self, date: datetime, granularity: str = "hour", fields: Fields = None
+    ) -> AsyncGenerator[DateDimensionRow, None]:
+        """
+        返回给定日期各时间段的行，默认为0~23小时
+        """
+        for row in self.iter_for_date(date, granularity, fields):
+            yield row
+
+    async def get_for_date(
+        self, date: datetime, granularity: str = "hour"
+    ) -> AsyncGenerator[DateDimension, None]:
+        """
+        返回给定日期各时间段的DateDimension对象，默认为0~23小时
+        """
+        for row in self.iter_for_date(date, granularity):
+            yield DateDimension(**row._asdict())
+
+
+def _records_offset(header_length: int) -> int:
+    # 记录从头部之后第一个RECORDS_ALIGN字节对齐的位置开始
+    end = len(MAGIC) + HEADER_LENGTH.size + header_length
+    return -(-end // RECORDS_ALIGN) * RECORDS_ALIGN
+
+
+def _contiguous_years(years: frozenset[int]) -> list[tuple[int, int]]:
+    """
+    将年份分为若干段连续的年份，每段内按日期计算的偏移量连续
+
+    Raises:
+        FileNotFoundError: 没有任何年份
+    """
+    if not years:
+        raise FileNotFoundError("holiday-cn json files not found")
+
+    runs = []
+    for year in sorted(years):
+        if runs and runs[-1][1] == year - 1:
+            runs[-1] = (runs[-1][0], year)
+        else:
+            runs.append((year, year))
+    return runs
+
+
+def _encode(values: np.ndarray) -> np.ndarray:
+    # 字符串列保存为utf-8编码的定长字节串
+    if values.dtype.kind == "U":
+        return np.char.encode(values, "utf-8")
+    if values.dtype.kind == "i":
+        return values.astype(INT_DTYPE)
+    return values
+
+
+def _decode(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "S":
+        return np.char.decode(values, "utf-8")
+    return np.asarray(values)
+
+
+if __name__ == "__main__":
+    # 构建步骤：python -m app.services.date_dimension_store
+    from app.core.config import settings
+
+    DateDimensionStore.build(
+        HolidayService(settings.HOLIDAY_DATA_DIR),
+        settings.DATE_DIMENSION_STORE,
+    )
@@ -0,0 +1,82 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+MINUTES_PER_DAY = 24 * 60
+
+# 班次：0-7点为夜班，8-16点为早班，17-23点为中班
+SHIFTS = ["夜"] * 8 + ["早"] * 9 + ["中"] * 7
+SHIFT_START_HOURS = (0, 8, 17)
+
+# 日期维度的粒度：day、hour、shift，或N分钟(如15min)
+GRANULARITY_PATTERN = r"^(day|hour|shift|[1-9][0-9]{0,3}min)$"
+
+GRANULARITY_DESCRIPTION = (
+    "日期维度的粒度，决定每天的行数和date_hour_id的格式："
+    "day每天一行，date_hour_id为YYYYMMDD；"
+    "hour每小时一行，date_hour_id为YYYYMMDDHH；"
+    "shift每个班次一行，date_hour_id为YYYYMMDDHH，HH为班次开始的小时00/08/17；"
+    "Nmin每N分钟一行(N需整除1440)，date_hour_id为YYYYMMDDHHmm"
+)
+
+
+class Slot(NamedTuple):
+    """一天中的一个时间段"""
+
+    # 距当天0点的分钟数
+    minute: int
+    # 拼接在date_id之后组成date_hour_id
+    id_suffix: str
+    hour: str
+    shift: str
+
+
+@lru_cache
+def get_slots(granularity: str) -> tuple[Slot, ...]:
+    """
+    返回给定粒度下一天内的全部时间段
+
+    Raises:
+        ValueError: 不支持的粒度
+    """
+    if granularity == "day":
+        return (Slot(0, "", "", ""),)
+    if granularity == "hour":
+        return tuple(
+            Slot(hour * 60, f"{hour:02d}", str(hour), SHIFTS[hour])
+            for hour in range(24)
+        )
+    if granularity == "shift":
+        return tuple(
+            Slot(hour * 60, f"{hour:02d}", str(hour), SHIFTS[hour])
+            for hour in SHIFT_START_HOURS
+        )
+    if granularity.endswith("min") and granularity[:-3].isdigit():
+        minutes = int(granularity[:-3])
+        if 0 < minutes <= MINUTES_PER_DAY and MINUTES_PER_DAY % minutes == 0:
+            return tuple(
+                Slot(
+                    minute,
+                    f"{minute // 60:02d}{minute % 60:02d}",
+                    str(minute // 60),
+                    SHIFTS[minute // 60],
+                )
+                for minute in range(0, MINUTES_PER_DAY, minutes)
+            )
+
+    raise ValueError(f"unsupported granularity: {granularity}")
+
+
+def slot_index(granularity: str, minute: int) -> int:
+    """
+    返回给定粒度下，一天中从minute(距0点的分钟数)开始的时间段的序号
+
+    Raises:
+        ValueError: 不支持的粒度，或minute不是某个时间段的开始
+    """
+    for index, slot in enumerate(get_slots(granularity)):
+        if slot.minute == minute:
+            return index
+
+    raise ValueError(
+        f"{minute // 60:02d}:{minute % 60:02d} is not a {granularity} boundary"
+    )
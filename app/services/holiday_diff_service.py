@@ -0,0 +1,179 @@
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, Literal, NamedTuple
+
+from app.core.responses import CsvEncoder, dumps_lines
+from app.schemas.date_dimension import (
+    Fields,
+    datetime_field_indexes,
+    row_type,
+)
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+    iter_blocks,
+    iter_rows,
+)
+from app.services.granularity import get_slots
+from app.services.holiday_service import HolidayService
+from app.services.holiday_snapshot import read_snapshot
+
+# insert为新增年份的行，update为已有年份中节假日变化的日期的行
+Change = Literal["insert", "update"]
+
+# 增量导出的格式
+ChangeFormat = Literal["ndjson", "csv"]
+
+# 没有节假日的日期，holiday_name为空、date_type为工作日
+NO_HOLIDAY = ("", False)
+
+
+class HolidayVersion(NamedTuple):
+    """一个版本的节假日数据，只保留日期维度用到的部分"""
+
+    # 有json文件的年份
+    years: frozenset[int]
+    # 日期序号到(节假日名称, 是否放假)，没有节假日的日期不在其中
+    days: dict[int, tuple[str, bool]]
+
+
+class HolidayDiff(NamedTuple):
+    """两个版本的节假日数据的差异"""
+
+    # 新版本中新增的年份，整年插入
+    inserted_years: list[int]
+    # 新版本中已没有的年份
+    deleted_years: list[int]
+    # 两个版本都有的年份中holiday_name或date_type变化的日期
+    updated_dates: list[date]
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.inserted_years or self.deleted_years or self.updated_dates
+        )
+
+    def ranges(self) -> list[tuple[date, date, Change]]:
+        """
+        需要导出的日期范围(含首尾)，按日期排序：
+        新增的年份为整年，变化的日期中连续的合并为一个范围
+        """
+        ranges: list[tuple[date, date, Change]] = [
+            (date(year, 1, 1), date(year, 12, 31), "insert")
+            for year in self.inserted_years
+        ]
+        start = end = None
+        for d in self.updated_dates:
+            if end is not None and d == end + timedelta(days=1):
+                end = d
+                continue
+            if start is not None:
+                ranges.append((start, end, "update"))
+            start = end = d
+        if start is not None:
+            ranges.append((start, end, "update"))
+        return sorted(ranges)
+
+
+def load_holidays(data_dir: Path) -> HolidayService:
+    """
+    加载一个holiday-cn目录作为比较的一方，不使用快照。
+    目录缺失或为空时报错，而不是当作没有任何年份(否则每个年份都成了新增或删除)
+
+    Raises:
+        FileNotFoundError: 目录不存在或没有节假日json文件
+    """
+    holiday_service = HolidayService(data_dir)
+    if not holiday_service.years:
+        raise FileNotFoundError(f"no holiday json in {data_dir}")
+    return holiday_service
+
+
+def version_of(holiday_service: HolidayService) -> HolidayVersion:
+    """已加载的节假日数据"""
+    return HolidayVersion(
+        holiday_service.years,
+        {r.ordinal: (r.name, r.is_offday) for r in holiday_service.records},
+    )
+
+
+def version_of_snapshot(path: Path) -> HolidayVersion:
+    """
+    二进制快照中的节假日数据，即上次加载的版本
+
+    Raises:
+        FileNotFoundError: 快照不存在或格式不兼容
+    """
+    snapshot = read_snapshot(path)
+    if snapshot is None or not snapshot.years:
+        raise FileNotFoundError(f"holiday snapshot {path} not found")
+    return HolidayVersion(
+        snapshot.years,
+        {r.ordinal: (r.name, r.is_offday) for r in snapshot.records},
+    )
+
+
+def diff_holidays(old: HolidayVersion, new: HolidayVersion) -> HolidayDiff:
+    """
+    比较两个版本的节假日数据。日期维度中只有holiday_name与date_type取决于节假日，
+    date_type只取决于是否放假，因此只比较(名称, 是否放假)，
+    名称或是否放假都未变的日期(如只改了json中的其他内容)不算变化
+    """
+    common = old.years & new.years
+    ordinals = {
+        o
+        for o in old.days.keys() | new.days.keys()
+        if old.days.get(o, NO_HOLIDAY) != new.days.get(o, NO_HOLIDAY)
+    }
+    updated = sorted(
+        d for d in map(date.fromordinal, ordinals) if d.year in common
+    )
+    return HolidayDiff(
+        sorted(new.years - old.years), sorted(old.years - new.years), updated
+    )
+
+
+@lru_cache(maxsize=256)
+def change_row_type(fields: Fields = None) -> type[tuple]:
+    """增量导出的行类型：第一个字段为change，其余与row_type(fields)相同"""
+    rows = row_type(fields)
+    return NamedTuple(
+        "DateDimensionChange",
+        [("change", str)] + list(rows.__annotations__.items()),
+    )
+
+
+def iter_changes(
+    holiday_service: HolidayService,
+    diff: HolidayDiff,
+    granularity: str = "hour",
+    fields: Fields = None,
+) -> Iterator[tuple]:
+    """
+    按新版本的节假日数据生成变化的行，按日期排序，每行为change_row_type(fields)。
+    删除的年份没有行，由调用方根据diff.deleted_years处理
+
+    Args:
+        holiday_service (HolidayService): 新版本的节假日数据
+        diff (HolidayDiff): diff_holidays的结果
+    """
+    get_slots(granularity)
+    service = ColumnarDateDimensionService(holiday_service)
+    make = change_row_type(fields)._make
+    for start, end, change in diff.ranges():
+        for block_start, block_end in iter_blocks(start, end):
+            columns = service.build_columns(
+                block_start, block_end, granularity, fields
+            )
+            for row in iter_rows(columns):
+                yield make((change, *row))
+
+
+def changes_encoder(
+    chunk_format: ChangeFormat, fields: Fields = None
+) -> Callable[[list[tuple]], bytes]:
+    """返回编码一批变化的行的函数，CSV不含表头，一个流的各批共用缓冲区"""
+    if chunk_format == "csv":
+        return CsvEncoder(
+            tuple(i + 1 for i in datetime_field_indexes(fields))
+        ).encode
+    return dumps_lines
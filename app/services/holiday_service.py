@@ -1,52 +1,338 @@
-import os
 import json
+import bisect
+import hashlib
 import datetime
-from functools import lru_cache
 
 from pathlib import Path
-import aiofiles
 
+from app.core.metrics import timed
 from app.schemas.holiday import Holiday
+from app.services.holiday_snapshot import (
+    HolidayRecord,
+    HolidaySnapshot,
+    dump_snapshot,
+    read_snapshot,
+    write_snapshot,
+)
 
 
 class HolidayService(object):
+    """
+    节假日索引。启动时一次性加载holiday-cn目录下所有年份的json文件，
+    按日期序号(ordinal)建立字典，查询时只做一次哈希查找，不再有文件I/O和列表扫描。
+    同时按日期排序保存一份日历，日期范围查询用二分查找定位后直接切片。
+    从二进制快照加载时只保存(名称, 是否放假)，Holiday对象在第一次查询时才创建；
+    快照中记录的json文件签名与目录一致时不读取json文件。
+    指定snapshot时直接使用其中已解析的数据，不读取data_dir(如进程池的子进程)。
+    """
 
-    @lru_cache
-    async def __load_json(self, date: datetime) -> list[Holiday]:
+    def __init__(
+        self,
+        data_dir: Path | None = None,
+        snapshot_path: Path | None = None,
+        snapshot: HolidaySnapshot | None = None,
+    ):
+        self.data_dir: Path = data_dir or Path.cwd() / "holiday-cn"
+        self.snapshot_path: Path | None = snapshot_path
+        # 本次加载的来源：snapshot或json
+        self.loaded_from: str = ""
+        # 快照与json文件不一致(版本或文件签名)，需要重新写入
+        self.snapshot_stale: bool = False
+        self.__signature: tuple = ()
+        self.__positions: dict[int, int] = {}
+        self.__ordinals: list[int] = []
+        self.__records: list[HolidayRecord] = []
+        self.__calendar: list[Holiday | None] = []
+        self.__years: frozenset[int] = frozenset()
+        self.__version: str = ""
+        self.__last_modified: datetime.datetime | None = None
+        self.__snapshot_bytes: bytes | None = None
+        if snapshot is None:
+            self.load()
+        else:
+            self.__use(
+                snapshot.records,
+                [None] * len(snapshot.records),
+                snapshot.years,
+                snapshot.version,
+            )
+            self.__signature = snapshot.signature
+            self.loaded_from = "snapshot"
+
+    @timed("holiday.load")
+    def load(self) -> None:
         """
-        按照年份加载节假日json文件
+        加载data_dir下所有年份的节假日json文件。
+        快照中的文件签名(文件名、大小、修改时间)与目录一致时只读取快照；
+        否则读取json计算版本，与快照版本一致时仍使用快照，不再解析json
         """
-        json_file: Path = self.__get_holiday_json_file(date)
-        if not os.path.exists(json_file):
-            raise FileNotFoundError
+        # 先取签名再读取内容，读取期间文件变化时下次启动会重新比较内容
+        signature = self.fingerprint()
+        self.__signature = signature
+        self.__last_modified = datetime.datetime.fromtimestamp(
+            max((mtime_ns for _, _, mtime_ns in signature), default=0)
+            // 1_000_000_000,
+            datetime.timezone.utc,
+        )
 
-        async with aiofiles.open(json_file) as f:
-            contents = await f.read()
+        snapshot = (
+            read_snapshot(self.snapshot_path) if self.snapshot_path else None
+        )
+        # 没有json文件时签名为空，不能与旧格式快照的空签名视为一致
+        comparable = snapshot is not None and bool(signature)
+        if comparable and snapshot.signature == signature:
+            self.__use(
+                snapshot.records,
+                [None] * len(snapshot.records),
+                snapshot.years,
+                snapshot.version,
+            )
+            self.loaded_from = "snapshot"
+            self.snapshot_stale = False
+            return
 
-        holidays = json.loads(contents)
-        return [Holiday(**h) for h in holidays["days"]]
+        raws: list[bytes] = []
+        years: set[int] = set()
+        digest = hashlib.sha256()
+        for json_file in self.__iter_holiday_json_files():
+            raw = json_file.read_bytes()
+            digest.update(json_file.name.encode())
+            digest.update(raw)
+            raws.append(raw)
+            years.add(int(json_file.stem))
+        version = digest.hexdigest()
 
-    def __get_holiday_json_file(self, date: datetime) -> Path:
-        """build the path of holiday json file
+        if snapshot is not None and snapshot.version == version:
+            records = snapshot.records
+            calendar: list[Holiday | None] = [None] * len(records)
+            self.loaded_from = "snapshot"
+        else:
+            holidays = self.__parse(raws)
+            records = [
+                HolidayRecord(o, holidays[o].name, holidays[o].is_offday)
+                for o in sorted(holidays)
+            ]
+            calendar = [holidays[r.ordinal] for r in records]
+            self.loaded_from = "json"
 
-        Args:
-            date (datetime): 日期
+        self.__use(records, calendar, frozenset(years), version)
+        self.snapshot_stale = True
+
+    def __use(
+        self,
+        records: list[HolidayRecord],
+        calendar: list[Holiday | None],
+        years: frozenset[int],
+        version: str,
+    ) -> None:
+        self.__ordinals = [r.ordinal for r in records]
+        self.__positions = {o: i for i, o in enumerate(self.__ordinals)}
+        self.__records = records
+        self.__calendar = calendar
+        self.__years = years
+        self.__version = version
+        self.__snapshot_bytes = None
+
+    @staticmethod
+    def __parse(raws: list[bytes]) -> dict[int, Holiday]:
+        holidays: dict[int, Holiday] = {}
+        for raw in raws:
+            for h in json.loads(raw)["days"]:
+                holiday = Holiday(**h)
+                ordinal = datetime.date.fromisoformat(holiday.date).toordinal()
+                holidays[ordinal] = holiday
+        return holidays
+
+    def __holiday(self, position: int) -> Holiday:
+        holiday = self.__calendar[position]
+        if holiday is None:
+            record = self.__records[position]
+            holiday = Holiday(
+                name=record.name,
+                date=datetime.date.fromordinal(record.ordinal).isoformat(),
+                isOffDay=record.is_offday,
+            )
+            self.__calendar[position] = holiday
+        return holiday
+
+    def write_snapshot(self, path: Path) -> None:
+        """将已加载的节假日写为二进制快照，下次启动时不再解析json"""
+        write_snapshot(
+            self.__version,
+            self.__records,
+            path,
+            self.__years,
+            self.__signature,
+        )
+
+    def snapshot_bytes(self) -> bytes:
+        """已加载的节假日编码为二进制快照，用于把同一份数据传给其他进程"""
+        if self.__snapshot_bytes is None:
+            self.__snapshot_bytes = dump_snapshot(
+                self.__version, self.__records, self.__years
+            )
+        return self.__snapshot_bytes
+
+    def year_versions(self) -> dict[int, str]:
+        """每个年份的节假日版本，为该年份内全部节假日(日期、名称、是否放假)的sha256。
+        相邻年份的json文件中也可能有该年份的日期(如跨年的调休)，
+        按合并后实际生效的数据计算，只有影响该年份的变化才会改变它的版本
+
+        Returns:
+            dict[int, str]: 年份到版本的映射, 按年份排序
+        """
+        digests = {
+            year: hashlib.sha256(str(year).encode())
+            for year in sorted(self.__years)
+        }
+        for record in self.__records:
+            digest = digests.get(
+                datetime.date.fromordinal(record.ordinal).year
+            )
+            if digest is not None:
+                name, is_offday = record.name, record.is_offday
+                digest.update(
+                    f"{record.ordinal}:{name}:{is_offday:d};".encode()
+                )
+        return {year: digest.hexdigest() for year, digest in digests.items()}
+
+    def fingerprint(self) -> tuple:
+        """data_dir下节假日json文件的文件名、大小与修改时间，
+        只读取目录与文件元数据，用于低成本地判断数据是否有变化
+        """
+        return tuple(
+            (p.name, p.stat().st_size, p.stat().st_mtime_ns)
+            for p in self.__iter_holiday_json_files()
+        )
+
+    def __iter_holiday_json_files(self) -> list[Path]:
+        """list the holiday json files, one per year
 
         Returns:
-            Path: json路径
+            list[Path]: json路径, 按年份排序
+        """
+        if not self.data_dir.is_dir():
+            return []
+
+        return sorted(
+            p for p in self.data_dir.glob("*.json") if p.stem.isdigit()
+        )
+
+    @property
+    def years(self) -> frozenset[int]:
+        """已加载的年份"""
+        return self.__years
+
+    @property
+    def records(self) -> list[HolidayRecord]:
+        """全部节假日与调休工作日，按日期序号排序"""
+        return self.__records
+
+    @property
+    def version(self) -> str:
+        """已加载节假日数据的版本指纹，为全部json文件内容的sha256"""
+        return self.__version
+
+    @property
+    def last_modified(self) -> datetime.datetime | None:
+        """节假日json文件的最后修改时间(UTC，精确到秒)"""
+        return self.__last_modified
+
+    def check_range(
+        self, time_start: datetime.date, time_end: datetime.date
+    ) -> None:
+        """检查日期范围内的每个年份都有节假日数据
+
+        Raises:
+            FileNotFoundError: 某个年份没有节假日json文件
         """
-        return Path.cwd() / "holiday-cn" / f"{date.year}.json"
+        for year in range(time_start.year, time_end.year + 1):
+            if year not in self.__years:
+                raise FileNotFoundError(f"holiday-cn/{year}.json not found")
 
-    async def get_for_date(self, date: datetime.date) -> Holiday | None:
+    @timed("holiday.get_for_date")
+    def get_for_date(self, date: datetime.date) -> Holiday | None:
         """查询某个日期的节假日
 
         Args:
-            date (datetime.date): 某个日期
+            date (datetime.date): 某个日期, 也可以是datetime对象
+
+        Raises:
+            FileNotFoundError: 该年份没有节假日json文件
 
         Returns:
             Holiday | None: 节假日。如果没有, 则为None
         """
-        holidays = await self.__load_json(date)
-        days = [d for d in holidays if d.date == date.strftime("%Y-%m-%d")]
+        if date.year not in self.__years:
+            raise FileNotFoundError(f"holiday-cn/{date.year}.json not found")
+
+        position = self.__positions.get(date.toordinal())
+        return None if position is None else self.__holiday(position)
+
+    def get_for_dates(
+        self, dates: list[datetime.date]
+    ) -> list[Holiday | None]:
+        """批量查询多个日期的节假日
+
+        Args:
+            dates (list[datetime.date]): 日期列表, 可以无序、重复
+
+        Raises:
+            FileNotFoundError: 某个日期的年份没有节假日json文件
+
+        Returns:
+            list[Holiday | None]: 与dates一一对应的节假日, 没有则为None
+        """
+        for year in {d.year for d in dates}:
+            if year not in self.__years:
+                raise FileNotFoundError(f"holiday-cn/{year}.json not found")
+
+        positions = self.__positions
+        return [
+            (
+                None
+                if (position := positions.get(d.toordinal())) is None
+                else self.__holiday(position)
+            )
+            for d in dates
+        ]
+
+    def get_range(
+        self, time_start: datetime.date, time_end: datetime.date
+    ) -> list[Holiday]:
+        """查询日期范围内(含首尾)的所有节假日与调休工作日
+
+        Args:
+            time_start (datetime.date): 开始日期
+            time_end (datetime.date): 结束日期
+
+        Raises:
+            FileNotFoundError: 某个年份没有节假日json文件
+
+        Returns:
+            list[Holiday]: 按日期排序的节假日
+        """
+        self.check_range(time_start, time_end)
+
+        lo, hi = self.__bisect(time_start, time_end)
+        return [self.__holiday(position) for position in range(lo, hi)]
+
+    def get_records(
+        self, time_start: datetime.date, time_end: datetime.date
+    ) -> list[HolidayRecord]:
+        """与get_range相同，但返回(日期序号, 名称, 是否放假)，不创建Holiday对象
+
+        Raises:
+            FileNotFoundError: 某个年份没有节假日json文件
+        """
+        self.check_range(time_start, time_end)
+
+        lo, hi = self.__bisect(time_start, time_end)
+        return self.__records[lo:hi]
 
-        return days[0] if days else None
+    def __bisect(
+        self, time_start: datetime.date, time_end: datetime.date
+    ) -> tuple[int, int]:
+        lo = bisect.bisect_left(self.__ordinals, time_start.toordinal())
+        hi = bisect.bisect_right(self.__ordinals, time_end.toordinal())
+        return lo, hi
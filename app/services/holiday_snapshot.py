@@ -0,0 +1,148 @@
+import json
+import os
+import struct
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+# 文件格式：MAGIC、头部长度(u32)、头部json(版本、名称表与json文件签名)、定长记录
+MAGIC = b"HCNSNAP1"
+HEADER_LENGTH = struct.Struct("<I")
+# 每个节假日一条记录：日期序号、标志位(bit0为是否放假)、名称在名称表中的下标
+RECORD = struct.Struct("<iBH")
+FLAG_OFFDAY = 1
+
+
+class HolidayRecord(NamedTuple):
+    """一个节假日或调休工作日"""
+
+    ordinal: int
+    name: str
+    is_offday: bool
+
+
+class HolidaySnapshot(NamedTuple):
+    version: str
+    # 按日期序号排序
+    records: list[HolidayRecord]
+    # 有json文件的年份，旧格式的快照中没有，按records推断
+    years: frozenset[int] = frozenset()
+    # 生成快照时各json文件的(文件名, 大小, 修改时间ns)，一致时不再读取json
+    signature: tuple = ()
+
+
+def dump_snapshot(
+    version: str,
+    records: list[HolidayRecord],
+    years: frozenset[int] = frozenset(),
+    signature: tuple = (),
+) -> bytes:
+    """
+    将已解析的节假日编码为二进制快照
+
+    Args:
+        version (str): 节假日json文件的版本指纹
+        records (list[HolidayRecord]): 按日期序号排序的节假日
+        years (frozenset[int]): 有json文件的年份
+        signature (tuple): 各json文件的(文件名, 大小, 修改时间ns)
+    """
+    names = sorted({r.name for r in records})
+    name_ids = {name: i for i, name in enumerate(names)}
+    header = json.dumps(
+        {
+            "version": version,
+            "names": names,
+            "years": sorted(years),
+            "files": [list(f) for f in signature],
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+    packed = b"".join(
+        RECORD.pack(
+            r.ordinal, FLAG_OFFDAY if r.is_offday else 0, name_ids[r.name]
+        )
+        for r in records
+    )
+    return MAGIC + HEADER_LENGTH.pack(len(header)) + header + packed
+
+
+def load_snapshot(data: bytes) -> HolidaySnapshot | None:
+    """
+    解码dump_snapshot的结果
+
+    Returns:
+        HolidaySnapshot | None: 格式不符时为None
+    """
+    if not data.startswith(MAGIC):
+        return None
+
+    offset = len(MAGIC)
+    (header_length,) = HEADER_LENGTH.unpack_from(data, offset)
+    offset += HEADER_LENGTH.size
+    header = json.loads(data[offset : offset + header_length])
+    offset += header_length
+    if (len(data) - offset) % RECORD.size:
+        return None
+
+    names = header["names"]
+    records = [
+        HolidayRecord(ordinal, names[name_id], bool(flags & FLAG_OFFDAY))
+        for ordinal, flags, name_id in RECORD.iter_unpack(data[offset:])
+    ]
+    years = header.get("years") or {
+        date.fromordinal(r.ordinal).year for r in records
+    }
+    signature = tuple(tuple(f) for f in header.get("files", []))
+    return HolidaySnapshot(
+        header["version"], records, frozenset(years), signature
+    )
+
+
+def write_snapshot(
+    version: str,
+    records: list[HolidayRecord],
+    path: Path,
+    years: frozenset[int] = frozenset(),
+    signature: tuple = (),
+) -> None:
+    """
+    将已解析的节假日写为二进制快照，先写临时文件再替换
+
+    Args:
+        version (str): 节假日json文件的版本指纹
+        records (list[HolidayRecord]): 按日期序号排序的节假日
+        path (Path): 快照文件路径
+        years (frozenset[int]): 有json文件的年份
+        signature (tuple): 各json文件的(文件名, 大小, 修改时间ns)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(dump_snapshot(version, records, years, signature))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: Path) -> HolidaySnapshot | None:
+    """
+    一次读取整个快照文件
+
+    Returns:
+        HolidaySnapshot | None: 文件不存在或格式不符时为None
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return load_snapshot(data)
+
+
+if __name__ == "__main__":
+    # 构建步骤：python -m app.services.holiday_snapshot
+    from app.core.config import settings
+    from app.services.holiday_service import HolidayService
+
+    holiday_service = HolidayService(settings.HOLIDAY_DATA_DIR)
+    holiday_service.write_snapshot(settings.HOLIDAY_SNAPSHOT)
+    print(
+        f"holiday snapshot written: {settings.HOLIDAY_SNAPSHOT} "
+        f"({sorted(holiday_service.years)})"
+    )
@@ -0,0 +1,105 @@
+import base64
+import binascii
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from app.services.granularity import get_slots, slot_index
+
+
+class Position(NamedTuple):
+    """游标指向的行：日期与该行时间段距0点的分钟数"""
+
+    day: date
+    minute: int
+
+
+class Page(NamedTuple):
+    """一页日期维度的范围"""
+
+    # 本页第一行所在的日期，以及它是当天的第几个时间段
+    first_day: date
+    first_slot: int
+    # 本页最后一行所在的日期
+    last_day: date
+    # 本页最多的行数，None为到结束日期为止
+    limit: int | None
+    # 下一页的游标，没有下一页时为None
+    next_cursor: str | None
+
+
+def encode_cursor(position: Position, granularity: str) -> str:
+    """
+    将下一页第一行的位置编码为不透明的游标，格式为
+    base64url("YYYYMMDDHHmm/粒度")
+    """
+    raw = (
+        f"{position.day:%Y%m%d}"
+        f"{position.minute // 60:02d}{position.minute % 60:02d}/{granularity}"
+    )
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, granularity: str) -> Position:
+    """
+    Raises:
+        ValueError: 游标无效，或与请求的粒度不一致
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        stamp, cursor_granularity = raw.decode().split("/")
+        moment = datetime.strptime(stamp, "%Y%m%d%H%M")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor")
+
+    if cursor_granularity != granularity:
+        raise ValueError("cursor does not match granularity")
+    return Position(moment.date(), moment.hour * 60 + moment.minute)
+
+
+def plan_page(
+    start_date: date,
+    end_date: date,
+    granularity: str,
+    limit: int | None,
+    cursor: str | None = None,
+) -> Page:
+    """
+    计算一页的范围与下一页的游标。每天的行数由粒度决定，
+    不需要生成前面的行就能定位到游标处，也能直接算出下一页从哪里开始
+
+    Raises:
+        ValueError: 不支持的粒度，游标无效或不在日期范围内
+    """
+    slots = get_slots(granularity)
+    first_day, first_slot = start_date, 0
+    if cursor is not None:
+        position = decode_cursor(cursor, granularity)
+        if not start_date <= position.day <= end_date:
+            raise ValueError("cursor is out of range")
+        first_day = position.day
+        first_slot = slot_index(granularity, position.minute)
+
+    if limit is None:
+        return Page(first_day, first_slot, end_date, None, None)
+
+    # 不超过剩余的行数，避免很大的limit在日期计算时溢出
+    remaining = ((end_date - first_day).days + 1) * len(slots) - first_slot
+    if remaining <= 0:
+        # 开始日期晚于结束日期，与不分页时一样是空的
+        return Page(first_day, first_slot, end_date, 0, None)
+    limit = min(limit, remaining)
+
+    # 下一页第一行相对first_day 0点的序号
+    end = first_slot + limit
+    last_day = first_day + timedelta(days=(end - 1) // len(slots))
+    days, slot = divmod(end, len(slots))
+    next_day = first_day + timedelta(days=days)
+    if next_day > end_date:
+        return Page(
+            first_day, first_slot, min(last_day, end_date), limit, None
+        )
+
+    next_cursor = encode_cursor(
+        Position(next_day, slots[slot].minute), granularity
+    )
+    return Page(first_day, first_slot, last_day, limit, next_cursor)
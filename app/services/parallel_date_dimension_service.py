@@ -0,0 +1,214 @@
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncGenerator, Callable, Iterable, Iterator, Literal
+
+import numpy as np
+
+from app.core.responses import CsvEncoder, dumps, dumps_lines
+from app.schemas.date_dimension import (
+    DateDimensionRow,
+    Fields,
+    datetime_field_indexes,
+)
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+    _as_date,
+    iter_rows,
+)
+from app.services.holiday_service import HolidayService
+from app.services.holiday_snapshot import load_snapshot
+
+# 并行生成时切分日期范围的单位
+ParallelChunk = Literal["year", "month"]
+
+# 子进程内的输出格式：json为去掉首尾括号的数组元素，columns为build_columns的结果
+ChunkFormat = Literal["json", "ndjson", "csv", "columns"]
+
+
+class GenerationPool(object):
+    """
+    进程池，每个应用(每个worker进程)共享一个，进程数固定。
+    子进程不读取holiday-cn目录：每个任务带上父进程已加载数据的二进制快照，
+    子进程按版本缓存解析结果，之后按块生成日期维度并在子进程内编码，
+    只把编码后的bytes(或numpy列)传回。
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        chunk: ParallelChunk = "month",
+        min_rows: int = 0,
+    ):
+        self.workers = workers
+        self.chunk: ParallelChunk = chunk
+        # 行数达到该值时自动并行生成，0为只在请求指定时并行
+        self.min_rows = min_rows
+        # 最多同时提交的块数，客户端读取较慢时不再提交新的块，内存占用有上限
+        self.max_pending = workers * 2
+        # 不使用fork：事件循环与线程池所在的进程fork后状态不确定
+        self.__executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def map_ordered(
+        self, fn: Callable[..., Any], tasks: Iterable[tuple]
+    ) -> AsyncGenerator[Any, None]:
+        """
+        在子进程中执行fn(*task)，按tasks的顺序返回结果。
+        已提交但未取走的任务最多max_pending个
+        """
+        loop = asyncio.get_running_loop()
+        pending: deque[asyncio.Future] = deque()
+        try:
+            for task in tasks:
+                pending.append(
+                    loop.run_in_executor(self.__executor, fn, *task)
+                )
+                if len(pending) >= self.max_pending:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # 客户端断开时取消还未开始的块
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ParallelDateDimensionService(object):
+    """
+    将日期范围按年或月切块，在GenerationPool中并行生成，按顺序流式返回。
+    子进程使用按列计算的引擎，输出与其他引擎完全一致。
+    """
+
+    def __init__(self, pool: GenerationPool, holiday_service: HolidayService):
+        self.pool = pool
+        self.holiday_service = holiday_service
+
+    async def stream(
+        self,
+        time_start: datetime,
+        time_end: datetime,
+        granularity: str,
+        chunk_format: ChunkFormat,
+        fields: Fields = None,
+    ) -> AsyncGenerator[bytes | dict[str, np.ndarray], None]:
+        """
+        按顺序返回每一块的输出
+
+        参数:
+        time_start: datetime.date - 日期范围的开始时间。
+        time_end: datetime.date - 日期范围的结束时间。
+        granularity: str - 粒度，day/hour/shift/Nmin。
+        chunk_format: ChunkFormat - 子进程内的输出格式。
+        fields: Fields - 只生成并输出这些字段，None为全部字段。
+        """
+        # 子进程使用与父进程相同的数据：目录中的文件可能已经更新但尚未热加载，
+        # 子进程也可能在那之后才启动，因此不从目录读取。快照只有几KB
+        version = self.holiday_service.version
+        snapshot = self.holiday_service.snapshot_bytes()
+        tasks = (
+            (
+                version,
+                snapshot,
+                chunk_start,
+                chunk_end,
+                granularity,
+                chunk_format,
+                fields,
+            )
+            for chunk_start, chunk_end in iter_periods(
+                time_start, time_end, self.pool.chunk
+            )
+        )
+        async for result in self.pool.map_ordered(_generate_chunk, tasks):
+            yield result
+
+
+def rows_encoder(
+    chunk_format: ChunkFormat, fields: Fields = None
+) -> Callable[[list[DateDimensionRow]], bytes]:
+    """
+    返回将一块行编码为输出格式的函数，一个流的各块共用一个(CSV共用缓冲区)。
+    并行与否输出的内容相同：json为逗号分隔的数组元素(不含首尾括号)，csv不含表头。
+    fields为行的投影，决定csv中日期时间列的位置
+    """
+    if chunk_format == "ndjson":
+        return dumps_lines
+    if chunk_format == "csv":
+        return CsvEncoder(datetime_field_indexes(fields)).encode
+    if chunk_format == "json":
+        return lambda rows: dumps(rows)[1:-1]
+    raise ValueError(f"unsupported chunk format: {chunk_format}")
+
+
+def encode_rows(
+    rows: list[DateDimensionRow],
+    chunk_format: ChunkFormat,
+    fields: Fields = None,
+) -> bytes:
+    """只编码一块行(如子进程中的一个任务)"""
+    return rows_encoder(chunk_format, fields)(rows)
+
+
+def iter_periods(
+    time_start: date, time_end: date, chunk: ParallelChunk
+) -> Iterator[tuple[date, date]]:
+    """
+    将日期范围按自然年或自然月切分，首尾两块可能不完整
+    """
+    start = _as_date(time_start)
+    end = _as_date(time_end)
+    while start <= end:
+        if chunk == "year":
+            next_start = date(start.year + 1, 1, 1)
+        elif start.month == 12:
+            next_start = date(start.year + 1, 1, 1)
+        else:
+            next_start = date(start.year, start.month + 1, 1)
+        chunk_end = min(next_start - timedelta(days=1), end)
+        yield start, chunk_end
+        start = next_start
+
+
+# 以下在子进程中执行
+_worker_service: ColumnarDateDimensionService | None = None
+
+
+def _service_for(
+    version: str, snapshot: bytes
+) -> ColumnarDateDimensionService:
+    """与父进程版本一致的引擎，版本变化(热加载)后按新的快照重建"""
+    global _worker_service
+    if (
+        _worker_service is None
+        or _worker_service.holiday_service.version != version
+    ):
+        _worker_service = ColumnarDateDimensionService(
+            HolidayService(snapshot=load_snapshot(snapshot))
+        )
+    return _worker_service
+
+
+def _generate_chunk(
+    version: str,
+    snapshot: bytes,
+    time_start: date,
+    time_end: date,
+    granularity: str,
+    chunk_format: ChunkFormat,
+    fields: Fields = None,
+) -> bytes | dict[str, np.ndarray]:
+    columns = _service_for(version, snapshot).build_columns(
+        time_start, time_end, granularity, fields
+    )
+    if chunk_format == "columns":
+        return columns
+
+    return encode_rows(list(iter_rows(columns)), chunk_format, fields)
@@ -0,0 +1,110 @@
+import datetime
+
+import numpy as np
+
+from app.services.holiday_service import HolidayService
+
+
+class WorkdayService(object):
+    """
+    工作日计算。启动时为节假日数据覆盖的每一天计算是否为工作日，
+    并保存前缀和：区间内的工作日数为两次数组访问，
+    加减N个工作日为一次二分查找，与日期跨度无关。
+
+    工作日规则：有节假日记录的按is_offday(放假或调休上班)，
+    否则周一至周五为工作日、周六周日为休息日。
+    """
+
+    def __init__(self, holiday_service: HolidayService):
+        self.holiday_service = holiday_service
+        years = holiday_service.years
+        if years:
+            self.first_date = datetime.date(min(years), 1, 1)
+            self.last_date = datetime.date(max(years), 12, 31)
+        else:
+            self.first_date = datetime.date.max
+            self.last_date = datetime.date.min
+        self.__first = self.first_date.toordinal()
+
+        ordinals = np.arange(self.__first, self.last_date.toordinal() + 1)
+        # date(1, 1, 1)的ordinal为1，是星期一
+        is_workday = (ordinals - 1) % 7 < 5
+        for year in sorted(years):
+            for record in holiday_service.get_records(
+                datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+            ):
+                is_workday[record.ordinal - self.__first] = (
+                    not record.is_offday
+                )
+
+        self.__is_workday: np.ndarray = is_workday
+        # prefix[i]为前i天(不含第i天)的工作日数
+        self.__prefix: np.ndarray = np.concatenate(
+            ([0], np.cumsum(is_workday, dtype=np.int32))
+        )
+
+    def __index(self, date: datetime.date) -> int:
+        self.holiday_service.check_range(date, date)
+        return date.toordinal() - self.__first
+
+    def is_workday(self, date: datetime.date) -> bool:
+        """是否为工作日
+
+        Raises:
+            FileNotFoundError: 该年份没有节假日json文件
+        """
+        return bool(self.__is_workday[self.__index(date)])
+
+    def count_workdays(
+        self, time_start: datetime.date, time_end: datetime.date
+    ) -> int:
+        """日期范围内(含首尾)的工作日数
+
+        Raises:
+            FileNotFoundError: 某个年份没有节假日json文件
+            ValueError: 开始日期晚于结束日期
+        """
+        if time_start > time_end:
+            raise ValueError("start_date must not be after end_date")
+
+        self.holiday_service.check_range(time_start, time_end)
+        return int(
+            self.__prefix[self.__index(time_end) + 1]
+            - self.__prefix[self.__index(time_start)]
+        )
+
+    def add_workdays(self, date: datetime.date, days: int) -> datetime.date:
+        """date之后第days个工作日，days为负数时为之前第-days个工作日，
+        days为0时返回date本身
+
+        Raises:
+            FileNotFoundError: 结果超出节假日数据覆盖的年份
+        """
+        if days == 0:
+            return date
+
+        index = self.__index(date)
+        if days > 0:
+            target = int(self.__prefix[index + 1]) + days
+        else:
+            target = int(self.__prefix[index]) + days + 1
+
+        if not 1 <= target <= self.__prefix[-1]:
+            raise FileNotFoundError(
+                f"{days} workdays from {date:%Y-%m-%d} "
+                "is out of the loaded holiday-cn years"
+            )
+
+        # 第一个前缀和达到target的位置，即第target个工作日的下一天
+        index = int(np.searchsorted(self.__prefix, target, side="left")) - 1
+        result = datetime.date.fromordinal(self.__first + index)
+        self.holiday_service.check_range(min(date, result), max(date, result))
+        return result
+
+    def next_workday(self, date: datetime.date) -> datetime.date:
+        """date之后的第一个工作日(不含date)"""
+        return self.add_workdays(date, 1)
+
+    def previous_workday(self, date: datetime.date) -> datetime.date:
+        """date之前的最后一个工作日(不含date)"""
+        return self.add_workdays(date, -1)
@@ -0,0 +1,106 @@
+"""
+基准测试
+
+运行并保存结果：python -m benchmarks run [-k 名称片段] [-o 结果.json]
+与基准对比：    python -m benchmarks compare 基准.json [结果.json] [--threshold 0.1]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def run(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # 在导入app之前指定配置：使用补齐到10年的节假日数据，
+        # 关闭响应缓存以测量生成本身，文件写入临时目录
+        from benchmarks.data import make_data_dir
+
+        data_dir = make_data_dir(Path.cwd() / "holiday-cn", tmp / "holiday-cn")
+        os.environ.update(
+            HOLIDAY_DATA_DIR=str(data_dir),
+            DATE_DIMENSION_STORE=str(tmp / "data" / "date-dimension.store"),
+            HOLIDAY_SNAPSHOT=str(tmp / "data" / "holiday-cn.snapshot"),
+            RESPONSE_CACHE_MAX_BYTES="0",
+        )
+
+        from fastapi.testclient import TestClient
+        from loguru import logger
+
+        from benchmarks.harness import BenchmarkRunner, save_results
+        from benchmarks.suite import (
+            register_date_dimension,
+            register_holiday,
+            register_http,
+        )
+
+        # 逐行生成时每天一条debug日志，不计入结果
+        logger.remove()
+        import main
+
+        logger.remove()
+
+        runner = BenchmarkRunner()
+        register_holiday(runner, data_dir, tmp / "bench.snapshot")
+        register_date_dimension(runner, data_dir, tmp / "bench.store")
+        with TestClient(main.app) as client:
+            register_http(runner, client)
+            results = runner.run(args.k)
+
+    save_results(results, args.output)
+    print(f"results saved: {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    from benchmarks.harness import compare, load_results
+
+    regressions = compare(
+        load_results(args.baseline),
+        load_results(args.current),
+        args.threshold,
+    )
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="服务层、控制器与HTTP接口的基准测试",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="运行并保存结果")
+    run_parser.add_argument("-k", help="只运行名称包含该片段的基准测试")
+    run_parser.add_argument(
+        "-o", "--output", type=Path, default=RESULTS_DIR / "latest.json"
+    )
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="与基准结果对比")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument(
+        "current", type=Path, nargs="?", default=RESULTS_DIR / "latest.json"
+    )
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="中位数变慢超过该比例记为回退，默认0.1",
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
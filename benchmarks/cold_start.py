@@ -0,0 +1,95 @@
+"""
+冷启动耗时：导入main、加载节假日数据与第一次请求的耗时。
+每项在新的子进程中测量，分别使用json与二进制快照加载节假日数据。
+
+用法：python -m benchmarks.cold_start [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+
+from app.core.config import settings
+from app.services.holiday_service import HolidayService
+
+t2 = time.perf_counter()
+service = HolidayService(settings.HOLIDAY_DATA_DIR, settings.HOLIDAY_SNAPSHOT)
+t3 = time.perf_counter()
+
+from fastapi.testclient import TestClient
+
+with TestClient(main.app) as client:
+    t4 = time.perf_counter()
+    client.get("/api/v1/holiday/", params={"date": sys.argv[1]})
+    t5 = time.perf_counter()
+    client.get(
+        "/api/v1/date_dimension/date", params={"date": sys.argv[1]}
+    )
+    t6 = time.perf_counter()
+
+print(json.dumps({
+    "loaded_from": service.loaded_from,
+    "import_main_ms": (t1 - t0) * 1000,
+    "load_holidays_ms": (t3 - t2) * 1000,
+    "first_holiday_request_ms": (t5 - t4) * 1000,
+    "first_date_dimension_request_ms": (t6 - t5) * 1000,
+}))
+"""
+
+
+def probe(snapshot: Path, day: str) -> dict:
+    env = dict(os.environ, HOLIDAY_SNAPSHOT=str(snapshot))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, day],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--date", default="2024-05-01")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services.holiday_service import HolidayService
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / "holiday-cn.snapshot"
+        HolidayService(settings.HOLIDAY_DATA_DIR).write_snapshot(snapshot)
+        modes = {
+            "json": Path(tmp) / "missing.snapshot",
+            "snapshot": snapshot,
+        }
+        for mode, path in modes.items():
+            runs = []
+            for _ in range(args.repeat):
+                # 启动时会写入快照，json模式每次运行前删除
+                if mode == "json":
+                    path.unlink(missing_ok=True)
+                runs.append(probe(path, args.date))
+            assert all(r["loaded_from"] == mode for r in runs)
+            print(f"[{mode}] median of {args.repeat} runs")
+            for key in runs[0]:
+                if key.endswith("_ms"):
+                    value = statistics.median(r[key] for r in runs)
+                    print(f"  {key:<34}{value:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
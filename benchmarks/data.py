@@ -0,0 +1,39 @@
+"""
+基准测试使用的节假日数据。本模块不导入app，
+可以在设置环境变量(app.core.config读取)之前使用
+"""
+
+import json
+from pathlib import Path
+
+LAST_YEAR = 2025
+
+
+def make_data_dir(source: Path, target: Path) -> Path:
+    """
+    复制holiday-cn，并以最新完整年份的数据为模板补齐到10年，
+    保证10年范围的基准测试有数据可用
+    """
+    target.mkdir(parents=True, exist_ok=True)
+    for json_file in source.glob("*.json"):
+        if json_file.stem.isdigit():
+            (target / json_file.name).write_bytes(json_file.read_bytes())
+
+    template_year = LAST_YEAR - 1
+    template = json.loads(
+        (source / f"{template_year}.json").read_text(encoding="utf-8")
+    )
+    for year in range(LAST_YEAR - 9, LAST_YEAR + 1):
+        path = target / f"{year}.json"
+        if path.exists():
+            continue
+        days = [
+            dict(day, date=f"{year}{day['date'][4:]}")
+            for day in template["days"]
+            if day["date"][5:] != "02-29"
+        ]
+        path.write_text(
+            json.dumps({"year": year, "days": days}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+    return target
@@ -0,0 +1,162 @@
+"""
+基准测试的计时、结果保存与对比
+"""
+
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, NamedTuple
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # 每次调用返回(行数, 字节数)，不适用的为0
+    run: Callable[[], tuple[int, int]]
+    repeat: int
+
+
+class BenchmarkRunner(object):
+    """
+    注册并运行基准测试。每项先预热一次，再运行repeat次取中位数等统计值；
+    异步函数在同一个事件循环中运行，不把创建事件循环的开销计入结果
+    """
+
+    def __init__(self):
+        self.benchmarks: list[Benchmark] = []
+        self.loop = asyncio.new_event_loop()
+
+    def add(
+        self,
+        name: str,
+        run: Callable[[], tuple[int, int]],
+        repeat: int = 5,
+    ) -> None:
+        self.benchmarks.append(Benchmark(name, run, repeat))
+
+    def add_async(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[tuple[int, int]]],
+        repeat: int = 5,
+    ) -> None:
+        self.add(name, lambda: self.loop.run_until_complete(run()), repeat)
+
+    def run(self, pattern: str | None = None) -> dict[str, dict[str, Any]]:
+        results = {}
+        for benchmark in self.benchmarks:
+            if pattern and pattern not in benchmark.name:
+                continue
+            results[benchmark.name] = measure(benchmark)
+            print(format_result(benchmark.name, results[benchmark.name]))
+        return results
+
+
+def measure(benchmark: Benchmark) -> dict[str, Any]:
+    benchmark.run()
+    timings = []
+    rows = size = 0
+    for _ in range(benchmark.repeat):
+        start = time.perf_counter()
+        rows, size = benchmark.run()
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    result: dict[str, Any] = {
+        "repeat": benchmark.repeat,
+        "min": min(timings),
+        "median": median,
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+    if rows:
+        result["rows"] = rows
+        result["rows_per_s"] = rows / median
+    if size:
+        result["bytes"] = size
+        result["mb_per_s"] = size / median / 1024 / 1024
+    return result
+
+
+def format_result(name: str, result: dict[str, Any]) -> str:
+    line = f"{name:<48}{result['median'] * 1000:>12.3f} ms"
+    if "rows_per_s" in result:
+        line += f"{result['rows_per_s']:>14,.0f} rows/s"
+    if "mb_per_s" in result:
+        line += f"{result['mb_per_s']:>10.1f} MB/s"
+    return line
+
+
+def metadata() -> dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def save_results(results: dict[str, dict[str, Any]], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {"meta": metadata(), "results": results},
+            ensure_ascii=False,
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+
+def load_results(path: Path) -> dict[str, dict[str, Any]]:
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+def compare(
+    baseline: dict[str, dict[str, Any]],
+    current: dict[str, dict[str, Any]],
+    threshold: float,
+) -> list[str]:
+    """
+    按中位数对比，比基准慢threshold以上(如0.1为10%)的记为回退
+
+    Returns:
+        list[str]: 回退的基准测试名称
+    """
+    regressions = []
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current:
+            print(f"{name:<48}{'missing':>12}")
+            continue
+        if name not in baseline:
+            print(f"{name:<48}{'new':>12}")
+            continue
+
+        ratio = current[name]["median"] / baseline[name]["median"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  improved"
+        print(
+            f"{name:<48}"
+            f"{baseline[name]['median'] * 1000:>12.3f} ms"
+            f"{current[name]['median'] * 1000:>12.3f} ms"
+            f"{ratio:>8.2f}x{flag}"
+        )
+    return regressions
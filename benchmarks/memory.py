@@ -0,0 +1,123 @@
+"""
+内存峰值：10年逐小时范围生成全部行、以及生成后编码为JSON时的Python堆峰值。
+每项在新的子进程中用tracemalloc测量，互不影响。
+
+用法：python -m benchmarks.memory [--engine row columnar store]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.data import LAST_YEAR, make_data_dir
+
+PROBE = r"""
+import asyncio, json, sys, time, tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from loguru import logger
+
+logger.remove()
+
+from app.controllers.date_dimension_controller import DateDimensionController
+from app.core.config import settings
+from app.core.responses import dumps
+from app.services.date_dimension_store import DateDimensionStore
+from app.services.holiday_service import HolidayService
+
+engine, mode, first_year, last_year = sys.argv[1:5]
+holiday_service = HolidayService(settings.HOLIDAY_DATA_DIR)
+store = DateDimensionStore.open_or_build(
+    holiday_service, settings.DATE_DIMENSION_STORE
+)
+controller = DateDimensionController(holiday_service, store)
+time_start = datetime(int(first_year), 1, 1)
+time_end = datetime(int(last_year), 12, 31)
+
+
+async def generate():
+    if mode == "models":
+        return await controller.get_ste_day(
+            time_start, time_end, engine, "hour"
+        )
+    rows = await controller.get_ste_day_rows(
+        time_start, time_end, engine, "hour"
+    )
+    if mode == "json":
+        return len(dumps(rows)), rows
+    return rows
+
+
+tracemalloc.start()
+t0 = time.perf_counter()
+result = asyncio.run(generate())
+elapsed = time.perf_counter() - t0
+current, peak = tracemalloc.get_traced_memory()
+print(json.dumps({
+    "retained_mb": current / 2**20,
+    "peak_mb": peak / 2**20,
+    "seconds": elapsed,
+}))
+"""
+
+# models：DateDimension列表；rows：内部行列表；json：内部行列表并编码为JSON
+MODES = ("models", "rows", "json")
+
+
+def probe(env: dict, engine: str, mode: str) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            PROBE,
+            engine,
+            mode,
+            str(LAST_YEAR - 9),
+            str(LAST_YEAR),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "--engine",
+        nargs="+",
+        default=["row", "columnar", "store"],
+        choices=["row", "columnar", "store"],
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        data_dir = make_data_dir(Path.cwd() / "holiday-cn", tmp / "holiday-cn")
+        env = dict(
+            os.environ,
+            HOLIDAY_DATA_DIR=str(data_dir),
+            DATE_DIMENSION_STORE=str(tmp / "data" / "date-dimension.store"),
+            HOLIDAY_SNAPSHOT=str(tmp / "data" / "holiday-cn.snapshot"),
+        )
+        print(f"{LAST_YEAR - 9}-01-01 ~ {LAST_YEAR}-12-31, hour")
+        for engine in args.engine:
+            for mode in MODES:
+                r = probe(env, engine, mode)
+                print(
+                    f"  {engine:<10}{mode:<8}"
+                    f"peak {r['peak_mb']:>8.1f} MB  "
+                    f"retained {r['retained_mb']:>8.1f} MB  "
+                    f"{r['seconds']:>6.2f} s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+服务层、控制器与HTTP接口的基准测试
+"""
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.controllers.date_dimension_controller import DateDimensionController
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+)
+from app.services.date_dimension_service import DateDimensionService
+from app.services.date_dimension_store import DateDimensionStore
+from app.services.holiday_service import HolidayService
+from benchmarks.data import LAST_YEAR
+from benchmarks.harness import BenchmarkRunner
+
+# 日期范围：名称、开始日期、结束日期，均在LAST_YEAR结束前
+RANGES = {
+    "1d": (date(LAST_YEAR, 5, 1), date(LAST_YEAR, 5, 1)),
+    "1m": (date(LAST_YEAR, 5, 1), date(LAST_YEAR, 5, 31)),
+    "1y": (date(LAST_YEAR, 1, 1), date(LAST_YEAR, 12, 31)),
+    "10y": (date(LAST_YEAR - 9, 1, 1), date(LAST_YEAR, 12, 31)),
+}
+
+# 逐行生成较慢，长范围只运行少数几次
+ROW_ENGINE_REPEAT = {"1d": 20, "1m": 5, "1y": 2, "10y": 1}
+
+
+def as_datetime(d: date) -> datetime:
+    return datetime.combine(d, datetime.min.time())
+
+
+async def count_rows(generator) -> tuple[int, int]:
+    rows = 0
+    async for _ in generator:
+        rows += 1
+    return rows, 0
+
+
+async def count_bytes(generator) -> tuple[int, int]:
+    size = 0
+    async for chunk in generator:
+        size += len(chunk)
+    return 0, size
+
+
+def register_holiday(
+    runner: BenchmarkRunner, data_dir: Path, snapshot: Path
+) -> None:
+    holiday_service = HolidayService(data_dir)
+    holiday_service.write_snapshot(snapshot)
+    first = date(LAST_YEAR, 1, 1)
+    days = [first + timedelta(days=i) for i in range(365)] * 20
+
+    def load_json() -> tuple[int, int]:
+        HolidayService(data_dir)
+        return 0, 0
+
+    def load_snapshot() -> tuple[int, int]:
+        HolidayService(data_dir, snapshot)
+        return 0, 0
+
+    def cold() -> tuple[int, int]:
+        HolidayService(data_dir, snapshot).get_for_date(first)
+        return 0, 0
+
+    def warm() -> tuple[int, int]:
+        get_for_date = holiday_service.get_for_date
+        for d in days:
+            get_for_date(d)
+        return len(days), 0
+
+    runner.add("holiday.load.json", load_json)
+    runner.add("holiday.load.snapshot", load_snapshot)
+    runner.add("holiday.get_for_date.cold", cold)
+    runner.add("holiday.get_for_date.warm", warm)
+
+
+def register_date_dimension(
+    runner: BenchmarkRunner, data_dir: Path, store_path: Path
+) -> None:
+    holiday_service = HolidayService(data_dir)
+    engines = {
+        "row": DateDimensionService(holiday_service),
+        "columnar": ColumnarDateDimensionService(holiday_service),
+        "store": DateDimensionStore.build(holiday_service, store_path),
+    }
+    row_service = engines["row"]
+    day = as_datetime(RANGES["1d"][0])
+    runner.add_async(
+        "date_dimension.row.get_for_date",
+        lambda: count_rows(row_service.get_for_date(day)),
+        repeat=20,
+    )
+
+    for engine, service in engines.items():
+        for span, (time_start, time_end) in RANGES.items():
+            runner.add_async(
+                f"date_dimension.{engine}.get_ste_day.{span}",
+                lambda service=service, s=time_start, e=time_end: count_rows(
+                    service.get_ste_day(as_datetime(s), as_datetime(e))
+                ),
+                repeat=ROW_ENGINE_REPEAT[span] if engine == "row" else 5,
+            )
+
+    # CSV吞吐：默认引擎(预计算表)与逐行生成
+    controller = DateDimensionController(holiday_service, engines["store"])
+    time_start, time_end = map(as_datetime, RANGES["1y"])
+    for engine in ("store", "row"):
+
+        async def generate_csv(engine=engine) -> tuple[int, int]:
+            rows = size = 0
+            async for chunk in controller.generate_csv(
+                time_start, time_end, engine
+            ):
+                rows += chunk.count(b"\n")
+                size += len(chunk)
+            # 不计表头
+            return rows - 1, size
+
+        runner.add_async(
+            f"controller.generate_csv.{engine}.1y",
+            generate_csv,
+            repeat=2 if engine == "row" else 5,
+        )
+
+
+def register_http(runner: BenchmarkRunner, client: TestClient) -> None:
+    one_month = {
+        "start_date": RANGES["1m"][0].isoformat(),
+        "end_date": RANGES["1m"][1].isoformat(),
+    }
+    one_year = {
+        "start_date": RANGES["1y"][0].isoformat(),
+        "end_date": RANGES["1y"][1].isoformat(),
+    }
+    day = {"date": RANGES["1d"][0].isoformat()}
+    requests = {
+        "holiday": ("/api/v1/holiday/", day, {}),
+        "holiday.range.1y": ("/api/v1/holiday/range", one_year, {}),
+        "workday.count.1y": ("/api/v1/workday/count", one_year, {}),
+        "date_dimension.date": ("/api/v1/date_dimension/date", day, {}),
+        "date_dimension.1m": ("/api/v1/date_dimension/", one_month, {}),
+        "date_dimension.1y": ("/api/v1/date_dimension/", one_year, {}),
+        "date_dimension.ndjson.1y": (
+            "/api/v1/date_dimension/",
+            {**one_year, "stream": "ndjson"},
+            {},
+        ),
+        # 测试客户端默认发送Accept-Encoding: gzip
+        "date_dimension.csv.1y": (
+            "/api/v1/date_dimension/csv",
+            one_year,
+            {"Accept-Encoding": "identity"},
+        ),
+        "date_dimension.csv.gzip.1y": (
+            "/api/v1/date_dimension/csv",
+            one_year,
+            {"Accept-Encoding": "gzip"},
+        ),
+        "date_dimension.arrow.1y": (
+            "/api/v1/date_dimension/arrow",
+            one_year,
+            {},
+        ),
+        "date_dimension.parquet.1y": (
+            "/api/v1/date_dimension/parquet",
+            one_year,
+            {},
+        ),
+    }
+    for name, (url, params, headers) in requests.items():
+
+        def request(url=url, params=params, headers=headers):
+            response = client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            # 按实际传输的字节数计算，gzip响应为压缩后的大小
+            return 0, response.num_bytes_downloaded
+
+        runner.add(f"http.{name}", request)
@@ -0,0 +1,103 @@
+"""
+比较两个版本的节假日数据，只导出受影响的日期维度行(增量导出)。
+默认比较上次加载时写入的二进制快照与磁盘上的json文件；
+指定--old时比较两个holiday-cn目录
+
+用法：python export_changes.py [--old 目录] [--new 目录] [--format ndjson]
+      [--granularity hour] [--fields date_id,hour] [-o 文件]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.log import configure_logging
+from app.core.responses import dumps_csv
+from app.schemas.date_dimension import parse_fields
+from app.services.holiday_diff_service import (
+    change_row_type,
+    changes_encoder,
+    diff_holidays,
+    iter_changes,
+    load_holidays,
+    version_of,
+    version_of_snapshot,
+)
+
+# 每次写出的行数
+CHUNK_ROWS = 2000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "--old",
+        type=Path,
+        help="旧版本的holiday-cn目录，"
+        f"未指定时为二进制快照{settings.HOLIDAY_SNAPSHOT}",
+    )
+    parser.add_argument(
+        "--new",
+        type=Path,
+        default=settings.HOLIDAY_DATA_DIR,
+        help=f"新版本的holiday-cn目录，默认为{settings.HOLIDAY_DATA_DIR}",
+    )
+    parser.add_argument(
+        "--format", choices=["ndjson", "csv"], default="ndjson"
+    )
+    parser.add_argument(
+        "--granularity", default="hour", help="粒度：day/hour/shift/Nmin"
+    )
+    parser.add_argument("--fields", help="逗号分隔的字段名，默认为全部字段")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="输出文件，默认为标准输出"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    try:
+        fields = parse_fields(args.fields)
+        old = (
+            version_of(load_holidays(args.old))
+            if args.old
+            else version_of_snapshot(settings.HOLIDAY_SNAPSHOT)
+        )
+        holiday_service = load_holidays(args.new)
+        diff = diff_holidays(old, version_of(holiday_service))
+        rows = iter_changes(holiday_service, diff, args.granularity, fields)
+
+        output = args.output.open("wb") if args.output else sys.stdout.buffer
+        try:
+            if args.format == "csv":
+                output.write(dumps_csv([change_row_type(fields)._fields]))
+            encode = changes_encoder(args.format, fields)
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= CHUNK_ROWS:
+                    output.write(encode(chunk))
+                    chunk = []
+            if chunk:
+                output.write(encode(chunk))
+        finally:
+            if args.output:
+                output.close()
+            else:
+                output.flush()
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+
+    logger.info(
+        f"holiday changes: inserted years {diff.inserted_years}, "
+        f"deleted years {diff.deleted_years}, "
+        f"{len(diff.updated_dates)} updated dates"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
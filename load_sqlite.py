@@ -0,0 +1,58 @@
+"""
+在进程内生成日期维度并批量载入SQLite数据库，不经过HTTP。
+再次运行时只重写节假日数据有变化的年份
+
+用法：python load_sqlite.py [数据库文件] [--granularity hour] [--full]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.log import configure_logging
+from app.services.date_dimension_sqlite_service import (
+    DateDimensionSqliteLoader,
+)
+from app.services.holiday_service import HolidayService
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "database",
+        nargs="?",
+        type=Path,
+        default=settings.DATE_DIMENSION_SQLITE,
+        help=f"SQLite数据库文件，默认为{settings.DATE_DIMENSION_SQLITE}",
+    )
+    parser.add_argument(
+        "--granularity",
+        default="hour",
+        help="日期维度的粒度：day/hour/shift/Nmin，变化时整表重建",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="忽略已载入的版本，整表重建"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    try:
+        loader = DateDimensionSqliteLoader(
+            HolidayService(
+                settings.HOLIDAY_DATA_DIR, settings.HOLIDAY_SNAPSHOT
+            ),
+            args.database,
+            args.granularity,
+        )
+        loader.load(full=args.full)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
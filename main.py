@@ -1,5 +1,7 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
-from loguru import logger
 
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse
@@ -7,23 +9,73 @@ from starlette.middleware.cors import CORSMiddleware
 from fastapi.routing import APIRoute
 
 from app.api.api_v1.api import api_router
+from app.api.metrics import metrics_router
+from app.core.config import settings
+from app.core.http_cache import HttpCacheMiddleware
+from app.core.log import configure_logging
+from app.core.metrics import metrics
+from app.core.reloader import HolidayDataReloader
+from app.core.response_cache import ResponseCache
+from app.core.server import run_production
+from app.services.parallel_date_dimension_service import GenerationPool
 
-logger.add(
-    "./logs/api_debug.log",
-    rotation="500MB",
-    encoding="utf-8",
-    enqueue=True,
-    retention="7 days",
-    level="DEBUG",
-)
+configure_logging()
 
 
 def custom_generate_unique_id(route: APIRoute):
     return f"{route.tags[0]}-{route.name}"
 
 
+def preload(app: FastAPI) -> None:
+    """
+    加载全部节假日数据，所有请求共享同一个索引，
+    同时生成工作日表与预计算的日期维度表(节假日数据更新后自动重建)。
+    production模式在fork worker之前于master进程中调用
+    """
+    app.state.response_cache = ResponseCache(
+        settings.RESPONSE_CACHE_MAX_BYTES,
+        settings.RESPONSE_CACHE_MAX_ENTRY_BYTES,
+    )
+    app.state.holiday_data_reloader = HolidayDataReloader(
+        app.state,
+        settings.HOLIDAY_DATA_DIR,
+        settings.DATE_DIMENSION_STORE,
+        settings.HOLIDAY_SNAPSHOT,
+    )
+    app.state.holiday_data_reloader.load()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # production模式已在fork之前预加载
+    if not hasattr(app.state, "holiday_data_reloader"):
+        preload(app)
+
+    # 进程池在每个worker进程中各自创建，不在fork之前创建
+    app.state.generation_pool = None
+    if settings.GENERATION_WORKERS > 0:
+        app.state.generation_pool = GenerationPool(
+            settings.GENERATION_WORKERS,
+            settings.GENERATION_CHUNK,
+            settings.GENERATION_PARALLEL_MIN_ROWS,
+        )
+
+    # 定期检查holiday-cn目录，有变化时在后台热加载
+    watcher = None
+    if settings.reload_interval > 0:
+        watcher = asyncio.create_task(
+            app.state.holiday_data_reloader.watch(settings.reload_interval)
+        )
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    if app.state.generation_pool is not None:
+        app.state.generation_pool.shutdown()
+
+
 app = FastAPI(
     title="Chinese Holiday API",
+    lifespan=lifespan,
     openapi_url="/api/v1/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
@@ -35,8 +87,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 分页接口在响应头中返回下一页，增量导出在响应头中返回差异
+    expose_headers=[
+        "X-Next-Cursor",
+        "Link",
+        "X-Holiday-Version",
+        "X-Inserted-Years",
+        "X-Deleted-Years",
+        "X-Updated-Date-Count",
+    ],
+)
+app.add_middleware(
+    HttpCacheMiddleware,
+    prefixes=(
+        "/api/v1/holiday",
+        "/api/v1/workday",
+        "/api/v1/date_dimension",
+    ),
+    max_age=settings.HTTP_CACHE_MAX_AGE,
+    # 增量导出比较的是磁盘上的json文件，已加载数据的版本不能作为它的ETag
+    exclude=("/api/v1/date_dimension/changes",),
 )
 app.include_router(api_router, prefix="/api/v1")
+if metrics is not None:
+    app.include_router(metrics_router, tags=["metrics"])
 
 
 @app.exception_handler(HTTPException)
@@ -48,10 +122,13 @@ async def http_exception_handler(request, exc):
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8088,
-        log_level="debug",
-        reload=True,
-    )
+    if settings.SERVER_PROFILE == "production":
+        run_production(app, preload)
+    else:
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            log_level=settings.log_level.lower(),
+            reload=True,
+        )
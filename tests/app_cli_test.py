@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.__main__ import main, write_range
+from app.schemas.date_dimension import CSV_FIELDS
+
+
+def test_write_range_csv():
+    output = io.BytesIO()
+
+    n = write_range(
+        output, datetime(2024, 5, 1), datetime(2024, 5, 2), "shift"
+    )
+
+    rows = list(csv.reader(io.StringIO(output.getvalue().decode())))
+    assert n == 6
+    assert rows[0] == CSV_FIELDS
+    assert len(rows) == 1 + 6
+    assert rows[1][:3] == [
+        "20240501",
+        "2024050100",
+        "2024-05-01 00:00:00+00:00",
+    ]
+
+
+@pytest.mark.parametrize("engine", ["columnar", "row"])
+def test_write_range_engines_same_output(engine):
+    output = io.BytesIO()
+    write_range(
+        output,
+        datetime(2024, 12, 31),
+        datetime(2025, 1, 1),
+        "hour",
+        "ndjson",
+        engine,
+        ("date_hour_id", "date_type", "holiday_name"),
+    )
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert len(lines) == 48
+    assert lines[24] == {
+        "date_hour_id": "2025010100",
+        "date_type": "节假日",
+        "holiday_name": "元旦",
+    }
+
+
+def test_main_output_file(tmp_path):
+    path = tmp_path / "date-dimension.csv"
+
+    assert (
+        main(
+            [
+                "2024-05-01",
+                "2024-05-01",
+                "--granularity",
+                "day",
+                "--fields",
+                "date_id,date_type",
+                "-o",
+                str(path),
+            ]
+        )
+        == 0
+    )
+    assert path.read_text(encoding="utf-8") == (
+        "date_id,date_type\n20240501,节假日\n"
+    )
+
+
+def test_main_errors(tmp_path):
+    path = tmp_path / "date-dimension.csv"
+
+    assert main(["2030-01-01", "2030-01-01", "-o", str(path)]) == 1
+    # 在输出表头之前报错
+    assert path.read_bytes() == b""
+    assert main(["2024-01-01", "2024-01-01", "--fields", "x"]) == 1
@@ -0,0 +1,43 @@
+from benchmarks.harness import (
+    Benchmark,
+    compare,
+    load_results,
+    measure,
+    save_results,
+)
+
+
+def test_measure():
+    result = measure(Benchmark("rows", lambda: (1000, 2048), repeat=3))
+
+    assert result["repeat"] == 3
+    assert 0 <= result["min"] <= result["median"]
+    assert result["rows"] == 1000
+    assert result["bytes"] == 2048
+    assert result["rows_per_s"] > 0
+
+
+def test_save_load_results(tmp_path):
+    results = {"a": {"median": 0.5}}
+    path = tmp_path / "results" / "latest.json"
+    save_results(results, path)
+
+    assert load_results(path) == results
+
+
+def test_compare():
+    baseline = {
+        "same": {"median": 1.0},
+        "slower": {"median": 1.0},
+        "faster": {"median": 1.0},
+        "removed": {"median": 1.0},
+    }
+    current = {
+        "same": {"median": 1.05},
+        "slower": {"median": 1.2},
+        "faster": {"median": 0.5},
+        "added": {"median": 1.0},
+    }
+
+    assert compare(baseline, current, threshold=0.1) == ["slower"]
+    assert compare(baseline, current, threshold=0.3) == []
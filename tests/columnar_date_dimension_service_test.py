@@ -0,0 +1,185 @@
+import asyncio
+import pytest
+from datetime import date, datetime
+
+from app.services.holiday_service import HolidayService
+from app.services.date_dimension_service import DateDimensionService
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+)
+from app.schemas.date_dimension import DateDimension, DateDimensionRow
+
+
+@pytest.fixture
+def holiday_service():
+    return HolidayService()
+
+
+async def collect(generator):
+    return [d async for d in generator]
+
+
+@pytest.mark.parametrize(
+    "time_start, time_end",
+    [
+        (datetime(2024, 2, 27), datetime(2024, 3, 2)),  # 闰年2月
+        (datetime(2024, 12, 29), datetime(2025, 1, 2)),  # 跨年
+        (datetime(2024, 5, 1), datetime(2024, 5, 12)),  # 节假日与调休
+    ],
+)
+def test_get_ste_day_same_as_row_engine(holiday_service, time_start, time_end):
+    row_service = DateDimensionService(holiday_service)
+    columnar_service = ColumnarDateDimensionService(holiday_service)
+
+    expected = asyncio.run(
+        collect(row_service.get_ste_day(time_start, time_end))
+    )
+    results = asyncio.run(
+        collect(columnar_service.get_ste_day(time_start, time_end))
+    )
+
+    assert len(results) == len(expected)
+    assert all(isinstance(r, DateDimension) for r in results)
+    assert [r.model_dump_json() for r in results] == [
+        e.model_dump_json() for e in expected
+    ]
+
+
+def test_build_columns_prev_year_of_leap_day(holiday_service):
+    service = ColumnarDateDimensionService(holiday_service)
+
+    columns = service.build_columns(date(2024, 2, 29), date(2024, 2, 29))
+
+    assert len(columns["date_hour_id"]) == 24
+    assert columns["prev_year_date_id"][0] == "20230228"
+    assert columns["prev_year_day"][0] == "28"
+
+
+def test_build_columns_file_not_found(holiday_service):
+    service = ColumnarDateDimensionService(holiday_service)
+
+    with pytest.raises(FileNotFoundError):
+        service.build_columns(date(2030, 1, 1), date(2030, 1, 2))
+
+
+@pytest.mark.parametrize("granularity", ["day", "shift", "30min"])
+def test_get_ste_day_granularity_same_as_row_engine(
+    holiday_service, granularity
+):
+    time_start, time_end = datetime(2024, 2, 28), datetime(2024, 3, 1)
+    row_service = DateDimensionService(holiday_service)
+    columnar_service = ColumnarDateDimensionService(holiday_service)
+
+    expected = asyncio.run(
+        collect(row_service.get_ste_day(time_start, time_end, granularity))
+    )
+    results = asyncio.run(
+        collect(
+            columnar_service.get_ste_day(time_start, time_end, granularity)
+        )
+    )
+
+    assert [r.model_dump_json() for r in results] == [
+        e.model_dump_json() for e in expected
+    ]
+
+
+@pytest.mark.parametrize("engine", ["row", "columnar"])
+def test_get_ste_day_rows_share_repeated_values(holiday_service, engine):
+    service = (
+        DateDimensionService(holiday_service)
+        if engine == "row"
+        else ColumnarDateDimensionService(holiday_service)
+    )
+
+    rows = asyncio.run(
+        collect(
+            service.get_ste_day_rows(
+                datetime(2024, 5, 1), datetime(2024, 5, 31)
+            )
+        )
+    )
+
+    assert all(type(r) is DateDimensionRow for r in rows)
+    first, last = rows[0], rows[-1]
+    assert first.date_id != last.date_id
+    assert first.year_start_date is last.year_start_date
+    assert first.month_end_date is last.month_end_date
+    assert first.year_quarter is last.year_quarter
+    assert first.date_time is not last.date_time
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        ("date_id", "hour", "date_type"),
+        ("prev_year_date_time", "holiday_name", "date_hour_id"),
+        ("shift",),
+    ],
+)
+@pytest.mark.parametrize("granularity", ["hour", "shift", "day"])
+def test_get_ste_day_rows_projection_same_as_row_engine(
+    holiday_service, fields, granularity
+):
+    time_start, time_end = datetime(2024, 12, 30), datetime(2025, 1, 2)
+    row_service = DateDimensionService(holiday_service)
+    columnar_service = ColumnarDateDimensionService(holiday_service)
+
+    full = asyncio.run(
+        collect(
+            row_service.get_ste_day_rows(time_start, time_end, granularity)
+        )
+    )
+    expected = [tuple(getattr(r, name) for name in fields) for r in full]
+    for service in (row_service, columnar_service):
+        rows = asyncio.run(
+            collect(
+                service.get_ste_day_rows(
+                    time_start, time_end, granularity, fields=fields
+                )
+            )
+        )
+        assert rows[0]._fields == fields
+        assert [tuple(r) for r in rows] == expected
+
+
+def test_build_columns_projection_file_not_found(holiday_service):
+    service = ColumnarDateDimensionService(holiday_service)
+
+    # 不计算节假日列时也检查节假日数据
+    with pytest.raises(FileNotFoundError):
+        service.build_columns(
+            date(2030, 1, 1), date(2030, 1, 2), "hour", ("hour",)
+        )
+
+
+@pytest.mark.parametrize("granularity", ["hour", "30min"])
+def test_iter_range_same_as_async_rows(holiday_service, granularity):
+    time_start, time_end = datetime(2024, 12, 30), datetime(2025, 1, 2)
+
+    for service in (
+        DateDimensionService(holiday_service),
+        ColumnarDateDimensionService(holiday_service),
+    ):
+        expected = asyncio.run(
+            collect(
+                service.get_ste_day_rows(
+                    time_start, time_end, granularity, first_slot=3
+                )
+            )
+        )
+        rows = list(
+            service.iter_range(time_start, time_end, granularity, first_slot=3)
+        )
+        assert rows == expected
+        assert list(service.iter_for_date(time_start, granularity)) == list(
+            service.iter_range(time_start, time_start, granularity)
+        )
+
+
+def test_iter_range_checks_lazily(holiday_service):
+    service = DateDimensionService(holiday_service)
+
+    rows = service.iter_range(datetime(2030, 1, 1), datetime(2030, 1, 2))
+    with pytest.raises(FileNotFoundError):
+        next(rows)
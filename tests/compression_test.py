@@ -0,0 +1,36 @@
+import asyncio
+import gzip
+import pytest
+
+from app.core.compression import accepts_gzip, gzip_stream
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, False),
+        ("", False),
+        ("gzip", True),
+        ("deflate, gzip;q=0.8, br", True),
+        ("gzip;q=0", False),
+        ("*", True),
+        ("identity", False),
+    ],
+)
+def test_accepts_gzip(accept_encoding, expected):
+    assert accepts_gzip(accept_encoding) == expected
+
+
+def test_gzip_stream():
+    async def chunks():
+        for i in range(100):
+            yield f"{i},row\n".encode()
+
+    async def collect():
+        return [c async for c in gzip_stream(chunks())]
+
+    compressed = b"".join(asyncio.run(collect()))
+
+    assert gzip.decompress(compressed) == b"".join(
+        f"{i},row\n".encode() for i in range(100)
+    )
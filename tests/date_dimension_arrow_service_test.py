@@ -0,0 +1,71 @@
+import asyncio
+import io
+import pytest
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.schemas.date_dimension import DateDimension
+from app.services.date_dimension_arrow_service import (
+    ARROW_SCHEMA,
+    DateDimensionArrowService,
+)
+from app.services.date_dimension_service import DateDimensionService
+from app.services.holiday_service import HolidayService
+
+
+@pytest.fixture
+def holiday_service():
+    return HolidayService()
+
+
+async def collect(generator):
+    return [chunk async for chunk in generator]
+
+
+def test_schema_types():
+    assert ARROW_SCHEMA.field("date").type == pa.timestamp("us", tz="UTC")
+    assert ARROW_SCHEMA.field("year_start_date").type == pa.timestamp(
+        "us", tz="Asia/Shanghai"
+    )
+    assert ARROW_SCHEMA.field("day_of_year").type == pa.int32()
+    assert pa.types.is_dictionary(ARROW_SCHEMA.field("holiday_name").type)
+    assert ARROW_SCHEMA.names == list(DateDimension.model_fields.keys())
+
+
+def test_stream_ipc_same_as_row_engine(holiday_service):
+    time_start, time_end = datetime(2024, 12, 30), datetime(2025, 1, 2)
+    service = DateDimensionArrowService(holiday_service)
+
+    chunks = asyncio.run(collect(service.stream_ipc(time_start, time_end)))
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+    expected = asyncio.run(
+        collect(
+            DateDimensionService(holiday_service).get_ste_day(
+                time_start, time_end
+            )
+        )
+    )
+
+    assert table.schema.equals(ARROW_SCHEMA)
+    assert [
+        DateDimension(**row).model_dump_json() for row in table.to_pylist()
+    ] == [e.model_dump_json() for e in expected]
+
+
+def test_stream_parquet_row_groups(holiday_service):
+    service = DateDimensionArrowService(holiday_service)
+
+    chunks = asyncio.run(
+        collect(
+            service.stream_parquet(
+                datetime(2024, 1, 1), datetime(2025, 12, 31)
+            )
+        )
+    )
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+
+    assert parquet_file.metadata.num_rows == 731 * 24
+    assert parquet_file.metadata.num_row_groups == 2
+    assert len(chunks) > 2
@@ -0,0 +1,159 @@
+import asyncio
+import csv
+import io
+import pytest
+import threading
+from datetime import datetime
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.controllers.date_dimension_controller import DateDimensionController
+from app.core.responses import dumps
+from app.schemas.date_dimension import DateDimension
+from app.services.holiday_service import HolidayService
+
+
+@pytest.fixture
+def controller():
+    return DateDimensionController(HolidayService())
+
+
+async def collect(generator):
+    return [chunk async for chunk in generator]
+
+
+def test_stream_ndjson(controller):
+    time_start, time_end = datetime(2024, 5, 1), datetime(2024, 5, 31)
+
+    expected = asyncio.run(controller.get_ste_day(time_start, time_end))
+    chunks = asyncio.run(
+        collect(controller.stream_ndjson(time_start, time_end))
+    )
+    lines = b"".join(chunks).decode().splitlines()
+
+    assert len(chunks) > 1
+    assert lines == [d.model_dump_json() for d in expected]
+
+
+def test_stream_json(controller):
+    time_start, time_end = datetime(2024, 5, 1), datetime(2024, 5, 31)
+
+    expected = asyncio.run(controller.get_ste_day(time_start, time_end))
+    chunks = asyncio.run(collect(controller.stream_json(time_start, time_end)))
+
+    assert b"".join(chunks) == TypeAdapter(list[DateDimension]).dump_json(
+        expected
+    )
+
+
+@pytest.mark.parametrize("engine", ["row", "columnar"])
+@pytest.mark.parametrize("granularity", ["day", "hour", "shift", "30min"])
+def test_get_ste_day_rows_encode_like_pydantic(
+    controller, engine, granularity
+):
+    time_start, time_end = datetime(2024, 12, 30), datetime(2025, 1, 2)
+
+    rows = asyncio.run(
+        controller.get_ste_day_rows(time_start, time_end, engine, granularity)
+    )
+    expected = asyncio.run(
+        controller.get_ste_day(time_start, time_end, engine, granularity)
+    )
+
+    assert dumps(rows) == TypeAdapter(list[DateDimension]).dump_json(expected)
+
+
+def test_stream_json_empty_range(controller):
+    time_start, time_end = datetime(2024, 5, 2), datetime(2024, 5, 1)
+
+    chunks = asyncio.run(collect(controller.stream_json(time_start, time_end)))
+
+    assert b"".join(chunks) == b"[]"
+
+
+def test_check_range_file_not_found(controller):
+    with pytest.raises(FileNotFoundError):
+        controller.check_range(datetime(2025, 12, 31), datetime(2026, 1, 1))
+
+
+def test_generate_csv(controller):
+    time_start, time_end = datetime(2024, 5, 1), datetime(2024, 5, 31)
+
+    chunks = asyncio.run(
+        collect(controller.generate_csv(time_start, time_end))
+    )
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert rows[0] == list(DateDimension.model_fields.keys())
+    assert len(rows) == 31 * 24 + 1
+    assert rows[1][:4] == [
+        "20240501",
+        "2024050100",
+        "2024-05-01 00:00:00+00:00",
+        "2024-05-01 00:00:00+00:00",
+    ]
+
+
+def test_get_ste_day_rows_projection_encodes_only_fields(controller):
+    time_start, time_end = datetime(2024, 5, 1), datetime(2024, 5, 2)
+    fields = ("date_time", "date_id", "holiday_name")
+
+    rows = asyncio.run(
+        controller.get_ste_day_rows(time_start, time_end, fields=fields)
+    )
+    expected = TypeAdapter(list[DateDimension]).dump_python(
+        asyncio.run(controller.get_ste_day(time_start, time_end)),
+        mode="json",
+        include={"__all__": set(fields)},
+    )
+
+    assert orjson.loads(dumps(rows)) == expected
+    assert list(orjson.loads(dumps(rows))[0]) == list(fields)
+
+
+def test_generate_csv_projection(controller):
+    time_start, time_end = datetime(2024, 5, 1), datetime(2024, 5, 1)
+
+    chunks = asyncio.run(
+        collect(
+            controller.generate_csv(
+                time_start, time_end, fields=("hour", "date_time")
+            )
+        )
+    )
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+
+    assert rows[0] == ["hour", "date_time"]
+    assert rows[1] == ["0", "2024-05-01 00:00:00+00:00"]
+    assert len(rows) == 24 + 1
+
+
+@pytest.mark.parametrize("engine", ["row", "columnar"])
+def test_rows_generated_off_event_loop(controller, engine, monkeypatch):
+    threads = []
+    service = (
+        controller.date_dimension_service
+        if engine == "row"
+        else controller.columnar_date_dimension_service
+    )
+    iter_range = service.iter_range
+
+    def record_thread(*args, **kwargs):
+        threads.append(threading.current_thread())
+        yield from iter_range(*args, **kwargs)
+
+    monkeypatch.setattr(service, "iter_range", record_thread)
+    time_start, time_end = datetime(2024, 5, 1), datetime(2024, 5, 2)
+
+    rows = asyncio.run(
+        controller.get_ste_day_rows(time_start, time_end, engine)
+    )
+    asyncio.run(
+        collect(controller.stream_ndjson(time_start, time_end, engine))
+    )
+
+    assert len(rows) == 48
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
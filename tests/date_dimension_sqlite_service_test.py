@@ -0,0 +1,137 @@
+import asyncio
+import csv
+import io
+import json
+import shutil
+import sqlite3
+import pytest
+from datetime import datetime
+from pathlib import Path
+
+from app.controllers.date_dimension_controller import DateDimensionController
+from app.services.date_dimension_sqlite_service import (
+    DateDimensionSqliteLoader,
+)
+from app.services.holiday_service import HolidayService
+
+# 测试用的节假日数据，不依赖holiday-cn子模块
+HOLIDAY_FIXTURES = Path(__file__).parent / "fixtures" / "holiday-cn"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return Path(shutil.copytree(HOLIDAY_FIXTURES, tmp_path / "holiday-cn"))
+
+
+async def collect(generator):
+    return [chunk async for chunk in generator]
+
+
+def load(data_dir: Path, database: Path, granularity: str = "hour"):
+    return DateDimensionSqliteLoader(
+        HolidayService(data_dir), database, granularity
+    ).load()
+
+
+def query(database: Path, sql: str, *params) -> list:
+    with sqlite3.connect(database) as connection:
+        return connection.execute(sql, params).fetchall()
+
+
+def rename_holiday(data_dir: Path, year: int, date: str, name: str) -> None:
+    path = data_dir / f"{year}.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for day in data["days"]:
+        if day["date"] == date:
+            day["name"] = name
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def test_load_same_as_csv(data_dir, tmp_path):
+    database = tmp_path / "date-dimension.sqlite"
+
+    result = load(data_dir, database)
+
+    assert result.loaded == [2024, 2025]
+    assert result.rows == (366 + 365) * 24
+    controller = DateDimensionController(HolidayService(data_dir))
+    chunks = asyncio.run(
+        collect(
+            controller.generate_csv(
+                datetime(2024, 10, 1), datetime(2024, 10, 2)
+            )
+        )
+    )
+    expected = list(csv.reader(io.StringIO(b"".join(chunks).decode())))[1:]
+    rows = query(
+        database,
+        "SELECT * FROM date_dimension WHERE date_id BETWEEN ? AND ? "
+        "ORDER BY date_hour_id",
+        "20241001",
+        "20241002",
+    )
+    assert [[str(v) for v in row] for row in rows] == expected
+
+
+def test_load_creates_indexes(data_dir, tmp_path):
+    database = tmp_path / "date-dimension.sqlite"
+    load(data_dir, database)
+
+    indexes = {
+        name: sql
+        for name, sql in query(
+            database,
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = 'date_dimension'",
+        )
+    }
+    assert "(date_id)" in indexes["date_dimension_date_id"]
+    assert "(date_hour_id)" in indexes["date_dimension_date_hour_id"]
+
+
+def test_reload_only_changed_years(data_dir, tmp_path):
+    database = tmp_path / "date-dimension.sqlite"
+    load(data_dir, database)
+
+    assert load(data_dir, database).skipped == [2024, 2025]
+
+    rename_holiday(data_dir, 2025, "2025-01-01", "新年")
+    result = load(data_dir, database)
+
+    assert result.loaded == [2025]
+    assert result.skipped == [2024]
+    assert result.rows == 365 * 24
+    assert query(
+        database,
+        "SELECT DISTINCT holiday_name FROM date_dimension WHERE date_id = ?",
+        "20250101",
+    ) == [("新年",)]
+    assert query(database, "SELECT count(*) FROM date_dimension") == [
+        ((366 + 365) * 24,)
+    ]
+
+
+def test_reload_removed_year(data_dir, tmp_path):
+    database = tmp_path / "date-dimension.sqlite"
+    load(data_dir, database)
+
+    (data_dir / "2024.json").unlink()
+    result = load(data_dir, database)
+
+    assert result.removed == [2024]
+    assert result.skipped == [2025]
+    assert query(database, "SELECT min(date_id) FROM date_dimension") == [
+        ("20250101",)
+    ]
+
+
+def test_reload_other_granularity_rebuilds(data_dir, tmp_path):
+    database = tmp_path / "date-dimension.sqlite"
+    load(data_dir, database)
+
+    result = load(data_dir, database, "day")
+
+    assert result.loaded == [2024, 2025]
+    assert query(database, "SELECT count(*) FROM date_dimension") == [
+        (366 + 365,)
+    ]
@@ -0,0 +1,151 @@
+import asyncio
+import pytest
+from datetime import date, datetime
+
+from app.services.holiday_service import HolidayService
+from app.services.date_dimension_service import DateDimensionService
+from app.services.date_dimension_store import DateDimensionStore
+
+
+@pytest.fixture
+def holiday_service():
+    return HolidayService()
+
+
+@pytest.fixture
+def store(holiday_service, tmp_path):
+    return DateDimensionStore.build(
+        holiday_service, tmp_path / "date-dimension.store"
+    )
+
+
+async def collect(generator):
+    return [d async for d in generator]
+
+
+def test_get_ste_day_same_as_row_engine(holiday_service, store):
+    time_start, time_end = datetime(2024, 12, 30), datetime(2025, 1, 2)
+
+    expected = asyncio.run(
+        collect(
+            DateDimensionService(holiday_service).get_ste_day(
+                time_start, time_end
+            )
+        )
+    )
+    results = asyncio.run(collect(store.get_ste_day(time_start, time_end)))
+
+    assert [r.model_dump_json() for r in results] == [
+        e.model_dump_json() for e in expected
+    ]
+
+
+def test_get_for_date(store):
+    results = asyncio.run(collect(store.get_for_date(date(2024, 5, 5))))
+
+    assert len(results) == 24
+    assert results[12].date_hour_id == "2024050512"
+    assert results[12].holiday_name == "劳动节"
+
+
+def test_covers(store):
+    assert store.covers(date(2024, 1, 1), date(2025, 12, 31))
+    assert not store.covers(date(2023, 12, 31), date(2024, 1, 1))
+    assert not store.covers(date(2025, 12, 31), date(2026, 1, 1))
+
+
+def test_get_columns_out_of_range(store):
+    with pytest.raises(FileNotFoundError):
+        store.get_columns(date(2026, 1, 1), date(2026, 1, 2))
+
+
+def test_open_or_build_reuses_current_version(holiday_service, store):
+    reopened = DateDimensionStore.open_or_build(holiday_service, store.path)
+
+    assert reopened.version == holiday_service.version
+    assert reopened.path.stat().st_mtime_ns == store.path.stat().st_mtime_ns
+
+
+def test_open_or_build_rebuilds_stale_store(tmp_path, store):
+    data_dir = tmp_path / "holiday-cn"
+    data_dir.mkdir()
+    (data_dir / "2030.json").write_text(
+        '{"year": 2030, "days": []}', encoding="utf-8"
+    )
+    holiday_service = HolidayService(data_dir)
+
+    rebuilt = DateDimensionStore.open_or_build(holiday_service, store.path)
+
+    assert rebuilt.version == holiday_service.version
+    assert rebuilt.first_date == date(2030, 1, 1)
+    assert rebuilt.last_date == date(2030, 12, 31)
+
+
+def test_build_keeps_years_before_gap(tmp_path):
+    data_dir = tmp_path / "holiday-cn"
+    data_dir.mkdir()
+    for year in (2019, 2020):
+        (data_dir / f"{year}.json").write_text(
+            f'{{"year": {year}, "days": []}}', encoding="utf-8"
+        )
+    (data_dir / "2022.json").write_text(
+        '{"year": 2022, "days": ['
+        '{"name": "劳动节", "date": "2022-05-02", "isOffDay": true}]}',
+        encoding="utf-8",
+    )
+    holiday_service = HolidayService(data_dir)
+
+    store = DateDimensionStore.build(
+        holiday_service, tmp_path / "date-dimension.store"
+    )
+
+    assert store.covers(date(2019, 1, 1), date(2020, 12, 31))
+    assert store.covers(date(2022, 1, 1), date(2022, 12, 31))
+    # 缺少json文件的年份不在表内，跨过它的范围也不在
+    assert not store.covers(date(2021, 5, 1), date(2021, 5, 1))
+    assert not store.covers(date(2020, 12, 31), date(2022, 1, 1))
+    time_start, time_end = datetime(2022, 5, 1), datetime(2022, 5, 2)
+    assert [
+        r.model_dump_json()
+        for r in asyncio.run(collect(store.get_ste_day(time_start, time_end)))
+    ] == [
+        r.model_dump_json()
+        for r in asyncio.run(
+            collect(
+                DateDimensionService(holiday_service).get_ste_day(
+                    time_start, time_end
+                )
+            )
+        )
+    ]
+
+
+def test_open_or_build_rebuilds_unknown_file(holiday_service, tmp_path):
+    # 旧格式(没有版本头部)的文件也重新生成
+    path = tmp_path / "date-dimension.store"
+    path.write_bytes(b"\x93NUMPY")
+
+    rebuilt = DateDimensionStore.open_or_build(holiday_service, path)
+
+    assert rebuilt.version == holiday_service.version
+    assert len(list(rebuilt.iter_for_date(date(2024, 5, 1)))) == 24
+
+
+@pytest.mark.parametrize("granularity", ["day", "shift", "15min"])
+def test_get_ste_day_granularity(holiday_service, store, granularity):
+    time_start, time_end = datetime(2024, 5, 4), datetime(2024, 5, 6)
+
+    expected = asyncio.run(
+        collect(
+            DateDimensionService(holiday_service).get_ste_day(
+                time_start, time_end, granularity
+            )
+        )
+    )
+    results = asyncio.run(
+        collect(store.get_ste_day(time_start, time_end, granularity))
+    )
+
+    assert [r.model_dump_json() for r in results] == [
+        e.model_dump_json() for e in expected
+    ]
@@ -0,0 +1,36 @@
+import pytest
+
+from app.services.granularity import get_slots
+
+
+def test_get_slots_day():
+    assert [s.id_suffix for s in get_slots("day")] == [""]
+
+
+def test_get_slots_hour():
+    slots = get_slots("hour")
+
+    assert len(slots) == 24
+    assert slots[8] == (480, "08", "8", "早")
+
+
+def test_get_slots_shift():
+    assert [(s.id_suffix, s.shift) for s in get_slots("shift")] == [
+        ("00", "夜"),
+        ("08", "早"),
+        ("17", "中"),
+    ]
+
+
+def test_get_slots_minutes():
+    slots = get_slots("15min")
+
+    assert len(slots) == 96
+    assert slots[1] == (15, "0015", "0", "夜")
+    assert slots[-1] == (1425, "2345", "23", "中")
+
+
+@pytest.mark.parametrize("granularity", ["week", "7min", "0min", "2880min"])
+def test_get_slots_unsupported(granularity):
+    with pytest.raises(ValueError):
+        get_slots(granularity)
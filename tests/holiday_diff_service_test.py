@@ -0,0 +1,268 @@
+import asyncio
+import csv
+import io
+import json
+import shutil
+from datetime import date, datetime
+from pathlib import Path
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.api_v1.endpoints.date_dimension import date_dimension_router
+from app.controllers.date_dimension_controller import DateDimensionController
+from app.core.config import settings
+from app.services.holiday_diff_service import (
+    HolidayDiff,
+    diff_holidays,
+    iter_changes,
+    load_holidays,
+    version_of,
+    version_of_snapshot,
+)
+from app.services.holiday_service import HolidayService
+
+# 测试用的节假日数据，不依赖holiday-cn子模块
+HOLIDAY_FIXTURES = Path(__file__).parent / "fixtures" / "holiday-cn"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return Path(shutil.copytree(HOLIDAY_FIXTURES, tmp_path / "holiday-cn"))
+
+
+async def collect(generator):
+    return [chunk async for chunk in generator]
+
+
+def edit_days(data_dir: Path, year: int, edit) -> None:
+    path = data_dir / f"{year}.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["days"] = edit(data["days"])
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def test_diff_same_version(data_dir):
+    service = HolidayService(data_dir)
+
+    diff = diff_holidays(version_of(service), version_of(service))
+
+    assert not diff
+    assert diff.ranges() == []
+
+
+def test_diff_exact_dates(data_dir):
+    old = version_of(HolidayService(data_dir))
+
+    def edit(days):
+        for day in days:
+            if day["date"] == "2025-01-01":
+                day["name"] = "新年"
+            # 只改了是否放假，名称不变
+            if day["date"] == "2025-10-08":
+                day["isOffDay"] = False
+        # 新增连续两天的节假日
+        return days + [
+            {"name": "测试", "date": "2025-03-03", "isOffDay": True},
+            {"name": "测试", "date": "2025-03-04", "isOffDay": True},
+        ]
+
+    edit_days(data_dir, 2025, edit)
+    diff = diff_holidays(old, version_of(HolidayService(data_dir)))
+
+    assert diff == HolidayDiff(
+        [],
+        [],
+        [
+            date(2025, 1, 1),
+            date(2025, 3, 3),
+            date(2025, 3, 4),
+            date(2025, 10, 8),
+        ],
+    )
+    assert diff.ranges() == [
+        (date(2025, 1, 1), date(2025, 1, 1), "update"),
+        (date(2025, 3, 3), date(2025, 3, 4), "update"),
+        (date(2025, 10, 8), date(2025, 10, 8), "update"),
+    ]
+
+
+def test_diff_removed_holiday_is_update(data_dir):
+    old = version_of(HolidayService(data_dir))
+
+    edit_days(
+        data_dir,
+        2024,
+        lambda days: [d for d in days if d["date"] != "2024-05-11"],
+    )
+    diff = diff_holidays(old, version_of(HolidayService(data_dir)))
+
+    assert diff.updated_dates == [date(2024, 5, 11)]
+
+
+def test_diff_inserted_and_deleted_years(data_dir, tmp_path):
+    old_dir = Path(shutil.copytree(data_dir, tmp_path / "old"))
+    (old_dir / "2025.json").unlink()
+    (data_dir / "2024.json").unlink()
+
+    diff = diff_holidays(
+        version_of(HolidayService(old_dir)),
+        version_of(HolidayService(data_dir)),
+    )
+
+    assert diff.inserted_years == [2025]
+    assert diff.deleted_years == [2024]
+    # 不比较只在一边存在的年份
+    assert diff.updated_dates == []
+    assert diff.ranges() == [(date(2025, 1, 1), date(2025, 12, 31), "insert")]
+
+
+def test_diff_snapshot_against_files(data_dir, tmp_path):
+    snapshot = tmp_path / "holiday-cn.snapshot"
+    HolidayService(data_dir).write_snapshot(snapshot)
+    (data_dir / "2024.json").unlink()
+
+    diff = diff_holidays(
+        version_of_snapshot(snapshot), version_of(HolidayService(data_dir))
+    )
+
+    assert diff.deleted_years == [2024]
+
+    with pytest.raises(FileNotFoundError):
+        version_of_snapshot(tmp_path / "missing.snapshot")
+
+
+def test_iter_changes_same_as_full_rows(data_dir):
+    service = HolidayService(data_dir)
+    diff = HolidayDiff([], [], [date(2024, 5, 1), date(2025, 1, 1)])
+
+    rows = list(iter_changes(service, diff, "shift"))
+
+    controller = DateDimensionController(service)
+    expected = []
+    for d in diff.updated_dates:
+        expected += asyncio.run(
+            controller.get_for_date_rows(
+                datetime.combine(d, datetime.min.time()), "shift"
+            )
+        )
+    assert [row.change for row in rows] == ["update"] * 6
+    assert [tuple(row[1:]) for row in rows] == [tuple(r) for r in expected]
+
+
+def test_generate_changes(data_dir):
+    old = HolidayService(data_dir)
+    edit_days(
+        data_dir,
+        2024,
+        lambda days: [d for d in days if d["date"] != "2024-05-11"],
+    )
+    (data_dir / "2026.json").write_text(
+        '{"year": 2026, "days": []}', encoding="utf-8"
+    )
+    controller = DateDimensionController(old)
+    service, diff = asyncio.run(controller.diff_holidays(data_dir))
+
+    fields = ("date_id", "date", "date_type")
+    chunks = asyncio.run(
+        collect(
+            controller.generate_changes(service, diff, "csv", "day", fields)
+        )
+    )
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["change", *fields]
+    assert rows[1] == [
+        "update",
+        "20240511",
+        "2024-05-11 00:00:00+00:00",
+        "工作日",
+    ]
+    assert rows[2][:2] == ["insert", "20260101"]
+    assert len(rows) == 1 + 1 + 365
+
+    chunks = asyncio.run(
+        collect(controller.generate_changes(service, diff, "ndjson", "hour"))
+    )
+    lines = b"".join(chunks).splitlines()
+    assert len(lines) == (1 + 365) * 24
+    first = orjson.loads(lines[0])
+    assert first["change"] == "update"
+    assert first["date_hour_id"] == "2024051100"
+
+
+def test_changes_endpoint(data_dir, monkeypatch):
+    app = FastAPI()
+    app.state.holiday_service = HolidayService(data_dir)
+    app.state.date_dimension_store = None
+    app.state.generation_pool = None
+    app.include_router(date_dimension_router, prefix="/date_dimension")
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "HOLIDAY_DATA_DIR", data_dir)
+
+    response = client.get("/date_dimension/changes")
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-updated-date-count"] == "0"
+    assert response.headers["cache-control"] == "no-store"
+
+    edit_days(
+        data_dir,
+        2024,
+        lambda days: [d for d in days if d["date"] != "2024-05-11"],
+    )
+    response = client.get(
+        "/date_dimension/changes",
+        params={"granularity": "day", "fields": "date_id,holiday_name"},
+    )
+    assert response.headers["x-updated-date-count"] == "1"
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert orjson.loads(response.content) == {
+        "change": "update",
+        "date_id": "20240511",
+        "holiday_name": "",
+    }
+
+    response = client.get("/date_dimension/changes", params={"fields": "x"})
+    assert response.status_code == 422
+
+
+def test_load_holidays_missing_or_empty(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_holidays(tmp_path / "missing")
+    with pytest.raises(FileNotFoundError):
+        load_holidays(tmp_path)
+
+
+def test_changes_endpoint_missing_data_dir(tmp_path, monkeypatch):
+    app = FastAPI()
+    app.state.holiday_service = HolidayService()
+    app.state.date_dimension_store = None
+    app.state.generation_pool = None
+    app.include_router(date_dimension_router, prefix="/date_dimension")
+    monkeypatch.setattr(settings, "HOLIDAY_DATA_DIR", tmp_path / "missing")
+
+    response = TestClient(app).get("/date_dimension/changes")
+
+    assert response.status_code == 404
+
+
+def test_export_changes_missing_old_dir(data_dir, tmp_path):
+    from export_changes import main
+
+    output = tmp_path / "changes.ndjson"
+    assert (
+        main(
+            [
+                "--old",
+                str(tmp_path / "missing"),
+                "--new",
+                str(data_dir),
+                "-o",
+                str(output),
+            ]
+        )
+        == 1
+    )
+    assert not output.exists()
@@ -2,7 +2,7 @@ import pytest
 import os
 
 from pathlib import Path
-from datetime import date
+from datetime import date, datetime
 from app.services.holiday_service import HolidayService
 from app.schemas.holiday import Holiday
 
@@ -48,3 +48,97 @@ def test_get_for_date_file_not_found():
 
     with pytest.raises(FileNotFoundError):
         service.get_for_date(date(2026, 1, 1))
+
+
+def test_get_for_date_with_datetime(holiday_service):
+    # datetime与date查询结果一致
+    holiday = holiday_service.get_for_date(datetime(2024, 5, 5, 23, 0, 0))
+
+    assert holiday is not None
+    assert holiday.date == "2024-05-05"
+
+
+def test_load_all_years_from_data_dir(tmp_path):
+    (tmp_path / "2030.json").write_text(
+        '{"year": 2030, "days": ['
+        '{"name": "元旦", "date": "2030-01-01", "isOffDay": true}]}',
+        encoding="utf-8",
+    )
+    (tmp_path / "schema.json").write_text("{}", encoding="utf-8")
+
+    service = HolidayService(tmp_path)
+
+    assert service.years == {2030}
+    assert service.get_for_date(date(2030, 1, 1)).name == "元旦"
+    assert service.get_for_date(date(2030, 1, 2)) is None
+
+
+def test_year_versions_follow_effective_dates(tmp_path):
+    def write(year: int, days: str) -> None:
+        (tmp_path / f"{year}.json").write_text(
+            f'{{"year": {year}, "days": [{days}]}}', encoding="utf-8"
+        )
+
+    write(2030, '{"name": "元旦", "date": "2030-01-01", "isOffDay": true}')
+    write(2031, '{"name": "元旦", "date": "2031-01-01", "isOffDay": true}')
+    before = HolidayService(tmp_path).year_versions()
+
+    # 2031年的文件中包含2030年末的调休
+    write(
+        2031,
+        '{"name": "元旦", "date": "2030-12-28", "isOffDay": false},'
+        '{"name": "元旦", "date": "2031-01-01", "isOffDay": true}',
+    )
+    after = HolidayService(tmp_path).year_versions()
+
+    assert list(after) == [2030, 2031]
+    assert after[2030] != before[2030]
+    assert after[2031] == before[2031]
+
+
+def test_get_for_dates(holiday_service):
+    holidays = holiday_service.get_for_dates(
+        [date(2024, 5, 5), date(2024, 1, 2), date(2024, 4, 28)]
+    )
+
+    assert [h and h.date for h in holidays] == [
+        "2024-05-05",
+        None,
+        "2024-04-28",
+    ]
+
+
+def test_get_for_dates_file_not_found(holiday_service):
+    with pytest.raises(FileNotFoundError):
+        holiday_service.get_for_dates([date(2024, 1, 1), date(2026, 1, 1)])
+
+
+def test_get_range(holiday_service):
+    holidays = holiday_service.get_range(date(2024, 4, 28), date(2024, 5, 11))
+
+    # 含首尾：4月28日、5月11日调休上班，5月1日~5日放假
+    assert [h.date for h in holidays] == [
+        "2024-04-28",
+        "2024-05-01",
+        "2024-05-02",
+        "2024-05-03",
+        "2024-05-04",
+        "2024-05-05",
+        "2024-05-11",
+    ]
+    assert holiday_service.get_range(date(2024, 1, 2), date(2024, 1, 31)) == []
+
+
+def test_get_range_matches_get_for_date(holiday_service):
+    holidays = holiday_service.get_range(date(2024, 1, 1), date(2024, 12, 31))
+    first = date(2024, 1, 1).toordinal()
+    days = [date.fromordinal(o) for o in range(first, first + 366)]
+
+    assert holidays == [
+        h for h in map(holiday_service.get_for_date, days) if h is not None
+    ]
+
+
+def test_get_range_file_not_found(holiday_service):
+    with pytest.raises(FileNotFoundError):
+        holiday_service.get_range(date(2024, 12, 1), date(2026, 1, 31))
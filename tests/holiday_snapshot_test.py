@@ -0,0 +1,129 @@
+import os
+from datetime import date
+
+from app.services.holiday_service import HolidayService
+from app.services.holiday_snapshot import (
+    HolidayRecord,
+    read_snapshot,
+    write_snapshot,
+)
+
+
+def write_year(data_dir, year: int, days: str):
+    (data_dir / f"{year}.json").write_text(
+        f'{{"year": {year}, "days": [{days}]}}', encoding="utf-8"
+    )
+
+
+def test_read_write_snapshot(tmp_path):
+    records = [
+        HolidayRecord(date(2024, 5, 1).toordinal(), "劳动节", True),
+        HolidayRecord(date(2024, 5, 11).toordinal(), "劳动节", False),
+        HolidayRecord(date(2024, 6, 10).toordinal(), "端午节", True),
+    ]
+    path = tmp_path / "holiday-cn.snapshot"
+    write_snapshot("v1", records, path)
+
+    snapshot = read_snapshot(path)
+    assert snapshot.version == "v1"
+    assert snapshot.records == records
+    # 没有记录年份时按节假日的日期推断
+    assert snapshot.years == {2024}
+
+    write_snapshot("v2", records, path, frozenset({2024, 2025}))
+    assert read_snapshot(path).years == {2024, 2025}
+
+
+def test_read_snapshot_missing_or_invalid(tmp_path):
+    path = tmp_path / "holiday-cn.snapshot"
+    assert read_snapshot(path) is None
+
+    path.write_bytes(b"not a snapshot")
+    assert read_snapshot(path) is None
+
+
+def test_holiday_service_from_snapshot(tmp_path):
+    from_json = HolidayService()
+    assert from_json.loaded_from == "json"
+
+    snapshot_path = tmp_path / "holiday-cn.snapshot"
+    from_json.write_snapshot(snapshot_path)
+    from_snapshot = HolidayService(snapshot_path=snapshot_path)
+
+    assert from_snapshot.loaded_from == "snapshot"
+    assert from_snapshot.version == from_json.version
+    assert from_snapshot.years == from_json.years
+    for year in from_json.years:
+        time_start, time_end = date(year, 1, 1), date(year, 12, 31)
+        assert from_snapshot.get_range(
+            time_start, time_end
+        ) == from_json.get_range(time_start, time_end)
+    assert from_snapshot.get_for_date(date(2024, 5, 5)).is_offday
+    assert from_snapshot.get_for_date(date(2024, 1, 2)) is None
+
+
+def test_stale_snapshot_falls_back_to_json(tmp_path):
+    data_dir = tmp_path / "holiday-cn"
+    data_dir.mkdir()
+    write_year(
+        data_dir,
+        2030,
+        '{"name": "元旦", "date": "2030-01-01", "isOffDay": true}',
+    )
+    snapshot_path = tmp_path / "holiday-cn.snapshot"
+    HolidayService(data_dir).write_snapshot(snapshot_path)
+
+    write_year(
+        data_dir,
+        2030,
+        '{"name": "元旦", "date": "2030-01-02", "isOffDay": true}',
+    )
+    service = HolidayService(data_dir, snapshot_path)
+
+    assert service.loaded_from == "json"
+    assert service.get_for_date(date(2030, 1, 1)) is None
+    assert service.get_for_date(date(2030, 1, 2)).name == "元旦"
+
+
+def test_snapshot_signature_skips_json(tmp_path):
+    data_dir = tmp_path / "holiday-cn"
+    data_dir.mkdir()
+    write_year(
+        data_dir,
+        2030,
+        '{"name": "元旦", "date": "2030-01-01", "isOffDay": true}',
+    )
+    snapshot_path = tmp_path / "holiday-cn.snapshot"
+    from_json = HolidayService(data_dir)
+    from_json.write_snapshot(snapshot_path)
+
+    # 内容无效但大小与修改时间不变：签名一致，不读取json
+    path = data_dir / "2030.json"
+    stat = path.stat()
+    path.write_bytes(b" " * stat.st_size)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    service = HolidayService(data_dir, snapshot_path)
+
+    assert service.loaded_from == "snapshot"
+    assert not service.snapshot_stale
+    assert service.version == from_json.version
+    assert service.get_for_date(date(2030, 1, 1)).name == "元旦"
+
+
+def test_snapshot_signature_changed_same_content(tmp_path):
+    data_dir = tmp_path / "holiday-cn"
+    data_dir.mkdir()
+    write_year(data_dir, 2030, "")
+    snapshot_path = tmp_path / "holiday-cn.snapshot"
+    HolidayService(data_dir).write_snapshot(snapshot_path)
+
+    # 只改变修改时间：按内容比较版本，仍使用快照，但需要更新快照中的签名
+    path = data_dir / "2030.json"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    service = HolidayService(data_dir, snapshot_path)
+
+    assert service.loaded_from == "snapshot"
+    assert service.snapshot_stale
+    service.write_snapshot(snapshot_path)
+    assert not HolidayService(data_dir, snapshot_path).snapshot_stale
@@ -0,0 +1,134 @@
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.http_cache import HttpCacheMiddleware
+from app.services.holiday_service import HolidayService
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(calls):
+    app = FastAPI()
+    app.state.holiday_service = HolidayService()
+    app.add_middleware(
+        HttpCacheMiddleware,
+        prefixes=("/api/v1/holiday",),
+        max_age=60,
+        exclude=("/api/v1/holiday/changes",),
+    )
+
+    @app.get("/api/v1/holiday/")
+    async def get_holiday(date: str):
+        calls.append(date)
+        return {"date": date}
+
+    @app.get("/api/v1/holiday/changes")
+    async def get_changes():
+        calls.append("changes")
+        return {}
+
+    @app.get("/other")
+    async def get_other():
+        return {}
+
+    return TestClient(app)
+
+
+def test_cache_headers(client):
+    response = client.get("/api/v1/holiday/?date=2024-05-05")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert "last-modified" in response.headers
+
+
+def test_etag_ignores_query_order(client):
+    first = client.get("/api/v1/holiday/?date=2024-05-05&a=1")
+    second = client.get("/api/v1/holiday/?a=1&date=2024-05-05")
+    other = client.get("/api/v1/holiday/?date=2024-05-06")
+
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["etag"] != other.headers["etag"]
+
+
+def test_if_none_match_returns_304_without_calling_route(client, calls):
+    etag = client.get("/api/v1/holiday/?date=2024-05-05").headers["etag"]
+
+    response = client.get(
+        "/api/v1/holiday/?date=2024-05-05", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert calls == ["2024-05-05"]
+
+
+def test_if_none_match_mismatch(client):
+    response = client.get(
+        "/api/v1/holiday/?date=2024-05-05", headers={"If-None-Match": '"x"'}
+    )
+
+    assert response.status_code == 200
+
+
+def test_if_none_match_wildcard_not_short_circuited(client, calls):
+    response = client.get(
+        "/api/v1/holiday/missing", headers={"If-None-Match": "*"}
+    )
+
+    assert response.status_code == 404
+    response = client.get(
+        "/api/v1/holiday/?date=2024-05-05", headers={"If-None-Match": "*"}
+    )
+
+    assert response.status_code == 200
+    assert calls == ["2024-05-05"]
+
+
+def test_if_modified_since_checked_after_route(client, calls):
+    future = {"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+
+    # 缺少参数(422)与不存在的路径(404)不会变为304
+    assert client.get("/api/v1/holiday/", headers=future).status_code == 422
+    assert (
+        client.get("/api/v1/holiday/missing", headers=future).status_code
+        == 404
+    )
+    response = client.get("/api/v1/holiday/?date=2024-05-05", headers=future)
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert "etag" in response.headers
+    assert calls == ["2024-05-05"]
+
+
+def test_if_modified_since_before_last_modified(client):
+    response = client.get(
+        "/api/v1/holiday/?date=2024-05-05",
+        headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"date": "2024-05-05"}
+
+
+def test_other_paths_not_cached(client):
+    assert "etag" not in client.get("/other").headers
+
+
+def test_excluded_paths_not_cached(client, calls):
+    response = client.get(
+        "/api/v1/holiday/changes", headers={"If-None-Match": "*"}
+    )
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert calls == ["changes"]
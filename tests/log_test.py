@@ -0,0 +1,31 @@
+from loguru import logger
+
+from app.core.config import Settings
+from app.core.log import SampledLogger
+
+
+def test_sampled_logger():
+    messages = []
+    handler_id = logger.add(messages.append, level="DEBUG", format="{message}")
+    try:
+        sampled = SampledLogger(3)
+        for i in range(7):
+            sampled.debug("row {}", i)
+    finally:
+        logger.remove(handler_id)
+
+    assert [m.strip() for m in messages] == ["row 0", "row 3", "row 6"]
+
+
+def test_log_level_by_profile():
+    assert Settings().log_level == "DEBUG"
+    assert Settings(SERVER_PROFILE="production").log_level == "INFO"
+    assert (
+        Settings(SERVER_PROFILE="production", LOG_LEVEL="debug").log_level
+        == "DEBUG"
+    )
+
+
+def test_workers():
+    assert Settings(WORKERS=3).workers == 3
+    assert Settings().workers >= 1
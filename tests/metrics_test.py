@@ -0,0 +1,100 @@
+import asyncio
+
+from app.core.metrics import (
+    MetricsRegistry,
+    render_response_cache,
+    timed,
+    timed_iter,
+    timed_stream,
+)
+
+
+def test_timed():
+    registry = MetricsRegistry()
+
+    @timed("add", registry)
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    assert add(3, 4) == 7
+    text = registry.render()
+    assert 'holiday_api_stage_seconds_count{stage="add"} 2' in text
+    assert 'holiday_api_stage_seconds_bucket{stage="add",le="+Inf"} 2' in text
+
+
+def test_timed_disabled():
+    def add(a, b):
+        return a + b
+
+    # 未启用时返回原函数，没有任何包装
+    assert timed("add")(add) is add
+    assert timed_stream("add", unit="rows")(add) is add
+    assert timed_iter("add", unit="rows")(add) is add
+
+
+def test_timed_stream():
+    registry = MetricsRegistry()
+
+    @timed_stream("rows", unit="rows", registry=registry)
+    async def rows():
+        for i in range(3):
+            yield i
+
+    @timed_stream("bytes", unit="bytes", registry=registry)
+    async def chunks():
+        yield b"abc"
+        yield b"de"
+
+    async def collect(gen):
+        return [item async for item in gen]
+
+    assert asyncio.run(collect(rows())) == [0, 1, 2]
+    assert asyncio.run(collect(chunks())) == [b"abc", b"de"]
+    text = registry.render()
+    assert 'holiday_api_rows_total{stage="rows"} 3' in text
+    assert 'holiday_api_bytes_streamed_total{stage="bytes"} 5' in text
+    assert 'holiday_api_stage_seconds_count{stage="bytes"} 1' in text
+
+
+def test_timed_iter():
+    registry = MetricsRegistry()
+
+    @timed_iter("rows", unit="rows", registry=registry)
+    def rows():
+        yield from range(3)
+
+    assert list(rows()) == [0, 1, 2]
+    text = registry.render()
+    assert 'holiday_api_rows_total{stage="rows"} 3' in text
+    assert 'holiday_api_stage_seconds_count{stage="rows"} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    for value in (0.000001, 0.002, 0.002, 100.0):
+        registry.stage_seconds.observe("stage", value)
+
+    lines = registry.stage_seconds.render()
+    assert (
+        'holiday_api_stage_seconds_bucket{stage="stage",le="1e-05"} 1' in lines
+    )
+    assert (
+        'holiday_api_stage_seconds_bucket{stage="stage",le="0.005"} 3' in lines
+    )
+    assert (
+        'holiday_api_stage_seconds_bucket{stage="stage",le="30.0"} 3' in lines
+    )
+    assert (
+        'holiday_api_stage_seconds_bucket{stage="stage",le="+Inf"} 4' in lines
+    )
+    assert 'holiday_api_stage_seconds_count{stage="stage"} 4' in lines
+
+
+def test_render_response_cache():
+    lines = render_response_cache(
+        {"hits": 3, "misses": 1, "evictions": 0, "entries": 1, "size": 10}
+    )
+
+    assert "holiday_api_response_cache_hits_total 3" in lines
+    assert "holiday_api_response_cache_size_bytes 10" in lines
@@ -0,0 +1,206 @@
+import asyncio
+import pytest
+from datetime import date, datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.api_v1.endpoints.date_dimension import date_dimension_router
+from app.controllers.date_dimension_controller import DateDimensionController
+from app.core.config import settings
+from app.core.response_cache import ResponseCache
+from app.services.date_dimension_store import DateDimensionStore
+from app.services.holiday_service import HolidayService
+from app.services.pagination import (
+    Position,
+    decode_cursor,
+    encode_cursor,
+    plan_page,
+)
+
+
+@pytest.fixture(scope="module")
+def holiday_service():
+    return HolidayService()
+
+
+@pytest.fixture(scope="module")
+def controller(holiday_service, tmp_path_factory):
+    path = tmp_path_factory.mktemp("store") / "date-dimension.store"
+    store = DateDimensionStore.open_or_build(holiday_service, path)
+    return DateDimensionController(holiday_service, store)
+
+
+@pytest.fixture
+def client(holiday_service, monkeypatch):
+    monkeypatch.setattr(settings, "DATE_DIMENSION_MAX_ROWS", 50)
+    app = FastAPI()
+    app.state.holiday_service = holiday_service
+    app.state.date_dimension_store = None
+    app.state.generation_pool = None
+    app.state.response_cache = ResponseCache(2**20, 2**20)
+    app.include_router(date_dimension_router, prefix="/date_dimension")
+    return TestClient(app)
+
+
+def test_cursor_round_trip():
+    position = Position(date(2024, 2, 29), 22 * 60 + 30)
+    cursor = encode_cursor(position, "30min")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "30min") == position
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "MjAyNA"])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "hour")
+
+
+def test_decode_cursor_other_granularity():
+    cursor = encode_cursor(Position(date(2024, 1, 1), 60), "hour")
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "shift")
+
+
+def test_plan_page():
+    page = plan_page(date(2024, 1, 1), date(2024, 1, 31), "hour", 30)
+
+    assert page.first_day == date(2024, 1, 1)
+    assert page.first_slot == 0
+    assert page.last_day == date(2024, 1, 2)
+    assert decode_cursor(page.next_cursor, "hour") == Position(
+        date(2024, 1, 2), 6 * 60
+    )
+
+    page = plan_page(
+        date(2024, 1, 1), date(2024, 1, 31), "hour", 24, page.next_cursor
+    )
+    assert page.first_day == date(2024, 1, 2)
+    assert page.first_slot == 6
+    assert page.last_day == date(2024, 1, 3)
+
+
+def test_plan_last_page():
+    page = plan_page(date(2024, 1, 1), date(2024, 1, 2), "shift", 6)
+
+    assert page.last_day == date(2024, 1, 2)
+    assert page.next_cursor is None
+
+
+def test_plan_page_huge_limit():
+    page = plan_page(date(2024, 1, 1), date(2024, 1, 2), "hour", 10**18)
+
+    assert page.last_day == date(2024, 1, 2)
+    assert page.limit == 48
+    assert page.next_cursor is None
+
+
+def test_plan_page_reversed_range():
+    page = plan_page(date(2024, 1, 2), date(2024, 1, 1), "hour", 10)
+
+    assert page.limit == 0
+    assert page.next_cursor is None
+
+
+def test_plan_page_cursor_out_of_range():
+    cursor = encode_cursor(Position(date(2024, 3, 1), 0), "hour")
+
+    with pytest.raises(ValueError):
+        plan_page(date(2024, 1, 1), date(2024, 1, 31), "hour", 10, cursor)
+
+
+def test_plan_page_cursor_not_on_slot():
+    cursor = encode_cursor(Position(date(2024, 1, 2), 30), "hour")
+
+    with pytest.raises(ValueError):
+        plan_page(date(2024, 1, 1), date(2024, 1, 31), "hour", 10, cursor)
+
+
+@pytest.mark.parametrize("engine", ["row", "columnar", "store"])
+@pytest.mark.parametrize(
+    "granularity,limit", [("hour", 50), ("shift", 7), ("day", 3)]
+)
+def test_pages_concatenate_to_range(controller, engine, granularity, limit):
+    start_date, end_date = date(2024, 12, 25), date(2025, 1, 6)
+    expected = asyncio.run(
+        controller.get_ste_day_rows(
+            datetime.combine(start_date, datetime.min.time()),
+            datetime.combine(end_date, datetime.min.time()),
+            engine,
+            granularity,
+        )
+    )
+
+    rows, cursor = [], None
+    while True:
+        page = plan_page(start_date, end_date, granularity, limit, cursor)
+        chunk = asyncio.run(
+            controller.get_ste_day_page(page, engine, granularity)
+        )
+        assert len(chunk) == limit or page.next_cursor is None
+        rows.extend(chunk)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert rows == expected
+
+
+def test_endpoint_pages(client):
+    url = "/date_dimension/?start_date=2024-01-01&end_date=2024-01-03"
+    response = client.get(url + "&limit=30")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 30
+    cursor = response.headers["x-next-cursor"]
+    assert f"cursor={cursor}" in response.headers["link"]
+
+    rows = response.json()
+    while "x-next-cursor" in response.headers:
+        response = client.get(
+            url + "&limit=30&cursor=" + response.headers["x-next-cursor"]
+        )
+        rows.extend(response.json())
+
+    assert len(rows) == 3 * 24
+    assert rows == client.get(url + "&stream=json").json()
+
+
+def test_endpoint_max_rows(client):
+    url = "/date_dimension/?start_date=2024-01-01&end_date=2024-01-03"
+
+    assert len(client.get(url).json()) == 50
+    assert len(client.get(url + "&limit=1000").json()) == 50
+    # 缓存命中时仍返回下一页游标
+    assert "x-next-cursor" in client.get(url).headers
+
+
+def test_endpoint_unlimited_huge_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "DATE_DIMENSION_MAX_ROWS", 0)
+    url = "/date_dimension/?start_date=2024-01-01&end_date=2024-01-02"
+
+    response = client.get(url + f"&limit={10**18}")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 48
+    assert "x-next-cursor" not in response.headers
+
+
+def test_endpoint_reversed_range(client):
+    url = "/date_dimension/?start_date=2024-01-03&end_date=2024-01-01"
+
+    response = client.get(url + "&limit=10")
+
+    assert response.status_code == 200
+    assert response.json() == []
+    assert "x-next-cursor" not in response.headers
+    assert client.get(url + "&stream=json").json() == []
+
+
+def test_endpoint_invalid_cursor(client):
+    url = "/date_dimension/?start_date=2024-01-01&end_date=2024-01-03"
+
+    assert client.get(url + "&cursor=abc").status_code == 422
+    assert client.get(url + "&limit=10&stream=ndjson").status_code == 422
@@ -0,0 +1,169 @@
+import asyncio
+import shutil
+import pytest
+from datetime import date, datetime
+from pathlib import Path
+
+from app.controllers.date_dimension_controller import DateDimensionController
+from app.services.columnar_date_dimension_service import (
+    ColumnarDateDimensionService,
+)
+from app.services.holiday_service import HolidayService
+from app.services.parallel_date_dimension_service import (
+    GenerationPool,
+    encode_rows,
+    iter_periods,
+    rows_encoder,
+)
+
+# 测试用的节假日数据，不依赖holiday-cn子模块
+HOLIDAY_FIXTURES = Path(__file__).parent / "fixtures" / "holiday-cn"
+
+
+async def collect(generator):
+    return [chunk async for chunk in generator]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = GenerationPool(1, chunk="month")
+    yield pool
+    pool.shutdown()
+
+
+def test_iter_periods_month():
+    assert list(
+        iter_periods(date(2024, 1, 15), date(2024, 3, 2), "month")
+    ) == [
+        (date(2024, 1, 15), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2024, 3, 2)),
+    ]
+
+
+def test_iter_periods_year():
+    assert list(
+        iter_periods(datetime(2024, 12, 30), datetime(2025, 1, 2), "year")
+    ) == [
+        (date(2024, 12, 30), date(2024, 12, 31)),
+        (date(2025, 1, 1), date(2025, 1, 2)),
+    ]
+
+
+def test_csv_encoder_reused_across_chunks():
+    rows = list(
+        ColumnarDateDimensionService(HolidayService()).iter_range(
+            datetime(2024, 1, 1), datetime(2024, 1, 2)
+        )
+    )
+    encode = rows_encoder("csv")
+
+    first, second = encode(rows[:30]), encode(rows[30:])
+
+    # 每块只包含自己的行，与单独编码相同
+    assert first == encode_rows(rows[:30], "csv")
+    assert second == encode_rows(rows[30:], "csv")
+    assert second.count(b"\n") == 18
+
+
+@pytest.mark.parametrize("method", ["stream_ndjson", "stream_json"])
+def test_parallel_same_as_serial(pool, method):
+    holiday_service = HolidayService()
+    controller = DateDimensionController(holiday_service, None, pool)
+    time_start, time_end = datetime(2024, 11, 20), datetime(2025, 2, 3)
+
+    serial = asyncio.run(
+        collect(getattr(controller, method)(time_start, time_end))
+    )
+    parallel = asyncio.run(
+        collect(
+            getattr(controller, method)(time_start, time_end, parallel=True)
+        )
+    )
+
+    # 每个月一块
+    assert len(parallel) >= 4
+    assert b"".join(parallel) == b"".join(serial)
+
+
+def test_parallel_csv_same_as_serial(pool):
+    controller = DateDimensionController(HolidayService(), None, pool)
+    time_start, time_end = datetime(2024, 12, 1), datetime(2025, 1, 31)
+
+    serial = asyncio.run(
+        collect(controller.generate_csv(time_start, time_end, None, "shift"))
+    )
+    parallel = asyncio.run(
+        collect(
+            controller.generate_csv(
+                time_start, time_end, None, "shift", parallel=True
+            )
+        )
+    )
+
+    assert b"".join(parallel) == b"".join(serial)
+
+
+def test_parallel_by_min_rows():
+    pool = GenerationPool(1, chunk="year", min_rows=24 * 31)
+    try:
+        controller = DateDimensionController(HolidayService(), None, pool)
+        time_start = datetime(2024, 1, 1)
+
+        assert not controller.is_parallel(
+            None, None, time_start, datetime(2024, 1, 30)
+        )
+        assert controller.is_parallel(
+            None, None, time_start, datetime(2024, 1, 31)
+        )
+        assert not controller.is_parallel(
+            None, None, time_start, datetime(2024, 1, 31), "day"
+        )
+        # 指定引擎时不自动并行
+        assert not controller.is_parallel(
+            None, "row", time_start, datetime(2024, 12, 31)
+        )
+        assert controller.is_parallel(
+            None, None, time_start, datetime(2024, 12, 31)
+        )
+    finally:
+        pool.shutdown()
+
+
+def test_parallel_not_enabled():
+    controller = DateDimensionController(HolidayService())
+
+    assert not controller.is_parallel(
+        None, None, datetime(2024, 1, 1), datetime(2025, 12, 31)
+    )
+    with pytest.raises(ValueError):
+        controller.check_range(
+            datetime(2024, 1, 1), datetime(2024, 1, 2), parallel=True
+        )
+
+
+def test_parallel_uses_parent_data(tmp_path):
+    # 目录中的文件已更新但父进程尚未热加载时，子进程仍使用父进程的数据
+    data_dir = Path(shutil.copytree(HOLIDAY_FIXTURES, tmp_path / "holiday-cn"))
+    holiday_service = HolidayService(data_dir)
+    (data_dir / "2025.json").write_text(
+        '{"year": 2025, "days": []}', encoding="utf-8"
+    )
+    pool = GenerationPool(1, chunk="month")
+    try:
+        controller = DateDimensionController(holiday_service, None, pool)
+        time_start, time_end = datetime(2025, 1, 1), datetime(2025, 2, 28)
+
+        serial = asyncio.run(
+            collect(controller.stream_ndjson(time_start, time_end))
+        )
+        parallel = asyncio.run(
+            collect(
+                controller.stream_ndjson(time_start, time_end, parallel=True)
+            )
+        )
+    finally:
+        pool.shutdown()
+
+    assert b"".join(parallel) == b"".join(serial)
+    assert "元旦".encode() in b"".join(parallel)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+from datetime import date
+
+from starlette.datastructures import State
+
+from app.core.reloader import HolidayDataReloader
+from app.core.response_cache import ResponseCache
+
+
+def write_year(data_dir, year: int, days: list[tuple[str, str, bool]]):
+    (data_dir / f"{year}.json").write_text(
+        json.dumps(
+            {
+                "year": year,
+                "days": [
+                    {"name": name, "date": d, "isOffDay": is_offday}
+                    for name, d, is_offday in days
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def make_reloader(tmp_path) -> HolidayDataReloader:
+    data_dir = tmp_path / "holiday-cn"
+    data_dir.mkdir()
+    write_year(data_dir, 2030, [("元旦", "2030-01-01", True)])
+
+    state = State()
+    state.response_cache = ResponseCache(1024, 1024)
+    reloader = HolidayDataReloader(
+        state, data_dir, tmp_path / "data" / "date-dimension.store"
+    )
+    reloader.load()
+    return reloader
+
+
+def test_load(tmp_path):
+    reloader = make_reloader(tmp_path)
+    state = reloader.state
+
+    assert state.holiday_service.years == {2030}
+    assert not state.workday_service.is_workday(date(2030, 1, 1))
+    assert state.date_dimension_store.covers(
+        date(2030, 1, 1), date(2030, 12, 31)
+    )
+
+
+def test_reload_unchanged(tmp_path):
+    reloader = make_reloader(tmp_path)
+    holiday_service = reloader.state.holiday_service
+
+    assert not asyncio.run(reloader.reload())
+    assert reloader.state.holiday_service is holiday_service
+
+
+def test_reload_swaps_data(tmp_path):
+    reloader = make_reloader(tmp_path)
+    state = reloader.state
+    old_holiday_service = state.holiday_service
+    old_version = old_holiday_service.version
+    state.response_cache.put("key", old_version, b"cached")
+
+    write_year(
+        reloader.data_dir,
+        2031,
+        [("元旦", "2031-01-01", True), ("春节", "2031-01-26", False)],
+    )
+    assert asyncio.run(reloader.reload())
+
+    assert state.holiday_service.years == {2030, 2031}
+    assert state.holiday_service.version != old_version
+    assert state.workday_service.is_workday(date(2031, 1, 26))
+    assert state.date_dimension_store.version == state.holiday_service.version
+    assert state.response_cache.stats()["entries"] == 0
+    # 替换前取得的对象不受影响
+    assert old_holiday_service.years == {2030}
+    assert old_holiday_service.version == old_version
+
+
+def test_watch(tmp_path):
+    reloader = make_reloader(tmp_path)
+
+    async def run():
+        watcher = asyncio.create_task(reloader.watch(0.01))
+        await asyncio.sleep(0.05)
+        write_year(reloader.data_dir, 2031, [("元旦", "2031-01-01", True)])
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if 2031 in reloader.state.holiday_service.years:
+                break
+        watcher.cancel()
+
+    asyncio.run(run())
+    assert reloader.state.holiday_service.years == {2030, 2031}
+
+
+def test_watch_keeps_data_on_error(tmp_path):
+    reloader = make_reloader(tmp_path)
+    holiday_service = reloader.state.holiday_service
+
+    async def run():
+        watcher = asyncio.create_task(reloader.watch(0.01))
+        await asyncio.sleep(0.02)
+        # 写了一半的文件
+        (reloader.data_dir / "2031.json").write_text('{"year": 20')
+        await asyncio.sleep(0.1)
+        watcher.cancel()
+
+    asyncio.run(run())
+    assert reloader.state.holiday_service is holiday_service
+
+
+def test_workers_build_once(tmp_path):
+    # 两个worker进程共享数据目录、快照与日期维度表
+    data_dir = tmp_path / "holiday-cn"
+    data_dir.mkdir()
+    write_year(data_dir, 2030, [("元旦", "2030-01-01", True)])
+    store_path = tmp_path / "data" / "date-dimension.store"
+    reloaders = []
+    for _ in range(2):
+        state = State()
+        state.response_cache = ResponseCache(1024, 1024)
+        reloader = HolidayDataReloader(
+            state, data_dir, store_path, tmp_path / "data" / "snapshot"
+        )
+        reloader.load()
+        reloaders.append(reloader)
+
+    write_year(data_dir, 2031, [("元旦", "2031-01-01", True)])
+    assert asyncio.run(reloaders[0].reload())
+    built = store_path.stat().st_mtime_ns
+    assert asyncio.run(reloaders[1].reload())
+
+    # 第二个worker直接打开第一个worker生成的快照与日期维度表
+    state = reloaders[1].state
+    assert state.holiday_service.loaded_from == "snapshot"
+    assert store_path.stat().st_mtime_ns == built
+    assert state.date_dimension_store.version == state.holiday_service.version
+
+
+def test_production_always_watches():
+    from app.core.config import Settings
+
+    assert Settings().reload_interval == 0
+    assert Settings(SERVER_PROFILE="production").reload_interval > 0
+    assert (
+        Settings(
+            SERVER_PROFILE="production", HOLIDAY_RELOAD_INTERVAL=30
+        ).reload_interval
+        == 30
+    )
@@ -0,0 +1,80 @@
+import asyncio
+
+from app.core.response_cache import ResponseCache
+
+
+def test_get_put():
+    cache = ResponseCache(100, 100)
+    assert cache.get("a", "v1") is None
+    cache.put("a", "v1", b"abc")
+    assert cache.get("a", "v1") == b"abc"
+    assert cache.stats() == {
+        "entries": 1,
+        "size": 3,
+        "max_bytes": 100,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+    }
+
+
+def test_lru_eviction():
+    cache = ResponseCache(10, 10)
+    cache.put("a", "v1", b"1234")
+    cache.put("b", "v1", b"1234")
+    # a最近被访问，超出预算时淘汰b
+    assert cache.get("a", "v1") == b"1234"
+    cache.put("c", "v1", b"1234")
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") == b"1234"
+    assert cache.get("c", "v1") == b"1234"
+    assert cache.size == 8
+    assert cache.evictions == 1
+
+
+def test_replace_entry():
+    cache = ResponseCache(10, 10)
+    cache.put("a", "v1", b"1234")
+    cache.put("a", "v1", b"12")
+    assert cache.size == 2
+    assert cache.get("a", "v1") == b"12"
+
+
+def test_entry_limit():
+    cache = ResponseCache(100, 4)
+    cache.put("a", "v1", b"12345")
+    assert cache.get("a", "v1") is None
+    assert cache.size == 0
+
+
+def test_version_invalidation():
+    cache = ResponseCache(100, 100)
+    cache.put("a", "v1", b"abc")
+    assert cache.get("a", "v2") is None
+    assert cache.size == 0
+    cache.put("a", "v2", b"xyz")
+    assert cache.get("a", "v2") == b"xyz"
+
+
+async def chunks(n: int):
+    for i in range(n):
+        yield f"{i}\n".encode()
+
+
+async def collect(gen):
+    return [c async for c in gen]
+
+
+def test_capture():
+    cache = ResponseCache(100, 100)
+    output = asyncio.run(collect(cache.capture("a", "v1", chunks(3))))
+    assert output == [b"0\n", b"1\n", b"2\n"]
+    assert cache.get("a", "v1") == b"0\n1\n2\n"
+
+
+def test_capture_over_entry_limit():
+    cache = ResponseCache(100, 5)
+    output = asyncio.run(collect(cache.capture("a", "v1", chunks(3))))
+    # 超过单项上限时仍完整输出，但不缓存
+    assert b"".join(output) == b"0\n1\n2\n"
+    assert cache.get("a", "v1") is None
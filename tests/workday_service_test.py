@@ -0,0 +1,112 @@
+import pytest
+
+from datetime import date, timedelta
+
+from app.services.holiday_service import HolidayService
+from app.services.workday_service import WorkdayService
+
+
+@pytest.fixture(scope="module")
+def workday_service():
+    return WorkdayService(HolidayService())
+
+
+def is_workday(holiday_service: HolidayService, d: date) -> bool:
+    # 逐天判断，作为前缀和结果的对照
+    holiday = holiday_service.get_for_date(d)
+    if holiday is not None:
+        return not holiday.is_offday
+    return d.weekday() < 5
+
+
+def iter_days(time_start: date, time_end: date):
+    d = time_start
+    while d <= time_end:
+        yield d
+        d += timedelta(days=1)
+
+
+@pytest.mark.parametrize(
+    "d, expected",
+    [
+        (date(2024, 5, 1), False),  # 劳动节
+        (date(2024, 4, 28), True),  # 周日调休上班
+        (date(2024, 5, 6), True),
+        (date(2024, 5, 18), False),  # 周六
+    ],
+)
+def test_is_workday(workday_service, d, expected):
+    assert workday_service.is_workday(d) == expected
+
+
+def test_is_workday_matches_holidays(workday_service):
+    holiday_service = workday_service.holiday_service
+    for d in iter_days(date(2024, 1, 1), date(2025, 12, 31)):
+        assert workday_service.is_workday(d) == is_workday(holiday_service, d)
+
+
+def test_count_workdays(workday_service):
+    holiday_service = workday_service.holiday_service
+    time_start, time_end = date(2024, 4, 20), date(2025, 2, 10)
+    expected = sum(
+        is_workday(holiday_service, d) for d in iter_days(time_start, time_end)
+    )
+
+    assert workday_service.count_workdays(time_start, time_end) == expected
+    # 2024年5月1日~5日放假，4月28日、5月11日调休上班
+    assert (
+        workday_service.count_workdays(date(2024, 4, 28), date(2024, 5, 11))
+        == 9
+    )
+    assert (
+        workday_service.count_workdays(date(2024, 5, 1), date(2024, 5, 1)) == 0
+    )
+
+
+def test_count_workdays_invalid_range(workday_service):
+    with pytest.raises(ValueError):
+        workday_service.count_workdays(date(2024, 5, 2), date(2024, 5, 1))
+    with pytest.raises(FileNotFoundError):
+        workday_service.count_workdays(date(2024, 1, 1), date(2026, 1, 1))
+
+
+@pytest.mark.parametrize(
+    "d, days, expected",
+    [
+        (date(2024, 4, 30), 1, date(2024, 5, 6)),
+        (date(2024, 5, 6), -1, date(2024, 4, 30)),
+        (date(2024, 5, 3), 1, date(2024, 5, 6)),
+        (date(2024, 5, 3), -1, date(2024, 4, 30)),
+        (date(2024, 4, 26), 1, date(2024, 4, 28)),
+        (date(2024, 5, 3), 0, date(2024, 5, 3)),
+        (date(2024, 12, 31), 1, date(2025, 1, 2)),
+    ],
+)
+def test_add_workdays(workday_service, d, days, expected):
+    assert workday_service.add_workdays(d, days) == expected
+
+
+def test_add_workdays_matches_count(workday_service):
+    d = date(2024, 3, 15)
+    for days in (5, 20, 150, -30):
+        result = workday_service.add_workdays(d, days)
+        assert workday_service.is_workday(result)
+        if days > 0:
+            count = workday_service.count_workdays(d + timedelta(1), result)
+        else:
+            count = -workday_service.count_workdays(result, d - timedelta(1))
+        assert count == days
+
+
+def test_next_previous_workday(workday_service):
+    assert workday_service.next_workday(date(2024, 9, 13)) == date(2024, 9, 14)
+    assert workday_service.previous_workday(date(2024, 10, 8)) == date(
+        2024, 9, 30
+    )
+
+
+def test_add_workdays_out_of_range(workday_service):
+    with pytest.raises(FileNotFoundError):
+        workday_service.add_workdays(date(2025, 12, 31), 1)
+    with pytest.raises(FileNotFoundError):
+        workday_service.add_workdays(date(2024, 1, 2), -2)